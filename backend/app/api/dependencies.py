@@ -2,6 +2,10 @@
 
 from __future__ import annotations
 
+from functools import cache
+
+from fastapi import Depends
+
 from app.core.cache import CacheClient
 from app.core.config import settings
 from app.services.llm_enhanced import EnhancedLLMService
@@ -16,17 +20,24 @@ async def get_cache_client() -> CacheClient:
     return _cache_client
 
 
-def build_enhanced_llm_service(cache: CacheClient) -> EnhancedLLMService:
-    """Factory helper for EnhancedLLMService."""
+@cache
+def build_enhanced_llm_service(cache_client: CacheClient) -> EnhancedLLMService:
+    """Return the EnhancedLLMService bound to ``cache_client``, built once per client.
+
+    The service only holds settings, the shared OpenAI client and the cache, so one
+    instance can serve every request instead of being rebuilt per dependency call.
+    """
     return EnhancedLLMService(
         api_key=settings.openai_api_key.get_secret_value(),
-        cache=cache,
+        cache=cache_client,
         model=settings.llm_model,
         temperature=settings.llm_temperature,
     )
 
 
-def build_ocr_service() -> OCRService:
+def build_ocr_service(
+    cache: CacheClient = Depends(get_cache_client),  # noqa: B008
+) -> OCRService:
     """Factory helper for OCRService."""
     return OCRService(
         api_key=settings.openai_api_key.get_secret_value(),
@@ -36,6 +47,7 @@ def build_ocr_service() -> OCRService:
         max_image_dimension=settings.ocr_max_image_dimension,
         max_output_tokens=settings.ocr_max_output_tokens,
         timeout=settings.ocr_vision_timeout,
+        cache=cache,
     )
 
 
@@ -11,6 +11,7 @@ from uuid import UUID
 
 from fastapi import APIRouter, Depends, Query, Response, status
 from openai import OpenAIError
+from pydantic import TypeAdapter
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -30,6 +31,7 @@ from app.schemas.dialog import (
     PaginationMeta,
 )
 from app.services import DialogService, LLMService, ModerationService
+from app.services.moderation import load_blocklist
 from app.services.rate_limit import RateLimitedAction, rate_limit_service
 
 logger = logging.getLogger("app.api.dialog")
@@ -38,6 +40,9 @@ router = APIRouter(tags=["dialog"])
 
 MAX_PAGE_SIZE = 50
 MAX_HISTORY_WINDOW = 200
+
+# Built once so a history page is validated in a single call instead of one per message.
+_CHAT_MESSAGE_LIST_ADAPTER = TypeAdapter(list[ChatMessage])
 PROFILE_ID_FIELD = Query(
     description="Optional profile identifier. Defaults to the active profile.",
 )
@@ -66,6 +71,10 @@ async def get_dialog_service(
     moderation_service = ModerationService(
         api_key=settings.openai_api_key.get_secret_value(),
         model=settings.openai_moderation_model,
+        requests_per_minute=settings.moderation_rpm,
+        tokens_per_minute=settings.moderation_tpm,
+        blocklist=load_blocklist(settings.moderation_blocklist_path),
+        fast_path_max_chars=settings.moderation_fast_path_max_chars,
     )
     return DialogService(llm_service, conversation_repo, moderation_service)
 
@@ -210,7 +219,7 @@ async def get_dialog_history(
     count = len(subset)
     has_more = len(history) > slice_end
 
-    messages = [ChatMessage.model_validate(msg) for msg in reversed(subset)]
+    messages = _CHAT_MESSAGE_LIST_ADAPTER.validate_python(subset[::-1], from_attributes=True)
 
     pagination = PaginationMeta(
         limit=limit,
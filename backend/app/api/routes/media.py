@@ -133,8 +133,7 @@ async def analyze_images(
             known_lemmas=existing_lemmas,
         )
         suggestions_list = suggestions.suggestions
-        await llm_service.track_token_usage(
-            db_session=session,
+        llm_service.schedule_token_usage(
             user_id=str(user.id),
             profile_id=str(profile.id),
             usage=usage,
@@ -6,6 +6,9 @@ Implements caching strategies with configurable TTLs according to data types:
 - Generated flashcards: 30 days
 - Lemmas (base forms): permanent (no TTL)
 - Topic suggestions: 1 hour
+- OCR results per image: 1 day
+- Intent detection and answer checks (near-duplicate keys): 1 day
+- Unparseable LLM responses (negative cache): 1 minute
 """
 
 from __future__ import annotations
@@ -13,7 +16,9 @@ from __future__ import annotations
 import hashlib
 import json
 import logging
-from collections.abc import Awaitable, Coroutine
+import re
+from collections.abc import AsyncIterator, Awaitable, Coroutine, Mapping
+from contextlib import asynccontextmanager
 from functools import wraps
 from typing import TYPE_CHECKING, Any, Callable, Protocol, Set, TypeVar, cast
 
@@ -26,12 +31,17 @@ logger = logging.getLogger("app.core.cache")
 
 # Cache TTLs (Time To Live) in seconds
 TTL_30_DAYS = 30 * 24 * 3600  # 2592000 seconds
+TTL_1_DAY = 24 * 3600
 TTL_1_HOUR = 3600
 TTL_PERMANENT = None  # No expiration
+TTL_NEGATIVE = 60  # Short-lived markers for requests whose LLM output failed to parse
 
 
 T = TypeVar("T")
 
+_PUNCTUATION_RE = re.compile(r"[^\w\s]+")
+_WHITESPACE_RE = re.compile(r"\s+")
+
 
 class PydanticModel(Protocol):
     """Protocol for Pydantic models with JSON validation."""
@@ -46,6 +56,24 @@ class PydanticModel(Protocol):
         ...
 
 
+class RedisPipeline(Protocol):
+    """Subset of redis.asyncio pipeline operations (commands are queued until execute)."""
+
+    def set(self, key: str, value: str | bytes, ex: int | None = None) -> RedisPipeline: ...
+
+    def delete(self, *keys: str) -> RedisPipeline: ...
+
+    def expire(self, key: str, ttl: int, nx: bool = False) -> RedisPipeline: ...
+
+    def sadd(self, key: str, *members: str) -> RedisPipeline: ...
+
+    def scard(self, key: str) -> RedisPipeline: ...
+
+    async def execute(self) -> list[Any]: ...
+
+    async def reset(self) -> None: ...
+
+
 class RedisConnection(Protocol):
     """Subset of redis.asyncio client operations used by the cache."""
 
@@ -53,9 +81,11 @@ class RedisConnection(Protocol):
 
     async def get(self, key: str) -> str | None: ...
 
-    async def set(self, key: str, value: str) -> bool: ...
+    async def mget(self, *keys: str) -> list[str | None]: ...
 
-    async def setex(self, key: str, ttl: int, value: str) -> bool: ...
+    async def set(self, key: str, value: str | bytes) -> bool: ...
+
+    async def setex(self, key: str, ttl: int, value: str | bytes) -> bool: ...
 
     async def delete(self, *keys: str) -> int: ...
 
@@ -73,6 +103,8 @@ class RedisConnection(Protocol):
 
     async def srem(self, key: str, *members: str) -> int: ...
 
+    def pipeline(self, transaction: bool = True) -> RedisPipeline: ...
+
 
 class CacheClient:
     """Async Redis cache client for LLM responses."""
@@ -93,7 +125,10 @@ class CacheClient:
         if self._redis is None:
             redis_from_url = cast(Callable[..., Awaitable[RedisConnection]], aioredis.from_url)
             self._redis = await redis_from_url(
-                self.redis_url, encoding="utf-8", decode_responses=True
+                self.redis_url,
+                encoding="utf-8",
+                decode_responses=True,
+                socket_keepalive=True,
             )
             logger.info("Connected to Redis")
 
@@ -130,13 +165,36 @@ class CacheClient:
             logger.error("Cache get error", extra={"key": key, "error": str(e)})
             return None
 
-    async def set(self, key: str, value: str, ttl: int | None = None) -> bool:
+    async def mget(self, *keys: str) -> list[str | None]:
+        """
+        Get several values from cache with a single MGET command.
+
+        Args:
+            *keys: Cache keys
+
+        Returns:
+            Values aligned with ``keys`` (None for misses); all None on error
+        """
+        if not keys:
+            return []
+        try:
+            values = await self.redis.mget(*keys)
+            logger.debug(
+                "Cache mget",
+                extra={"keys": len(keys), "hits": sum(value is not None for value in values)},
+            )
+            return list(values)
+        except Exception as e:
+            logger.error("Cache mget error", extra={"keys": len(keys), "error": str(e)})
+            return [None] * len(keys)
+
+    async def set(self, key: str, value: str | bytes, ttl: int | None = None) -> bool:
         """
         Set value in cache with optional TTL.
 
         Args:
             key: Cache key
-            value: Value to cache
+            value: Value to cache (str or already-encoded UTF-8 bytes)
             ttl: Time to live in seconds (None for permanent)
 
         Returns:
@@ -153,24 +211,103 @@ class CacheClient:
             logger.error("Cache set error", extra={"key": key, "error": str(e)})
             return False
 
-    async def delete(self, key: str) -> bool:
+    async def delete(self, *keys: str) -> bool:
         """
-        Delete value from cache.
+        Delete one or more values from cache with a single DEL command.
 
         Args:
-            key: Cache key
+            *keys: Cache keys
 
         Returns:
-            True if key was deleted, False if key didn't exist or error occurred
+            True if any key was deleted, False if none existed or error occurred
         """
         try:
-            result = await self.redis.delete(key)
-            logger.debug("Cache delete", extra={"key": key, "deleted": bool(result)})
+            result = await self.redis.delete(*keys)
+            logger.debug("Cache delete", extra={"key": ",".join(keys), "deleted": bool(result)})
             return bool(result)
         except Exception as e:
-            logger.error("Cache delete error", extra={"key": key, "error": str(e)})
+            logger.error("Cache delete error", extra={"key": ",".join(keys), "error": str(e)})
+            return False
+
+    async def set_many(
+        self,
+        items: Mapping[str, str | bytes],
+        ttl: int | None = None,
+        *,
+        ttls: Mapping[str, int | None] | None = None,
+    ) -> bool:
+        """
+        Set several values with optional TTL in a single pipelined round-trip.
+
+        Args:
+            items: Mapping of cache key to value
+            ttl: Time to live in seconds applied to every key (None for permanent)
+            ttls: Per-key TTL overrides taking precedence over ``ttl``
+
+        Returns:
+            True if successful (or nothing to write), False otherwise
+        """
+        if not items:
+            return True
+        try:
+            async with self.pipeline() as pipe:
+                overrides = ttls or {}
+                for key, value in items.items():
+                    pipe.set(key, value, ex=overrides.get(key, ttl))
+                await pipe.execute()
+            logger.debug("Cache set_many", extra={"keys": len(items), "ttl": ttl})
+            return True
+        except Exception as e:
+            logger.error("Cache set_many error", extra={"keys": len(items), "error": str(e)})
             return False
 
+    async def add_to_set(self, key: str, member: str, ttl: int | None = None) -> tuple[bool, int]:
+        """
+        Add ``member`` to the set at ``key`` and return (added, set size) in one round-trip.
+
+        SADD is atomic, so among concurrent callers adding the same member exactly one
+        sees ``added``. ``ttl`` is applied only when the set has no expiry yet (EXPIRE NX),
+        so later additions do not extend its lifetime.
+
+        Args:
+            key: Cache key of the set
+            member: Member to add
+            ttl: Time to live in seconds for a newly created set (None for permanent)
+
+        Returns:
+            (True if the member was new, set size after the add); (False, 0) on error
+        """
+        try:
+            async with self.pipeline() as pipe:
+                pipe.sadd(key, member)
+                pipe.scard(key)
+                if ttl:
+                    pipe.expire(key, ttl, nx=True)
+                added, size, *_ = await pipe.execute()
+            logger.debug("Cache add_to_set", extra={"key": key, "added": bool(added)})
+            return bool(added), int(size)
+        except Exception as e:
+            logger.error("Cache add_to_set error", extra={"key": key, "error": str(e)})
+            return False, 0
+
+    @asynccontextmanager
+    async def pipeline(self) -> AsyncIterator[RedisPipeline]:
+        """
+        Queue several commands and send them to Redis in a single round-trip.
+
+        The pipeline is non-transactional; call ``await pipe.execute()`` inside the block.
+
+        Example:
+            async with cache.pipeline() as pipe:
+                pipe.set("a", "1", ex=60).delete("b")
+                await pipe.execute()
+        """
+        pipe = self.redis.pipeline(transaction=False)
+        try:
+            yield pipe
+        finally:
+            await pipe.reset()
+
     async def exists(self, key: str) -> bool:
         """
         Check if key exists in cache.
@@ -209,6 +346,44 @@ def topics_cache_key(profile_id: str) -> str:
     return f"topics:{profile_id}"
 
 
+def ocr_cache_key(content: bytes, language: str) -> str:
+    """Generate cache key for OCR output of a processed image in a target language."""
+    digest = hashlib.blake2b(content, digest_size=16).hexdigest()
+    return f"ocr:{language}:{digest}"
+
+
+def _text_signature(text: str, *, loose: bool) -> str:
+    """Hash text after collapsing whitespace (and, if ``loose``, case and punctuation)."""
+    if loose:
+        text = _PUNCTUATION_RE.sub(" ", text.casefold())
+    normalized = _WHITESPACE_RE.sub(" ", text).strip()
+    return hashlib.blake2b(normalized.encode(), digest_size=16).hexdigest()
+
+
+def intent_cache_key(message: str) -> str:
+    """
+    Generate near-duplicate cache key for intent detection.
+
+    Case, punctuation and whitespace are ignored, so "Translate 'casa'!" and
+    "translate casa" share an entry.
+    """
+    return f"intent:{_text_signature(message, loose=True)}"
+
+
+def answer_check_cache_key(
+    question: str, prompt: str, correct_answer: str, user_answer: str, level: str
+) -> str:
+    """
+    Generate near-duplicate cache key for grading an exercise answer.
+
+    Only whitespace in the learner's answer is normalized: case and punctuation can be
+    part of what is graded.
+    """
+    exercise = json.dumps([question, prompt, correct_answer, level], ensure_ascii=False)
+    exercise_hash = hashlib.blake2b(exercise.encode(), digest_size=16).hexdigest()
+    return f"answer_check:{exercise_hash}:{_text_signature(user_answer, loose=False)}"
+
+
 def generic_llm_cache_key(
     operation: str, **params: str | int | float | bool
 ) -> str:  # noqa: ANN401
@@ -230,11 +405,43 @@ def generic_llm_cache_key(
     return f"llm:{operation}:{param_hash}"
 
 
+def chat_response_cache_key(
+    model: str,
+    temperature: float,
+    max_tokens: int | None,
+    response_format: dict[str, Any] | None,
+    messages: list[dict[str, str]],
+) -> str:
+    """
+    Generate exact-match cache key for a raw chat completion request.
+
+    Every argument that changes the completion is part of the hashed payload, so two
+    requests share a key only when they would be sent to the provider verbatim.
+    """
+    payload = json.dumps(
+        [model, temperature, max_tokens, response_format, messages],
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    digest = hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+    return f"llm_chat:{model}:{digest}"
+
+
+def negative_cache_key(key: str) -> str:
+    """Generate cache key marking that the request behind ``key`` recently failed."""
+    return f"{key}:neg"
+
+
 def exercise_session_cache_key(exercise_id: str) -> str:
     """Cache key storing pending exercise data between requests."""
     return f"exercise_session:{exercise_id}"
 
 
+def exercise_difficulty_cache_key(topic_id: str) -> str:
+    """Cache key storing the adaptive difficulty bucket of a topic."""
+    return f"exercise_difficulty:{topic_id}"
+
+
 def cache_llm_response(
     ttl: int | None,
     key_builder: Callable[..., str],
@@ -322,13 +529,21 @@ def cache_llm_response(
 __all__ = [
     "CacheClient",
     "TTL_30_DAYS",
+    "TTL_1_DAY",
     "TTL_1_HOUR",
     "TTL_PERMANENT",
+    "TTL_NEGATIVE",
     "card_cache_key",
     "lemma_cache_key",
     "translation_cache_key",
+    "ocr_cache_key",
+    "intent_cache_key",
+    "answer_check_cache_key",
     "exercise_session_cache_key",
+    "exercise_difficulty_cache_key",
     "topics_cache_key",
     "generic_llm_cache_key",
+    "chat_response_cache_key",
+    "negative_cache_key",
     "cache_llm_response",
 ]
@@ -59,11 +59,40 @@ class Settings(BaseSettings):
     anthropic_api_key: SecretStr | None = Field(default=None, alias="ANTHROPIC_API_KEY")
     llm_model: str = Field(default="gpt-4.1-mini", alias="LLM_MODEL")
     llm_temperature: float = Field(default=0.7, alias="LLM_TEMPERATURE")
+    llm_max_concurrency: int = Field(
+        default=8,
+        alias="LLM_MAX_CONCURRENCY",
+        ge=1,
+        description="Maximum concurrent LLM calls per worker process for exercise flows.",
+    )
     openai_moderation_model: str = Field(
         default="omni-moderation-latest",
         alias="OPENAI_MODERATION_MODEL",
         description="OpenAI Moderation model identifier.",
     )
+    moderation_rpm: int = Field(
+        default=1000,
+        alias="MODERATION_RPM",
+        ge=1,
+        description="Requests per minute the moderation client allows itself.",
+    )
+    moderation_tpm: int = Field(
+        default=150_000,
+        alias="MODERATION_TPM",
+        ge=1,
+        description="Estimated input tokens per minute the moderation client allows itself.",
+    )
+    moderation_blocklist_path: str | None = Field(
+        default=None,
+        alias="MODERATION_BLOCKLIST_PATH",
+        description="Newline-separated blocklist enabling the local moderation fast path.",
+    )
+    moderation_fast_path_max_chars: int = Field(
+        default=20,
+        alias="MODERATION_FAST_PATH_MAX_CHARS",
+        ge=0,
+        description="Max length of short ASCII texts that skip the moderation API.",
+    )
     voice_transcription_model: str = Field(
         default="whisper-1",
         alias="VOICE_TRANSCRIPTION_MODEL",
@@ -204,6 +233,23 @@ class Settings(BaseSettings):
         alias="NOTIFICATION_WORKER_INTERVAL_SECONDS",
         description="Interval between streak reminder checks in seconds.",
     )
+    token_usage_writer_enabled: bool = Field(
+        default=False,
+        alias="TOKEN_USAGE_WRITER_ENABLED",
+        description="Buffer token usage rows and write them in background batches.",
+    )
+    token_usage_batch_size: int = Field(
+        default=500,
+        alias="TOKEN_USAGE_BATCH_SIZE",
+        description="Maximum token usage rows written per bulk insert.",
+        ge=1,
+    )
+    token_usage_flush_interval_seconds: float = Field(
+        default=2.0,
+        alias="TOKEN_USAGE_FLUSH_INTERVAL_SECONDS",
+        description="Interval between token usage flushes in seconds.",
+        gt=0,
+    )
     streak_reminder_window_start: int = Field(
         default=17,
         alias="STREAK_REMINDER_WINDOW_START",
@@ -9,10 +9,15 @@ from contextvars import ContextVar, Token
 from datetime import datetime, timezone
 from typing import Any, Final
 
+import orjson
+
 REQUEST_ID_CTX: Final[ContextVar[str | None]] = ContextVar("request_id", default=None)
 
 _LOGGING_CONFIGURED: bool = False
 
+# Non-string dict keys are stringified and unknown objects fall back to str() in one pass.
+_ORJSON_OPTIONS: Final[int] = orjson.OPT_NON_STR_KEYS
+
 
 class JsonLogFormatter(logging.Formatter):
     """Serialize log records into a JSON structure suitable for log aggregation."""
@@ -72,7 +77,11 @@ class JsonLogFormatter(logging.Formatter):
             log_entry["stack"] = stack_text.replace("\n", " | ")
 
         # Ensure single-line JSON output (no indentation)
-        return json.dumps(log_entry, ensure_ascii=True, separators=(",", ":"))
+        try:
+            return orjson.dumps(log_entry, default=str, option=_ORJSON_OPTIONS).decode()
+        except TypeError:
+            # orjson rejects values such as integers wider than 64 bits.
+            return json.dumps(log_entry, default=str, separators=(",", ":"))
 
     def _extract_extra_fields(self, record: logging.LogRecord) -> dict[str, Any]:
         extras: dict[str, Any] = {}
@@ -81,23 +90,9 @@ class JsonLogFormatter(logging.Formatter):
                 continue
             if value is None:
                 continue
-            extras[key] = self._normalize_value(value)
+            extras[key] = value
         return extras
 
-    @staticmethod
-    def _normalize_value(value: object) -> object:
-        if isinstance(value, (str, int, float, bool)):
-            return value
-        if value is None:
-            return None
-        if isinstance(value, (list, dict)):
-            try:
-                json.dumps(value)
-                return value
-            except TypeError:
-                return str(value)
-        return str(value)
-
 
 def configure_logging(level_name: str) -> None:
     """Configure root logging once with the JSON formatter."""
@@ -21,6 +21,7 @@ from app.core.version import APP_VERSION
 from app.services.notification_worker import notification_worker
 from app.services.rate_limit import rate_limit_service
 from app.services.rate_limit_worker import rate_limit_worker
+from app.services.token_usage_worker import token_usage_writer
 from app.telegram import telegram_bot
 
 ALLOWED_METHODS = ["GET", "POST", "PATCH", "PUT", "DELETE", "OPTIONS"]
@@ -78,6 +79,8 @@ def create_app() -> FastAPI:
             notification_worker.start()
         if settings.rate_limit_worker_enabled and rate_limit_service.enabled:
             rate_limit_worker.start()
+        if settings.token_usage_writer_enabled:
+            token_usage_writer.start()
 
     @application.on_event("shutdown")
     async def _shutdown_telegram_bot() -> None:
@@ -86,6 +89,8 @@ def create_app() -> FastAPI:
             await notification_worker.shutdown()
         if settings.rate_limit_worker_enabled and rate_limit_service.enabled:
             await rate_limit_worker.shutdown()
+        if settings.token_usage_writer_enabled:
+            await token_usage_writer.shutdown()
 
     return application
 
@@ -2,17 +2,21 @@
 
 from __future__ import annotations
 
-from collections.abc import Awaitable
+from collections.abc import Awaitable, Iterator, Sequence
 from typing import Generic, TypeVar, cast
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
 ModelT = TypeVar("ModelT")
+ItemT = TypeVar("ItemT")
 
 
 class BaseRepository(Generic[ModelT]):
     """Lightweight helper storing the AsyncSession dependency."""
 
+    # Keys per ``IN (...)`` query; keeps bulk lookups far below driver bind-parameter limits.
+    IN_CLAUSE_CHUNK_SIZE = 1000
+
     def __init__(self, session: AsyncSession) -> None:
         self.session = session
 
@@ -24,5 +28,11 @@ class BaseRepository(Generic[ModelT]):
         await self.session.flush()
         return instance
 
+    def _chunked(self, items: Sequence[ItemT]) -> Iterator[Sequence[ItemT]]:
+        """Split ``items`` into slices of at most ``IN_CLAUSE_CHUNK_SIZE`` entries."""
+        size = self.IN_CLAUSE_CHUNK_SIZE
+        for offset in range(0, len(items), size):
+            yield items[offset : offset + size]
+
 
 __all__ = ["BaseRepository"]
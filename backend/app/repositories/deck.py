@@ -5,7 +5,7 @@ from __future__ import annotations
 import uuid
 from collections.abc import Sequence
 
-from sqlalchemy import Select, select
+from sqlalchemy import Select, select, update
 from sqlalchemy.orm import selectinload
 
 from app.models.deck import Deck
@@ -58,6 +58,35 @@ class DeckRepository(BaseRepository[Deck]):
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def list_owned_by_ids(
+        self,
+        deck_ids: Sequence[uuid.UUID],
+        user_id: uuid.UUID,
+    ) -> list[Deck]:
+        """Return the subset of ``deck_ids`` that belongs to the user's active profiles."""
+        if not deck_ids:
+            return []
+        stmt = (
+            select(Deck)
+            .join(LanguageProfile, Deck.profile_id == LanguageProfile.id)
+            .where(
+                Deck.id.in_(deck_ids),
+                Deck.deleted.is_(False),
+                LanguageProfile.deleted.is_(False),
+                LanguageProfile.user_id == user_id,
+            )
+        )
+        result = await self.session.execute(stmt)
+        return list(result.scalars())
+
+    async def set_group_flag(self, deck_ids: Sequence[uuid.UUID], is_group: bool) -> None:
+        """Flip ``is_group`` for several decks with one UPDATE."""
+        if not deck_ids:
+            return
+        await self.session.execute(
+            update(Deck).where(Deck.id.in_(deck_ids)).values(is_group=is_group)
+        )
+
     async def list_by_ids(self, deck_ids: Sequence[uuid.UUID]) -> list[Deck]:
         if not deck_ids:
             return []
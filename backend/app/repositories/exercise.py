@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import uuid
 
-from sqlalchemy import Select, func, select
+from sqlalchemy import Select, func, insert, select
 from sqlalchemy.orm import selectinload
 
 from app.models.exercise import ExerciseHistory, ExerciseResultType, ExerciseType
@@ -31,23 +31,29 @@ class ExerciseHistoryRepository(BaseRepository[ExerciseHistory]):
         duration_seconds: int | None,
         metadata: dict[str, object] | None = None,
     ) -> ExerciseHistory:
-        entry = ExerciseHistory(
-            user_id=user_id,
-            profile_id=profile_id,
-            topic_id=topic_id,
-            type=exercise_type,
-            question=question,
-            prompt=prompt,
-            correct_answer=correct_answer,
-            user_answer=user_answer,
-            result=result,
-            explanation=explanation,
-            used_hint=used_hint,
-            duration_seconds=duration_seconds,
-            details=metadata or {},
+        # ORM-enabled INSERT ... RETURNING: one round-trip without unit-of-work bookkeeping,
+        # while still returning an entity attached to the session.
+        stmt = (
+            insert(ExerciseHistory)
+            .values(
+                user_id=user_id,
+                profile_id=profile_id,
+                topic_id=topic_id,
+                type=exercise_type,
+                question=question,
+                prompt=prompt,
+                correct_answer=correct_answer,
+                user_answer=user_answer,
+                result=result,
+                explanation=explanation,
+                used_hint=used_hint,
+                duration_seconds=duration_seconds,
+                details=metadata or {},
+            )
+            .returning(ExerciseHistory)
         )
-        await self.add(entry)
-        return entry
+        result_rows = await self.session.scalars(stmt)
+        return result_rows.one()
 
     async def list_for_user(
         self,
@@ -97,5 +103,28 @@ class ExerciseHistoryRepository(BaseRepository[ExerciseHistory]):
         result = await self.session.execute(stmt)
         return list(result.scalars())
 
+    async def difficulty_counts_for_topic(
+        self,
+        topic_id: uuid.UUID,
+        *,
+        limit: int = 10,
+    ) -> tuple[int, int, int]:
+        """Return ``(correct, partial, total)`` over the latest attempts of a topic."""
+        recent = (
+            select(ExerciseHistory.result)
+            .where(ExerciseHistory.topic_id == topic_id)
+            .order_by(ExerciseHistory.completed_at.desc())
+            .limit(limit)
+            .subquery()
+        )
+        stmt = select(
+            func.count().filter(recent.c.result == ExerciseResultType.CORRECT),
+            func.count().filter(recent.c.result == ExerciseResultType.PARTIAL),
+            func.count(),
+        ).select_from(recent)
+        result = await self.session.execute(stmt)
+        correct, partial, total = result.one()
+        return int(correct), int(partial), int(total)
+
 
 __all__ = ["ExerciseHistoryRepository"]
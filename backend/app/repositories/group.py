@@ -5,9 +5,13 @@ from __future__ import annotations
 import uuid
 from collections.abc import Sequence
 from datetime import datetime, timezone
+from typing import Any, cast
 
-from sqlalchemy import Select, func, select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import Select, and_, case, delete, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.sql.selectable import Subquery
 
 from app.models.deck import Deck
@@ -18,6 +22,7 @@ from app.models.group import (
     GroupMaterial,
     GroupMaterialType,
     GroupMember,
+    GroupRole,
 )
 from app.models.language_profile import LanguageProfile
 from app.models.topic import Topic
@@ -77,6 +82,45 @@ class GroupRepository(BaseRepository[Group]):
         result = await self.session.execute(stmt)
         return list(result.scalars().unique())
 
+    async def list_accessible(
+        self,
+        user_id: uuid.UUID,
+        *,
+        role: GroupRole | None = None,
+    ) -> list[tuple[Group, GroupRole, int]]:
+        """Return owned and joined groups with the user's role and materials count.
+
+        Owned groups come first; both parts are ordered by creation date.
+        """
+        is_owner = Group.owner_id == user_id
+        role_expr = case((is_owner, GroupRole.OWNER.value), else_=GroupRole.MEMBER.value)
+        materials_count = (
+            select(func.count())
+            .where(GroupMaterial.group_id == Group.id)
+            .correlate(Group)
+            .scalar_subquery()
+        )
+        stmt = (
+            select(Group, role_expr, materials_count)
+            .outerjoin(
+                GroupMember,
+                and_(GroupMember.group_id == Group.id, GroupMember.user_id == user_id),
+            )
+            .options(selectinload(Group.owner))
+            .where(Group.deleted.is_(False))
+            .order_by(is_owner.desc(), Group.created_at.asc())
+        )
+        if role == GroupRole.OWNER:
+            stmt = stmt.where(is_owner)
+        elif role == GroupRole.MEMBER:
+            stmt = stmt.where(Group.owner_id != user_id, GroupMember.id.is_not(None))
+        else:
+            stmt = stmt.where(or_(is_owner, GroupMember.id.is_not(None)))
+        result = await self.session.execute(stmt)
+        return [
+            (group, GroupRole(group_role), int(count)) for group, group_role, count in result.all()
+        ]
+
     async def get(self, group_id: uuid.UUID) -> Group | None:
         stmt = (
             select(Group)
@@ -86,6 +130,33 @@ class GroupRepository(BaseRepository[Group]):
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def get_with_role(
+        self,
+        group_id: uuid.UUID,
+        user_id: uuid.UUID,
+    ) -> tuple[Group, GroupRole | None] | None:
+        """Load a group with the user's role (``None`` when neither owner nor member)."""
+        role_expr = case(
+            (Group.owner_id == user_id, GroupRole.OWNER.value),
+            (GroupMember.id.is_not(None), GroupRole.MEMBER.value),
+            else_=None,
+        )
+        stmt = (
+            select(Group, role_expr)
+            .outerjoin(
+                GroupMember,
+                and_(GroupMember.group_id == Group.id, GroupMember.user_id == user_id),
+            )
+            .options(selectinload(Group.owner))
+            .where(Group.id == group_id, Group.deleted.is_(False))
+        )
+        result = await self.session.execute(stmt)
+        row = result.one_or_none()
+        if row is None:
+            return None
+        group, role = row
+        return group, GroupRole(role) if role is not None else None
+
     async def get_owned(self, group_id: uuid.UUID, owner_id: uuid.UUID) -> Group | None:
         stmt = (
             select(Group)
@@ -99,6 +170,25 @@ class GroupRepository(BaseRepository[Group]):
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def adjust_members_count(self, group: Group, delta: int) -> int:
+        """Atomically shift ``members_count`` by ``delta`` (never below the owner).
+
+        The increment happens in SQL so concurrent joins/leaves cannot lose updates; the
+        returned value is written back to ``group`` without marking it dirty.
+        """
+        shifted = Group.members_count + delta
+        stmt = (
+            update(Group)
+            .where(Group.id == group.id)
+            .values(members_count=case((shifted < 1, 1), else_=shifted))
+            .returning(Group.members_count)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(stmt)
+        members_count = int(result.scalar_one())
+        set_committed_value(group, "members_count", members_count)  # type: ignore[no-untyped-call]
+        return members_count
+
     async def soft_delete(self, group: Group) -> None:
         group.deleted = True
         group.deleted_at = datetime.now(tz=timezone.utc)
@@ -169,12 +259,11 @@ class GroupInviteRepository(BaseRepository[GroupInvite]):
         return invite
 
     async def get(self, invite_id: uuid.UUID) -> GroupInvite | None:
+        # Accept/decline/cancel read only ``invite.group``; joining the many-to-one keeps
+        # it in the same round-trip instead of a follow-up selectin query.
         stmt = (
             select(GroupInvite)
-            .options(
-                selectinload(GroupInvite.invitee),
-                selectinload(GroupInvite.group),
-            )
+            .options(joinedload(GroupInvite.group))
             .where(GroupInvite.id == invite_id)
         )
         result = await self.session.execute(stmt)
@@ -197,6 +286,63 @@ class GroupInviteRepository(BaseRepository[GroupInvite]):
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def get_invite_state(
+        self,
+        group_id: uuid.UUID,
+        invitee_id: uuid.UUID,
+    ) -> tuple[bool, uuid.UUID | None]:
+        """Return ``(is_member, pending_invite_id)`` for a prospective invitee in one query."""
+        is_member = (
+            select(GroupMember.id)
+            .where(GroupMember.group_id == group_id, GroupMember.user_id == invitee_id)
+            .exists()
+        )
+        pending_id = (
+            select(GroupInvite.id)
+            .where(
+                GroupInvite.group_id == group_id,
+                GroupInvite.invitee_id == invitee_id,
+                GroupInvite.status == GroupInviteStatus.PENDING,
+            )
+            .scalar_subquery()
+        )
+        result = await self.session.execute(select(is_member, pending_id))
+        member_flag, invite_id = result.one()
+        return bool(member_flag), invite_id
+
+    async def delete_owned(self, invite_id: uuid.UUID, owner_id: uuid.UUID) -> bool:
+        """Delete an invite of a live group owned by ``owner_id``; ``False`` if none matched."""
+        owned_groups = select(Group.id).where(Group.owner_id == owner_id, Group.deleted.is_(False))
+        stmt = delete(GroupInvite).where(
+            GroupInvite.id == invite_id,
+            GroupInvite.group_id.in_(owned_groups),
+        )
+        result = await self.session.execute(stmt)
+        rowcount = cast(Any, result).rowcount
+        return bool(rowcount)
+
+    async def expire_stale(
+        self,
+        now: datetime,
+        *,
+        group_id: uuid.UUID | None = None,
+    ) -> int:
+        """Mark every overdue pending invite as expired in one UPDATE."""
+        stmt = (
+            update(GroupInvite)
+            .where(
+                GroupInvite.status == GroupInviteStatus.PENDING,
+                GroupInvite.expires_at < now,
+            )
+            .values(status=GroupInviteStatus.EXPIRED, responded_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        if group_id is not None:
+            stmt = stmt.where(GroupInvite.group_id == group_id)
+        result = await self.session.execute(stmt)
+        rowcount = cast(Any, result).rowcount
+        return int(rowcount or 0)
+
     async def list_for_group(self, group_id: uuid.UUID) -> list[GroupInvite]:
         stmt = (
             select(GroupInvite)
@@ -206,6 +352,8 @@ class GroupInviteRepository(BaseRepository[GroupInvite]):
             )
             .where(GroupInvite.group_id == group_id)
             .order_by(GroupInvite.created_at.desc())
+            # Bulk status updates bypass the identity map; refresh already-loaded invites.
+            .execution_options(populate_existing=True)
         )
         result = await self.session.execute(stmt)
         return list(result.scalars().unique())
@@ -228,6 +376,54 @@ class GroupMaterialRepository(BaseRepository[GroupMaterial]):
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def delete_shared(
+        self,
+        group_id: uuid.UUID,
+        material_id: uuid.UUID,
+        material_type: GroupMaterialType,
+    ) -> bool:
+        """Unshare a material in one DELETE; ``False`` if it was not shared."""
+        stmt = delete(GroupMaterial).where(
+            GroupMaterial.group_id == group_id,
+            GroupMaterial.material_id == material_id,
+            GroupMaterial.material_type == material_type,
+        )
+        result = await self.session.execute(stmt)
+        rowcount = cast(Any, result).rowcount
+        return bool(rowcount)
+
+    async def bulk_add(
+        self,
+        group_id: uuid.UUID,
+        material_type: GroupMaterialType,
+        material_ids: Sequence[uuid.UUID],
+    ) -> set[uuid.UUID]:
+        """Share materials in one INSERT, returning the ids that were not shared yet."""
+        if not material_ids:
+            return set()
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "group_id": group_id,
+                "material_id": material_id,
+                "material_type": material_type,
+            }
+            for material_id in material_ids
+        ]
+        conflict_keys = ["group_id", "material_id", "material_type"]
+        if self.session.get_bind().dialect.name == "postgresql":
+            insert_stmt = pg_insert(GroupMaterial).values(rows)
+            stmt = insert_stmt.on_conflict_do_nothing(index_elements=conflict_keys).returning(
+                GroupMaterial.material_id
+            )
+        else:
+            sqlite_stmt = sqlite_insert(GroupMaterial).values(rows)
+            stmt = sqlite_stmt.on_conflict_do_nothing(index_elements=conflict_keys).returning(
+                GroupMaterial.material_id
+            )
+        result = await self.session.execute(stmt)
+        return set(result.scalars())
+
     async def list_for_group(
         self,
         group_id: uuid.UUID,
@@ -241,6 +437,40 @@ class GroupMaterialRepository(BaseRepository[GroupMaterial]):
         result = await self.session.execute(stmt)
         return list(result.scalars())
 
+    async def list_with_resources(
+        self,
+        group_id: uuid.UUID,
+        *,
+        material_type: GroupMaterialType | None = None,
+    ) -> list[tuple[GroupMaterial, Deck | None, Topic | None]]:
+        """Return shared materials with their live deck/topic (and owner) in one query."""
+        stmt = (
+            select(GroupMaterial, Deck, Topic)
+            .outerjoin(
+                Deck,
+                and_(
+                    GroupMaterial.material_type == GroupMaterialType.DECK,
+                    Deck.id == GroupMaterial.material_id,
+                    Deck.deleted.is_(False),
+                ),
+            )
+            .outerjoin(
+                Topic,
+                and_(
+                    GroupMaterial.material_type == GroupMaterialType.TOPIC,
+                    Topic.id == GroupMaterial.material_id,
+                    Topic.deleted.is_(False),
+                ),
+            )
+            .options(selectinload(Deck.owner), selectinload(Topic.owner))
+            .where(GroupMaterial.group_id == group_id)
+            .order_by(GroupMaterial.shared_at.desc())
+        )
+        if material_type is not None:
+            stmt = stmt.where(GroupMaterial.material_type == material_type)
+        result = await self.session.execute(stmt)
+        return [(material, deck, topic) for material, deck, topic in result.all()]
+
     async def count_for_groups(self, group_ids: Sequence[uuid.UUID]) -> dict[uuid.UUID, int]:
         if not group_ids:
             return {}
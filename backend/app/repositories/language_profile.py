@@ -3,15 +3,24 @@
 from __future__ import annotations
 
 import uuid
+from collections.abc import AsyncIterator, Collection
 from datetime import datetime, timezone
 
-from sqlalchemy import Select, func, select, update
-from sqlalchemy.orm import selectinload
+from sqlalchemy import Select, case, func, insert, select, update
+from sqlalchemy.orm import aliased, contains_eager
 
 from app.models.language_profile import LanguageProfile
 from app.models.user import User
 from app.repositories.base import BaseRepository
 
+# Eligibility shared by the reminder queries; callers join LanguageProfile to User.
+_REMINDER_FILTERS = (
+    LanguageProfile.deleted.is_(False),
+    LanguageProfile.is_active.is_(True),
+    LanguageProfile.streak > 0,
+    User.deleted.is_(False),
+)
+
 
 class LanguageProfileRepository(BaseRepository[LanguageProfile]):
     """Persistence helpers for LanguageProfile entities."""
@@ -39,6 +48,54 @@ class LanguageProfileRepository(BaseRepository[LanguageProfile]):
         result = await self.session.execute(stmt)
         return int(result.scalar_one())
 
+    async def precheck_for_create(
+        self,
+        user_id: uuid.UUID,
+        language: str,
+    ) -> tuple[int, bool, bool]:
+        """Return ``(profiles_count, has_language, has_active)`` for a user in one query."""
+        stmt = select(
+            func.count(),
+            func.count().filter(LanguageProfile.language == language),
+            func.count().filter(LanguageProfile.is_active.is_(True)),
+        ).where(
+            LanguageProfile.user_id == user_id,
+            LanguageProfile.deleted.is_(False),
+        )
+        result = await self.session.execute(stmt)
+        count, duplicates, active = result.one()
+        return int(count), bool(duplicates), bool(active)
+
+    async def create(
+        self,
+        *,
+        user_id: uuid.UUID,
+        language: str,
+        language_name: str,
+        current_level: str,
+        target_level: str,
+        goals: list[str],
+        interface_language: str,
+        is_active: bool,
+    ) -> LanguageProfile:
+        # INSERT ... RETURNING hands back server defaults without a follow-up refresh.
+        stmt = (
+            insert(LanguageProfile)
+            .values(
+                user_id=user_id,
+                language=language,
+                language_name=language_name,
+                current_level=current_level,
+                target_level=target_level,
+                goals=goals,
+                interface_language=interface_language,
+                is_active=is_active,
+            )
+            .returning(LanguageProfile)
+        )
+        result = await self.session.scalars(stmt)
+        return result.one()
+
     async def get_by_id_for_user(
         self,
         profile_id: uuid.UUID,
@@ -74,54 +131,142 @@ class LanguageProfileRepository(BaseRepository[LanguageProfile]):
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
-    async def get_alternate_profile(
-        self, user_id: uuid.UUID, *, exclude_id: uuid.UUID
+    async def swap_active(
+        self,
+        user_id: uuid.UUID,
+        profile_id: uuid.UUID,
     ) -> LanguageProfile | None:
+        """
+        Activate ``profile_id`` and deactivate the user's other profiles in one UPDATE.
+
+        Nothing is touched when ``profile_id`` is unknown, deleted or owned by someone else.
+        """
+        # The alias keeps the EXISTS guard from correlating to the UPDATE target.
+        target = aliased(LanguageProfile)
+        target_exists = (
+            select(target.id)
+            .where(
+                target.id == profile_id,
+                target.user_id == user_id,
+                target.deleted.is_(False),
+            )
+            .exists()
+        )
         stmt = (
-            select(LanguageProfile)
+            update(LanguageProfile)
             .where(
                 LanguageProfile.user_id == user_id,
                 LanguageProfile.deleted.is_(False),
-                LanguageProfile.id != exclude_id,
+                target_exists,
             )
-            .order_by(LanguageProfile.created_at.asc())
-            .limit(1)
+            .values(is_active=case((LanguageProfile.id == profile_id, True), else_=False))
+            .returning(LanguageProfile)
+            .execution_options(synchronize_session="fetch")
         )
-        result = await self.session.execute(stmt)
-        return result.scalar_one_or_none()
+        result = await self.session.scalars(stmt)
+        return next((profile for profile in result if profile.id == profile_id), None)
 
-    async def deactivate_user_profiles(
-        self, user_id: uuid.UUID, *, exclude: uuid.UUID | None = None
-    ) -> None:
-        stmt = update(LanguageProfile).where(
+    async def precheck_for_delete(
+        self,
+        user_id: uuid.UUID,
+        profile_id: uuid.UUID,
+    ) -> tuple[int, bool]:
+        """Return ``(profiles_count, profile_exists)`` for a user in one query."""
+        stmt = select(
+            func.count(),
+            func.count().filter(LanguageProfile.id == profile_id),
+        ).where(
             LanguageProfile.user_id == user_id,
             LanguageProfile.deleted.is_(False),
         )
-        if exclude is not None:
-            stmt = stmt.where(LanguageProfile.id != exclude)
-        await self.session.execute(stmt.values(is_active=False))
+        result = await self.session.execute(stmt)
+        count, matches = result.one()
+        return int(count), bool(matches)
 
-    async def soft_delete(self, profile: LanguageProfile) -> None:
-        profile.deleted = True
-        profile.deleted_at = datetime.now(tz=timezone.utc)
-        profile.is_active = False
-        await self.session.flush()
+    async def soft_delete_and_promote(
+        self,
+        user_id: uuid.UUID,
+        profile_id: uuid.UUID,
+    ) -> tuple[LanguageProfile | None, LanguageProfile | None]:
+        """
+        Soft delete a profile and, if no active profile remains, activate the oldest one.
 
-    async def list_active_with_users(self) -> list[LanguageProfile]:
-        """Return all active profiles with their owners loaded (used by reminders)."""
-        stmt: Select[tuple[LanguageProfile]] = (
-            select(LanguageProfile)
-            .join(User, LanguageProfile.user_id == User.id)
-            .options(selectinload(LanguageProfile.user))
+        Returns ``(deleted, replacement)``; ``deleted`` is None when the profile does not
+        exist and ``replacement`` is None when no promotion was needed or possible.
+        """
+        delete_stmt = (
+            update(LanguageProfile)
             .where(
+                LanguageProfile.id == profile_id,
+                LanguageProfile.user_id == user_id,
                 LanguageProfile.deleted.is_(False),
-                LanguageProfile.is_active.is_(True),
-                User.deleted.is_(False),
             )
-            .order_by(LanguageProfile.created_at.asc())
+            .values(deleted=True, deleted_at=datetime.now(tz=timezone.utc), is_active=False)
+            .returning(LanguageProfile)
+            .execution_options(synchronize_session="fetch")
+        )
+        deleted = (await self.session.scalars(delete_stmt)).one_or_none()
+        if deleted is None:
+            return None, None
+
+        # Aliases keep the subqueries from correlating to the UPDATE target.
+        candidate = aliased(LanguageProfile)
+        active = aliased(LanguageProfile)
+        oldest_remaining = (
+            select(candidate.id)
+            .where(candidate.user_id == user_id, candidate.deleted.is_(False))
+            .order_by(candidate.created_at.asc())
+            .limit(1)
+            .scalar_subquery()
+        )
+        has_active = (
+            select(active.id)
+            .where(
+                active.user_id == user_id,
+                active.deleted.is_(False),
+                active.is_active.is_(True),
+            )
+            .exists()
+        )
+        promote_stmt = (
+            update(LanguageProfile)
+            .where(LanguageProfile.id == oldest_remaining, ~has_active)
+            .values(is_active=True)
+            .returning(LanguageProfile)
+            .execution_options(synchronize_session="fetch")
+        )
+        replacement = (await self.session.scalars(promote_stmt)).one_or_none()
+        return deleted, replacement
+
+    async def list_reminder_timezones(self) -> list[str]:
+        """Return the distinct owner timezones among profiles eligible for streak reminders."""
+        stmt = (
+            select(User.timezone)
+            .join(LanguageProfile, LanguageProfile.user_id == User.id)
+            .where(*_REMINDER_FILTERS)
+            .distinct()
         )
         result = await self.session.execute(stmt)
         return list(result.scalars())
 
+    async def stream_reminder_candidates(
+        self,
+        timezones: Collection[str],
+        *,
+        batch_size: int = 500,
+    ) -> AsyncIterator[LanguageProfile]:
+        """Stream active profiles with a positive streak whose owner is in ``timezones``."""
+        stmt: Select[tuple[LanguageProfile]] = (
+            select(LanguageProfile)
+            .join(User, LanguageProfile.user_id == User.id)
+            .options(contains_eager(LanguageProfile.user))
+            .where(*_REMINDER_FILTERS, User.timezone.in_(timezones))
+            .order_by(LanguageProfile.created_at.asc())
+            .execution_options(yield_per=batch_size)
+        )
+        result = await self.session.stream_scalars(stmt)
+        async for profile in result:
+            yield profile
+
 
 __all__ = ["LanguageProfileRepository"]
@@ -3,10 +3,11 @@
 from __future__ import annotations
 
 import uuid
+from collections.abc import Sequence
 from datetime import date, datetime, timezone
 from typing import Any, cast
 
-from sqlalchemy import Select, delete, func, select, update
+from sqlalchemy import Select, delete, func, insert, select, update
 
 from app.models.notification import Notification, StreakReminder
 from app.repositories.base import BaseRepository
@@ -42,6 +43,11 @@ class NotificationRepository(BaseRepository[Notification]):
         total = int(total_result.scalar_one())
         return items, total
 
+    async def add_many(self, rows: Sequence[dict[str, Any]]) -> None:
+        """Insert notification rows with a single bulk INSERT."""
+        if rows:
+            await self.session.execute(insert(Notification), list(rows))
+
     async def count_unread(self, user_id: uuid.UUID) -> int:
         stmt = select(func.count()).where(
             Notification.user_id == user_id,
@@ -98,6 +104,25 @@ class StreakReminderRepository(BaseRepository[StreakReminder]):
         result = await self.session.execute(stmt)
         return bool(result.scalar_one())
 
+    async def was_sent_on_for_dates(
+        self,
+        keys: Sequence[tuple[uuid.UUID, uuid.UUID, date]],
+    ) -> set[tuple[uuid.UUID, uuid.UUID, date]]:
+        """Return the (user_id, profile_id, sent_date) keys that already have a reminder."""
+        found: set[tuple[uuid.UUID, uuid.UUID, date]] = set()
+        for chunk in self._chunked(keys):
+            stmt = select(
+                StreakReminder.user_id,
+                StreakReminder.profile_id,
+                StreakReminder.sent_date,
+            ).where(
+                StreakReminder.profile_id.in_({profile_id for _, profile_id, _ in chunk}),
+                StreakReminder.sent_date.in_({sent_date for _, _, sent_date in chunk}),
+            )
+            result = await self.session.execute(stmt)
+            found.update((row.user_id, row.profile_id, row.sent_date) for row in result.all())
+        return found & set(keys)
+
     async def log_sent(
         self,
         user_id: uuid.UUID,
@@ -115,6 +140,29 @@ class StreakReminderRepository(BaseRepository[StreakReminder]):
         await self.add(reminder)
         return reminder
 
+    async def log_sent_many(
+        self,
+        keys: Sequence[tuple[uuid.UUID, uuid.UUID, date]],
+        *,
+        sent_at: datetime | None = None,
+    ) -> None:
+        """Record reminders for many (user_id, profile_id, sent_date) keys in one INSERT."""
+        if not keys:
+            return
+        timestamp = sent_at or datetime.now(tz=timezone.utc)
+        await self.session.execute(
+            insert(StreakReminder),
+            [
+                {
+                    "user_id": user_id,
+                    "profile_id": profile_id,
+                    "sent_date": sent_date,
+                    "sent_at": timestamp,
+                }
+                for user_id, profile_id, sent_date in keys
+            ],
+        )
+
     async def cleanup_before(self, cutoff: date) -> int:
         stmt = delete(StreakReminder).where(StreakReminder.sent_date < cutoff)
         result = await self.session.execute(stmt)
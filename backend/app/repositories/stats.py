@@ -6,6 +6,7 @@ import dataclasses
 import math
 import uuid
 from collections import defaultdict
+from collections.abc import Sequence
 from datetime import date, datetime
 
 from sqlalchemy import Select, func, select
@@ -252,6 +253,64 @@ class StatsRepository(BaseRepository[object]):
             return exercise_last if exercise_last >= review_last else review_last
         return exercise_last or review_last
 
+    async def last_activity_for(
+        self,
+        user_profile_ids: Sequence[tuple[uuid.UUID, uuid.UUID]],
+    ) -> dict[tuple[uuid.UUID, uuid.UUID], datetime]:
+        """Return ``last_activity`` for many (user_id, profile_id) pairs, two queries per chunk."""
+        requested = set(user_profile_ids)
+        latest: dict[tuple[uuid.UUID, uuid.UUID], datetime] = {}
+        for chunk in self._chunked(user_profile_ids):
+            for stmt in self._last_activity_statements(chunk):
+                result = await self.session.execute(stmt)
+                for user_id, profile_id, timestamp in result.all():
+                    key = (user_id, profile_id)
+                    if timestamp is None or key not in requested:
+                        continue
+                    current = latest.get(key)
+                    if current is None or timestamp > current:
+                        latest[key] = timestamp
+        return latest
+
+    @staticmethod
+    def _last_activity_statements(
+        user_profile_ids: Sequence[tuple[uuid.UUID, uuid.UUID]],
+    ) -> tuple[Select[tuple[uuid.UUID, uuid.UUID, datetime]], ...]:
+        user_ids = {user_id for user_id, _ in user_profile_ids}
+        profile_ids = {profile_id for _, profile_id in user_profile_ids}
+
+        exercise_stmt = (
+            select(
+                ExerciseHistory.user_id,
+                ExerciseHistory.profile_id,
+                func.max(ExerciseHistory.completed_at),
+            )
+            .where(
+                ExerciseHistory.user_id.in_(user_ids),
+                ExerciseHistory.profile_id.in_(profile_ids),
+            )
+            .group_by(ExerciseHistory.user_id, ExerciseHistory.profile_id)
+        )
+
+        CardAlias = aliased(Card)
+        review_stmt = (
+            select(CardReview.user_id, LanguageProfile.id, func.max(CardReview.reviewed_at))
+            .select_from(CardReview)
+            .join(CardAlias, CardReview.card_id == CardAlias.id)
+            .join(Deck, CardAlias.deck_id == Deck.id)
+            .join(LanguageProfile, Deck.profile_id == LanguageProfile.id)
+            .where(
+                CardReview.user_id.in_(user_ids),
+                LanguageProfile.id.in_(profile_ids),
+                LanguageProfile.user_id == CardReview.user_id,
+                LanguageProfile.deleted.is_(False),
+                Deck.deleted.is_(False),
+                CardAlias.deleted.is_(False),
+            )
+            .group_by(CardReview.user_id, LanguageProfile.id)
+        )
+        return exercise_stmt, review_stmt
+
 
 def _normalize_date(raw: date | datetime | str) -> date:
     """Convert various SQL date representations to date objects."""
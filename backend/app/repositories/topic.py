@@ -67,6 +67,57 @@ class TopicRepository(BaseRepository[Topic]):
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def get_with_profile_for_user(
+        self,
+        topic_id: uuid.UUID,
+        user_id: uuid.UUID,
+    ) -> tuple[Topic, LanguageProfile] | None:
+        """Load a user's topic together with its language profile in one query."""
+        stmt = (
+            select(Topic, LanguageProfile)
+            .join(LanguageProfile, Topic.profile_id == LanguageProfile.id)
+            .where(
+                Topic.id == topic_id,
+                Topic.deleted.is_(False),
+                LanguageProfile.deleted.is_(False),
+                LanguageProfile.user_id == user_id,
+            )
+        )
+        result = await self.session.execute(stmt)
+        row = result.one_or_none()
+        if row is None:
+            return None
+        return row[0], row[1]
+
+    async def list_owned_by_ids(
+        self,
+        topic_ids: Sequence[uuid.UUID],
+        user_id: uuid.UUID,
+    ) -> list[Topic]:
+        """Return the subset of ``topic_ids`` that belongs to the user's active profiles."""
+        if not topic_ids:
+            return []
+        stmt = (
+            select(Topic)
+            .join(LanguageProfile, Topic.profile_id == LanguageProfile.id)
+            .where(
+                Topic.id.in_(topic_ids),
+                Topic.deleted.is_(False),
+                LanguageProfile.deleted.is_(False),
+                LanguageProfile.user_id == user_id,
+            )
+        )
+        result = await self.session.execute(stmt)
+        return list(result.scalars())
+
+    async def set_group_flag(self, topic_ids: Sequence[uuid.UUID], is_group: bool) -> None:
+        """Flip ``is_group`` for several topics with one UPDATE."""
+        if not topic_ids:
+            return
+        await self.session.execute(
+            update(Topic).where(Topic.id.in_(topic_ids)).values(is_group=is_group)
+        )
+
     async def list_by_ids(self, topic_ids: Sequence[uuid.UUID]) -> list[Topic]:
         if not topic_ids:
             return []
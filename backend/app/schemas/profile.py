@@ -58,7 +58,7 @@ class LanguageProfileCreate(BaseModel):
     @field_validator("goals")
     @classmethod
     def _strip_goals(cls, goals: list[str]) -> list[str]:
-        return [goal.strip() for goal in goals if goal.strip()]
+        return [stripped for goal in goals if (stripped := goal.strip())]
 
 
 class LanguageProfileUpdate(BaseModel):
@@ -76,7 +76,7 @@ class LanguageProfileUpdate(BaseModel):
     def _strip_optional_goals(cls, goals: list[str] | None) -> list[str] | None:
         if goals is None:
             return None
-        cleaned = [goal.strip() for goal in goals if goal.strip()]
+        cleaned = [stripped for goal in goals if (stripped := goal.strip())]
         return cleaned or None
 
     @model_validator(mode="after")
@@ -114,15 +114,18 @@ class CardService:
             )
 
         result = CardCreateResult()
-        for word in payload.words:
+        outcomes = await llm_service.generate_cards_batch(
+            words=payload.words,
+            language=profile.language,
+            language_name=profile.language_name,
+            level=profile.current_level,
+            goals=profile.goals,
+        )
+        for word, outcome in zip(payload.words, outcomes, strict=True):
             try:
-                card_content, usage = await llm_service.generate_card(
-                    word=word,
-                    language=profile.language,
-                    language_name=profile.language_name,
-                    level=profile.current_level,
-                    goals=profile.goals,
-                )
+                if isinstance(outcome, BaseException):
+                    raise outcome
+                card_content, usage = outcome
 
                 duplicate = await self.card_repo.find_by_lemma(deck.id, card_content.lemma)
                 if duplicate:
@@ -144,8 +147,7 @@ class CardService:
                 )
 
                 await self.card_repo.add(card)
-                await llm_service.track_token_usage(
-                    db_session=self.card_repo.session,
+                llm_service.schedule_token_usage(
                     user_id=str(user.id),
                     profile_id=str(profile.id),
                     usage=usage,
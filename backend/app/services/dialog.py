@@ -73,10 +73,15 @@ class DialogService:
         Returns:
             Default language profile
         """
-        # Try to find an active profile
-        stmt = select(LanguageProfile).where(
-            LanguageProfile.user_id == user.id,
-            LanguageProfile.deleted == False,  # noqa: E712
+        # Prefer the active profile, else the oldest one; only that single row is loaded.
+        stmt = (
+            select(LanguageProfile)
+            .where(
+                LanguageProfile.user_id == user.id,
+                LanguageProfile.deleted == False,  # noqa: E712
+            )
+            .order_by(LanguageProfile.is_active.desc(), LanguageProfile.created_at.asc())
+            .limit(1)
         )
         result = await session.execute(stmt)
         profile = result.scalar_one_or_none()
@@ -301,7 +306,7 @@ class DialogService:
                     "user_id": str(user.id),
                     "response_length": len(response),
                     "tokens_used": usage.total_tokens,
-                    "estimated_cost": f"${usage.estimated_cost:.6f}",
+                    "estimated_cost": round(usage.estimated_cost, 6),
                 },
             )
 
@@ -2,15 +2,26 @@
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import logging
 import uuid
-from copy import deepcopy
+from typing import Any
 
+import orjson
+from pydantic import TypeAdapter, ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.cache import CacheClient, exercise_session_cache_key
+from app.core.cache import (
+    CacheClient,
+    exercise_difficulty_cache_key,
+    exercise_session_cache_key,
+    generic_llm_cache_key,
+)
+from app.core.config import settings
 from app.core.errors import ApplicationError, ErrorCode, NotFoundError
 from app.models.exercise import ExerciseHistory, ExerciseResultType, ExerciseType
+from app.models.language_profile import LanguageProfile
 from app.models.topic import Topic
 from app.models.user import User
 from app.repositories.exercise import ExerciseHistoryRepository
@@ -23,16 +34,44 @@ from app.schemas.exercise import (
     GeneratedExerciseResponse,
     PendingExercise,
 )
+from app.schemas.llm_responses import ExerciseContent, Mistake
 from app.services.llm import TokenUsage
 from app.services.llm_enhanced import EnhancedLLMService
 
 logger = logging.getLogger("app.services.exercises")
 
+_MISTAKE_LIST_ADAPTER = TypeAdapter(list[Mistake])
+_DIFFICULTY_LEVELS = frozenset({"easy", "medium", "hard"})
+
+# Process-wide cap on concurrent LLM calls; services are request-scoped so it lives here.
+_llm_semaphore = asyncio.Semaphore(settings.llm_max_concurrency)
+# Exercise generations currently in flight, keyed by cache key (single-flight guard).
+_inflight_generations: dict[str, asyncio.Event] = {}
+
+
+def _served_to_key(key: str, payload: str | bytes) -> str:
+    """
+    Key of the Redis set recording who a cached exercise was served to.
+
+    The set is keyed by the payload digest, so a regenerated entry under the same cache
+    key starts with an empty audience instead of inheriting the previous one.
+    """
+    data = payload.encode() if isinstance(payload, str) else payload
+    return f"{key}:served_to:{hashlib.blake2b(data, digest_size=8).hexdigest()}"
+
+
+def _merged_metadata(base: dict[str, Any], extra: dict[str, Any]) -> dict[str, Any]:
+    """Return a new dict with ``extra`` layered over ``base`` (shallow, single pass)."""
+    return {**base, **extra}
+
 
 class ExerciseService:
     """Generate exercises with the LLM, check answers, and persist history."""
 
     SESSION_TTL_SECONDS = 900  # 15 minutes
+    DIFFICULTY_TTL_SECONDS = 90
+    GENERATED_EXERCISE_TTL_SECONDS = 600
+    GENERATED_EXERCISE_MAX_SERVES = 20
 
     def __init__(
         self,
@@ -47,6 +86,7 @@ class ExerciseService:
         self.profile_repo = profile_repo
         self.llm_service = llm_service
         self.cache = cache
+        self._llm_semaphore = _llm_semaphore
 
     @property
     def session(self) -> AsyncSession:
@@ -59,13 +99,7 @@ class ExerciseService:
         request: ExerciseGenerateRequest,
     ) -> GeneratedExerciseResponse:
         """Generate an exercise for the selected topic."""
-        topic = await self._get_topic_for_user(user, request.topic_id)
-        profile = await self.profile_repo.get_by_id_for_user(topic.profile_id, user.id)
-        if profile is None:
-            raise NotFoundError(
-                code=ErrorCode.PROFILE_NOT_FOUND,
-                message="??????? ?? ??????.",
-            )
+        topic, profile = await self._get_topic_with_profile(user, request.topic_id)
 
         difficulty = await self._determine_difficulty(topic.id)
         metadata: dict[str, object] = {
@@ -73,13 +107,13 @@ class ExerciseService:
             "topic_type": topic.type.value,
         }
 
-        exercise, usage = await self.llm_service.generate_exercise(
-            topic_name=topic.name,
-            topic_description=topic.description or "",
-            topic_type=topic.type.value,
+        exercise, usage = await self._generate_exercise_content(
+            user=user,
+            topic=topic,
             level=profile.current_level,
             language=profile.language,
-            exercise_type=request.type.value,
+            exercise_type=request.type,
+            difficulty=difficulty,
         )
 
         metadata.update(
@@ -108,24 +142,26 @@ class ExerciseService:
         )
 
         await self._store_session(pending)
-        await self.llm_service.track_token_usage(
-            db_session=self.session,
-            user_id=str(user.id),
-            profile_id=str(profile.id),
-            usage=usage,
-            operation="generate_exercise",
-        )
+        if usage is not None:
+            self.llm_service.schedule_token_usage(
+                user_id=str(user.id),
+                profile_id=str(profile.id),
+                usage=usage,
+                operation="generate_exercise",
+            )
 
-        logger.info(
-            "Exercise generated",
-            extra={
-                "user_id": str(user.id),
-                "topic_id": str(topic.id),
-                "exercise_type": request.type.value,
-            },
-        )
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Exercise generated",
+                extra={
+                    "user_id": str(user.id),
+                    "topic_id": str(topic.id),
+                    "exercise_type": request.type.value,
+                },
+            )
 
-        return GeneratedExerciseResponse(
+        # Fields come from the already validated PendingExercise, so skip re-validation.
+        return GeneratedExerciseResponse.model_construct(
             id=pending.id,
             topic_id=pending.topic_id,
             type=pending.type,
@@ -144,23 +180,23 @@ class ExerciseService:
         payload: ExerciseSubmitRequest,
     ) -> ExerciseSubmissionResponse:
         """Check the answer and persist the attempt."""
-        pending = await self._load_session(exercise_id)
+        session_key = exercise_session_cache_key(str(exercise_id))
+        pending = await self._load_session_by_key(session_key)
         if pending.user_id != user.id:
             raise NotFoundError(
                 code=ErrorCode.NOT_FOUND,
                 message="?????????? ?? ??????. ?????????? ??????????? ???????.",
             )
 
-        topic = await self._get_topic_for_user(user, pending.topic_id)
-        profile = await self.profile_repo.get_by_id_for_user(pending.profile_id, user.id)
-        if profile is None:
+        topic, profile = await self._get_topic_with_profile(user, pending.topic_id)
+        if profile.id != pending.profile_id:
             raise NotFoundError(
                 code=ErrorCode.PROFILE_NOT_FOUND,
                 message="??????? ?? ??????.",
             )
 
         if pending.type == ExerciseType.MULTIPLE_CHOICE:
-            submission, user_answer_text = await self._grade_multiple_choice(pending, payload)
+            submission, user_answer_text = self._grade_multiple_choice(pending, payload)
             usage = None
         else:
             submission, usage, user_answer_text = await self._grade_free_text(
@@ -177,13 +213,14 @@ class ExerciseService:
             duration_seconds=payload.duration_seconds,
         )
 
-        await self.topic_repo.update_stats(topic, submission.result)
-        await self.session.flush()
-        await self._delete_session(exercise_id)
+        # update_stats flushes on its own; overlap that round-trip with the Redis delete,
+        # which also drops the cached difficulty now that the topic has a new attempt.
+        async with asyncio.TaskGroup() as task_group:
+            task_group.create_task(self.topic_repo.update_stats(topic, submission.result))
+            task_group.create_task(self._delete_session_by_key(session_key, topic.id))
 
         if usage is not None:
-            await self.llm_service.track_token_usage(
-                db_session=self.session,
+            self.llm_service.schedule_token_usage(
                 user_id=str(user.id),
                 profile_id=str(profile.id),
                 usage=usage,
@@ -204,7 +241,97 @@ class ExerciseService:
             return pending.hint
         return "?????????, ??????? ?? ???????? ? ????????? ?????????."
 
-    async def _grade_multiple_choice(
+    async def _generate_exercise_content(
+        self,
+        *,
+        user: User,
+        topic: Topic,
+        level: str,
+        language: str,
+        exercise_type: ExerciseType,
+        difficulty: str,
+    ) -> tuple[ExerciseContent, TokenUsage | None]:
+        """
+        Return exercise content, reusing a recently generated one when possible.
+
+        Topics are per-profile, so the cache key is built from the topic content rather
+        than its id to let learners with equivalent topics share generations. A Redis set
+        next to each entry records who it was served to so nobody receives it twice.
+        Concurrent misses for the same key wait for the in-flight generation instead of
+        calling the LLM again. Usage is None when the content came from the cache.
+        """
+        key = generic_llm_cache_key(
+            "generate_exercise",
+            language=language,
+            level=level,
+            topic_type=topic.type.value,
+            topic_name=topic.name.strip().lower(),
+            topic_description=(topic.description or "").strip().lower(),
+            exercise_type=exercise_type.value,
+            difficulty=difficulty,
+        )
+        user_marker = str(user.id)
+
+        cached = await self._take_cached_exercise(key, user_marker)
+        if cached is not None:
+            return cached, None
+
+        inflight = _inflight_generations.get(key)
+        if inflight is not None:
+            await inflight.wait()
+            cached = await self._take_cached_exercise(key, user_marker)
+            if cached is not None:
+                return cached, None
+
+        done = asyncio.Event()
+        _inflight_generations.setdefault(key, done)
+        try:
+            async with self._llm_semaphore:
+                exercise, usage = await self.llm_service.generate_exercise(
+                    topic_name=topic.name,
+                    topic_description=topic.description or "",
+                    topic_type=topic.type.value,
+                    level=level,
+                    language=language,
+                    exercise_type=exercise_type.value,
+                )
+
+            ttl = self.GENERATED_EXERCISE_TTL_SECONDS
+            payload = orjson.dumps(exercise.model_dump(mode="json"))
+            await self.cache.set(key, payload, ttl=ttl)
+            await self.cache.add_to_set(_served_to_key(key, payload), user_marker, ttl=ttl)
+        finally:
+            if _inflight_generations.get(key) is done:
+                del _inflight_generations[key]
+            done.set()
+        return exercise, usage
+
+    async def _take_cached_exercise(self, key: str, user_marker: str) -> ExerciseContent | None:
+        """Return a cached exercise not yet served to the user and mark it as served."""
+        cached = await self.cache.get(key)
+        if not cached:
+            return None
+        try:
+            exercise = ExerciseContent.model_validate(orjson.loads(cached))
+        except (orjson.JSONDecodeError, ValidationError) as exc:
+            logger.warning(
+                "Ignoring malformed cached exercise",
+                extra={"cache_key": key, "error": str(exc)},
+            )
+            return None
+
+        # SADD decides atomically who gets the entry; the set keeps its first TTL.
+        served_key = _served_to_key(key, cached)
+        added, served = await self.cache.add_to_set(
+            served_key, user_marker, ttl=self.GENERATED_EXERCISE_TTL_SECONDS
+        )
+        if not added:
+            return None
+        if served >= self.GENERATED_EXERCISE_MAX_SERVES:
+            await self.cache.delete(key, served_key)
+        return exercise
+
+    def _grade_multiple_choice(
         self,
         pending: PendingExercise,
         payload: ExerciseSubmitRequest,
@@ -236,7 +363,7 @@ class ExerciseService:
         )
 
         user_answer = pending.options[index]
-        submission = ExerciseSubmissionResponse(
+        submission = ExerciseSubmissionResponse.model_construct(
             result=result,
             correct_answer=pending.options[pending.correct_index],
             explanation=pending.explanation,
@@ -260,13 +387,14 @@ class ExerciseService:
             )
         user_answer = payload.answer.strip()
 
-        result_data, usage = await self.llm_service.check_answer(
-            question=pending.question,
-            prompt=pending.prompt,
-            correct_answer=pending.correct_answer,
-            user_answer=user_answer,
-            level=level,
-        )
+        async with self._llm_semaphore:
+            result_data, usage = await self.llm_service.check_answer(
+                question=pending.question,
+                prompt=pending.prompt,
+                correct_answer=pending.correct_answer,
+                user_answer=user_answer,
+                level=level,
+            )
 
         submission = ExerciseSubmissionResponse(
             result=ExerciseResultType(result_data.result),
@@ -277,10 +405,11 @@ class ExerciseService:
             mistakes=result_data.mistakes or [],
         )
 
-        logger.info(
-            "Graded free-text exercise",
-            extra={"user_id": str(user.id), "result": submission.result.value},
-        )
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Graded free-text exercise",
+                extra={"user_id": str(user.id), "result": submission.result.value},
+            )
 
         return submission, usage, user_answer
 
@@ -295,13 +424,14 @@ class ExerciseService:
         used_hint: bool,
         duration_seconds: int | None,
     ) -> None:
-        metadata = deepcopy(pending.metadata)
-        metadata.update(
+        # The pending session is discarded right after, so a shallow merge is enough.
+        metadata = _merged_metadata(
+            pending.metadata,
             {
                 "alternatives": submission.alternatives,
                 "feedback": submission.feedback,
-                "mistakes": [mistake.model_dump() for mistake in submission.mistakes],
-            }
+                "mistakes": _MISTAKE_LIST_ADAPTER.dump_python(submission.mistakes, mode="json"),
+            },
         )
 
         await self.history_repo.record_attempt(
@@ -322,31 +452,43 @@ class ExerciseService:
 
     async def _store_session(self, pending: PendingExercise) -> None:
         key = exercise_session_cache_key(str(pending.id))
-        await self.cache.set(key, pending.model_dump_json(), ttl=self.SESSION_TTL_SECONDS)
+        payload = orjson.dumps(pending.model_dump(mode="json"))
+        await self.cache.set(key, payload, ttl=self.SESSION_TTL_SECONDS)
 
     async def _load_session(self, exercise_id: uuid.UUID) -> PendingExercise:
-        key = exercise_session_cache_key(str(exercise_id))
+        return await self._load_session_by_key(exercise_session_cache_key(str(exercise_id)))
+
+    async def _load_session_by_key(self, key: str) -> PendingExercise:
         payload = await self.cache.get(key)
         if not payload:
             raise NotFoundError(
                 code=ErrorCode.NOT_FOUND,
                 message="?????????? ?? ?????? ? ??????? ????????.",
             )
-        return PendingExercise.model_validate_json(payload)
+        return PendingExercise.model_validate(orjson.loads(payload))
 
-    async def _delete_session(self, exercise_id: uuid.UUID) -> None:
-        key = exercise_session_cache_key(str(exercise_id))
-        await self.cache.delete(key)
+    async def _delete_session_by_key(self, key: str, topic_id: uuid.UUID) -> None:
+        await self.cache.delete(key, exercise_difficulty_cache_key(str(topic_id)))
 
     async def _determine_difficulty(self, topic_id: uuid.UUID) -> str:
-        """Infer difficulty bucket from the latest attempts."""
-        recent = await self.history_repo.last_results_for_topic(topic_id, limit=10)
-        if len(recent) < 3:
+        """Infer difficulty bucket from the latest attempts (cached briefly per topic)."""
+        key = exercise_difficulty_cache_key(str(topic_id))
+        cached = await self.cache.get(key)
+        if cached in _DIFFICULTY_LEVELS:
+            return str(cached)
+
+        difficulty = await self._compute_difficulty(topic_id)
+        await self.cache.set(key, difficulty, ttl=self.DIFFICULTY_TTL_SECONDS)
+        return difficulty
+
+    async def _compute_difficulty(self, topic_id: uuid.UUID) -> str:
+        correct, partial, total = await self.history_repo.difficulty_counts_for_topic(
+            topic_id, limit=10
+        )
+        if total < 3:
             return "medium"
 
-        correct = sum(1 for attempt in recent if attempt.result == ExerciseResultType.CORRECT)
-        partial = sum(1 for attempt in recent if attempt.result == ExerciseResultType.PARTIAL)
-        accuracy = (correct + partial * 0.5) / len(recent)
+        accuracy = (correct + partial * 0.5) / total
 
         if accuracy < 0.4:
             return "easy"
@@ -354,14 +496,17 @@ class ExerciseService:
             return "hard"
         return "medium"
 
-    async def _get_topic_for_user(self, user: User, topic_id: uuid.UUID) -> Topic:
-        topic = await self.topic_repo.get_for_user(topic_id, user.id)
-        if topic is None:
+    async def _get_topic_with_profile(
+        self, user: User, topic_id: uuid.UUID
+    ) -> tuple[Topic, LanguageProfile]:
+        """Load the topic and its profile in a single round-trip (ownership enforced in SQL)."""
+        loaded = await self.topic_repo.get_with_profile_for_user(topic_id, user.id)
+        if loaded is None:
             raise NotFoundError(
                 code=ErrorCode.TOPIC_NOT_FOUND,
                 message="???? ?? ??????.",
             )
-        return topic
+        return loaded
 
     async def list_history(
         self,
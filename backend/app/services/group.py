@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import re
 import uuid
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
 from typing import Sequence
 
@@ -14,7 +14,6 @@ from app.models.group import (
     Group,
     GroupInvite,
     GroupInviteStatus,
-    GroupMaterial,
     GroupMaterialType,
     GroupRole,
 )
@@ -36,6 +35,17 @@ FREE_GROUP_MEMBERS = 5
 PREMIUM_GROUP_MEMBERS = 100
 INVITE_TTL_DAYS = 7
 
+_WHITESPACE_RE = re.compile(r"\s+")
+_ANGLE_BRACKETS_RE = re.compile(r"[<>]")
+# @username | [https://]t.me/[.../]@username | telegram id | bare username
+_IDENTIFIER_RE = re.compile(
+    r"@(?P<mention>.*)"
+    r"|(?:https://)?t\.me/(?:.*/)?@*(?P<link>[^/]*)"
+    r"|(?P<telegram_id>\d+)"
+    r"|(?P<username>.*)",
+    re.IGNORECASE | re.DOTALL,
+)
+
 
 @dataclass(slots=True)
 class GroupListItem:
@@ -61,7 +71,7 @@ class SharedMaterial:
     owner_name: str | None
     cards_count: int | None = None
     exercises_count: int | None = None
-    shared_at: datetime = datetime.now(timezone.utc)
+    shared_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
 
 
 @dataclass(slots=True)
@@ -107,6 +117,8 @@ class GroupService:
         self.user_repo = user_repo
         self.deck_repo = deck_repo
         self.topic_repo = topic_repo
+        # Services are request-scoped, so this memo lives exactly as long as the session.
+        self._groups: dict[uuid.UUID, Group] = {}
 
     async def list_groups(
         self,
@@ -115,21 +127,10 @@ class GroupService:
         role: GroupRole | None = None,
     ) -> list[GroupListItem]:
         """Return all groups accessible to the user with role metadata."""
-        pairs: list[tuple[Group, GroupRole]] = []
-        if role in (None, GroupRole.OWNER):
-            for group in await self.group_repo.list_owned(user.id):
-                pairs.append((group, GroupRole.OWNER))
-        if role in (None, GroupRole.MEMBER):
-            member_groups = await self.group_repo.list_member_of(user.id)
-            seen = {group.id for group, _ in pairs}
-            for group in member_groups:
-                if group.id not in seen:
-                    pairs.append((group, GroupRole.MEMBER))
-
-        counts = await self.material_repo.count_for_groups([group.id for group, _ in pairs])
+        rows = await self.group_repo.list_accessible(user.id, role=role)
         return [
-            GroupListItem(group=group, role=group_role, materials_count=counts.get(group.id, 0))
-            for group, group_role in pairs
+            GroupListItem(group=group, role=group_role, materials_count=count)
+            for group, group_role, count in rows
         ]
 
     async def create_group(self, user: User, name: str, description: str | None = None) -> Group:
@@ -161,6 +162,7 @@ class GroupService:
         )
         await self.group_repo.session.refresh(group)
         group.owner = user
+        self._groups[group.id] = group
         return group
 
     async def get_group(self, user: User, group_id: uuid.UUID) -> tuple[Group, GroupRole]:
@@ -195,6 +197,7 @@ class GroupService:
         """Soft delete a group."""
         group = await self._ensure_owner(group_id, user)
         await self.group_repo.soft_delete(group)
+        self._groups.pop(group.id, None)
 
     async def list_members(self, user: User, group_id: uuid.UUID) -> list[MemberInfo]:
         """Return all members including the owner."""
@@ -229,15 +232,16 @@ class GroupService:
                 code=ErrorCode.INVALID_FIELD_VALUE,
                 message="?????? ?? ??????? ??????? ??????? ??????.",
             )
-        membership = await self.member_repo.get(group.id, invitee.id)
-        if membership is not None:
+        is_member, pending_id = await self.invite_repo.get_invite_state(group.id, invitee.id)
+        if is_member:
             raise ApplicationError(
                 code=ErrorCode.ALREADY_MEMBER,
                 message="????????? ??? ???????? ??????.",
             )
-        pending = await self.invite_repo.get_pending(group.id, invitee.id)
-        if pending:
-            return pending
+        if pending_id is not None:
+            pending = await self.invite_repo.get_pending(group.id, invitee.id)
+            if pending:
+                return pending
         expires_at = datetime.now(tz=timezone.utc) + timedelta(days=INVITE_TTL_DAYS)
         invite = await self.invite_repo.create(
             group_id=group.id,
@@ -251,10 +255,14 @@ class GroupService:
     async def list_invites(self, user: User, group_id: uuid.UUID) -> list[GroupInvite]:
         """List invites for a group (owner only)."""
         await self._ensure_owner(group_id, user)
+        await self.invite_repo.expire_stale(datetime.now(tz=timezone.utc), group_id=group_id)
         return await self.invite_repo.list_for_group(group_id)
 
     async def cancel_invite(self, user: User, invite_id: uuid.UUID) -> None:
         """Cancel a pending invite."""
+        if await self.invite_repo.delete_owned(invite_id, user.id):
+            return
+        # Nothing deleted: load the invite only to report the precise error.
         invite = await self.invite_repo.get(invite_id)
         if invite is None:
             raise NotFoundError(
@@ -262,8 +270,6 @@ class GroupService:
                 message="?????????? ?? ???????.",
             )
         await self._ensure_owner(invite.group_id, user)
-        await self.invite_repo.session.delete(invite)
-        await self.invite_repo.session.flush()
 
     async def accept_invite(self, user: User, invite_id: uuid.UUID) -> InviteAcceptance:
         """Accept a pending invite."""
@@ -277,8 +283,7 @@ class GroupService:
         invite.status = GroupInviteStatus.ACCEPTED
         invite.responded_at = datetime.now(tz=timezone.utc)
         membership = await self.member_repo.add_member(group.id, user.id)
-        group.members_count += 1
-        await self.invite_repo.session.flush()
+        await self.group_repo.adjust_members_count(group, 1)
         return InviteAcceptance(
             group_id=group.id,
             group_name=group.name,
@@ -308,8 +313,7 @@ class GroupService:
                 message="??????????? ?? ??????? ?? ??????.",
             )
         await self.member_repo.remove(membership)
-        group.members_count = max(1, group.members_count - 1)
-        await self.member_repo.session.flush()
+        await self.group_repo.adjust_members_count(group, -1)
 
     async def leave_group(self, user: User, group_id: uuid.UUID) -> None:
         """Allow member to leave a group."""
@@ -323,8 +327,7 @@ class GroupService:
         if membership is None:
             return
         await self.member_repo.remove(membership)
-        group.members_count = max(1, group.members_count - 1)
-        await self.member_repo.session.flush()
+        await self.group_repo.adjust_members_count(group, -1)
 
     async def list_materials(
         self,
@@ -335,48 +338,39 @@ class GroupService:
     ) -> list[SharedMaterial]:
         """Return shared decks/topics for a group."""
         group, _ = await self._ensure_group_access(group_id, user)
-        materials = await self.material_repo.list_for_group(group.id, material_type=material_type)
-        deck_ids = [
-            item.material_id for item in materials if item.material_type == GroupMaterialType.DECK
-        ]
-        topic_ids = [
-            item.material_id for item in materials if item.material_type == GroupMaterialType.TOPIC
-        ]
-        decks = {deck.id: deck for deck in await self.deck_repo.list_by_ids(deck_ids)}
-        topics = {topic.id: topic for topic in await self.topic_repo.list_by_ids(topic_ids)}
+        rows = await self.material_repo.list_with_resources(
+            group.id,
+            material_type=material_type,
+        )
 
         shared: list[SharedMaterial] = []
-        for record in materials:
-            if record.material_type == GroupMaterialType.DECK:
-                deck = decks.get(record.material_id)
-                if deck:
-                    shared.append(
-                        SharedMaterial(
-                            id=deck.id,
-                            type=GroupMaterialType.DECK,
-                            name=deck.name,
-                            description=deck.description,
-                            owner_id=deck.owner_id,
-                            owner_name=self._display_name(deck.owner),
-                            cards_count=deck.cards_count,
-                            shared_at=record.shared_at,
-                        )
+        for record, deck, topic in rows:
+            if deck is not None:
+                shared.append(
+                    SharedMaterial(
+                        id=deck.id,
+                        type=GroupMaterialType.DECK,
+                        name=deck.name,
+                        description=deck.description,
+                        owner_id=deck.owner_id,
+                        owner_name=self._display_name(deck.owner),
+                        cards_count=deck.cards_count,
+                        shared_at=record.shared_at,
                     )
-            else:
-                topic = topics.get(record.material_id)
-                if topic:
-                    shared.append(
-                        SharedMaterial(
-                            id=topic.id,
-                            type=GroupMaterialType.TOPIC,
-                            name=topic.name,
-                            description=topic.description,
-                            owner_id=topic.owner_id,
-                            owner_name=self._display_name(topic.owner),
-                            exercises_count=topic.exercises_count,
-                            shared_at=record.shared_at,
-                        )
+                )
+            elif topic is not None:
+                shared.append(
+                    SharedMaterial(
+                        id=topic.id,
+                        type=GroupMaterialType.TOPIC,
+                        name=topic.name,
+                        description=topic.description,
+                        owner_id=topic.owner_id,
+                        owner_name=self._display_name(topic.owner),
+                        exercises_count=topic.exercises_count,
+                        shared_at=record.shared_at,
                     )
+                )
         return shared
 
     async def add_materials(
@@ -389,31 +383,13 @@ class GroupService:
     ) -> MaterialBatchResult:
         """Share decks or topics with the group."""
         group = await self._ensure_owner(group_id, user)
-        sanitized_ids = []
-        seen: set[uuid.UUID] = set()
-        for material_id in material_ids:
-            if material_id not in seen:
-                sanitized_ids.append(material_id)
-                seen.add(material_id)
-
-        existing = {
-            material.material_id
-            for material in await self.material_repo.list_for_group(
-                group.id,
-                material_type=material_type,
-            )
-        }
+        sanitized_ids = list(dict.fromkeys(material_ids))
 
-        added: list[MaterialBatchEntry] = []
-        already_shared: list[MaterialBatchEntry] = []
+        owned = await self._list_materials_for_owner(material_type, sanitized_ids, user)
         failed: list[MaterialBatchEntry] = []
-
+        resources: dict[uuid.UUID, Deck | Topic] = {}
         for material_id in sanitized_ids:
-            if material_id in existing:
-                already_shared.append(MaterialBatchEntry(id=material_id, type=material_type))
-                continue
-
-            resource = await self._load_material_for_owner(material_type, material_id, user)
+            resource = owned.get(material_id)
             if resource is None:
                 failed.append(
                     MaterialBatchEntry(
@@ -422,24 +398,26 @@ class GroupService:
                         reason="not_found",
                     )
                 )
-                continue
+            else:
+                resources[material_id] = resource
 
-            entry = GroupMaterial(
-                group_id=group.id,
-                material_id=material_id,
-                material_type=material_type,
-            )
-            await self.material_repo.add(entry)
-            resource.is_group = True
+        inserted = await self.material_repo.bulk_add(group.id, material_type, list(resources))
+
+        added: list[MaterialBatchEntry] = []
+        already_shared: list[MaterialBatchEntry] = []
+        for material_id, resource in resources.items():
+            if material_id not in inserted:
+                already_shared.append(MaterialBatchEntry(id=material_id, type=material_type))
+                continue
             added.append(
                 MaterialBatchEntry(
                     id=material_id,
                     type=material_type,
-                    name=getattr(resource, "name", None),
+                    name=resource.name,
                 )
             )
 
-        await self.material_repo.session.flush()
+        await self._set_group_flag(material_type, [entry.id for entry in added], True)
         return MaterialBatchResult(
             added=added,
             already_shared=already_shared,
@@ -456,14 +434,11 @@ class GroupService:
     ) -> None:
         """Remove previously shared material."""
         group = await self._ensure_owner(group_id, user)
-        entry = await self.material_repo.get(group.id, material_id, material_type)
-        if entry is None:
+        if not await self.material_repo.delete_shared(group.id, material_id, material_type):
             raise NotFoundError(
                 code=ErrorCode.NOT_FOUND,
                 message="????????? ?? ????????.",
             )
-        await self.material_repo.session.delete(entry)
-        await self.material_repo.session.flush()
         await self._maybe_reset_group_flag(material_id, material_type)
 
     async def count_materials(self, group_ids: Sequence[uuid.UUID]) -> dict[uuid.UUID, int]:
@@ -476,30 +451,39 @@ class GroupService:
         material_type: GroupMaterialType,
     ) -> None:
         still_shared = await self.material_repo.exists_for_material(material_id, material_type)
-        if still_shared:
-            return
+        if not still_shared:
+            await self._set_group_flag(material_type, [material_id], False)
+
+    async def _set_group_flag(
+        self,
+        material_type: GroupMaterialType,
+        material_ids: Sequence[uuid.UUID],
+        is_group: bool,
+    ) -> None:
         if material_type == GroupMaterialType.DECK:
-            deck = await self.deck_repo.session.get(Deck, material_id)
-            if deck is not None:
-                deck.is_group = False
+            await self.deck_repo.set_group_flag(material_ids, is_group)
         else:
-            topic = await self.topic_repo.session.get(Topic, material_id)
-            if topic is not None:
-                topic.is_group = False
-        await self.material_repo.session.flush()
+            await self.topic_repo.set_group_flag(material_ids, is_group)
 
-    async def _load_material_for_owner(
+    async def _list_materials_for_owner(
         self,
         material_type: GroupMaterialType,
-        material_id: uuid.UUID,
+        material_ids: Sequence[uuid.UUID],
         user: User,
-    ) -> Deck | Topic | None:
+    ) -> dict[uuid.UUID, Deck | Topic]:
+        resources: Sequence[Deck | Topic]
         if material_type == GroupMaterialType.DECK:
-            return await self.deck_repo.get_for_user(material_id, user.id)
-        return await self.topic_repo.get_for_user(material_id, user.id)
+            resources = await self.deck_repo.list_owned_by_ids(material_ids, user.id)
+        else:
+            resources = await self.topic_repo.list_owned_by_ids(material_ids, user.id)
+        return {resource.id: resource for resource in resources}
 
     async def _ensure_owner(self, group_id: uuid.UUID, user: User) -> Group:
-        group = await self.group_repo.get(group_id)
+        group = self._groups.get(group_id)
+        if group is None:
+            group = await self.group_repo.get(group_id)
+            if group is not None:
+                self._groups[group.id] = group
         if group is None:
             raise NotFoundError(
                 code=ErrorCode.GROUP_NOT_FOUND,
@@ -518,22 +502,24 @@ class GroupService:
         group_id: uuid.UUID,
         user: User,
     ) -> tuple[Group, GroupRole]:
-        group = await self.group_repo.get(group_id)
-        if group is None:
+        cached = self._groups.get(group_id)
+        if cached is not None and cached.owner_id == user.id:
+            return cached, GroupRole.OWNER
+        loaded = await self.group_repo.get_with_role(group_id, user.id)
+        if loaded is None:
             raise NotFoundError(
                 code=ErrorCode.GROUP_NOT_FOUND,
                 message="?????? ?? ???????.",
             )
-        if group.owner_id == user.id:
-            return group, GroupRole.OWNER
-        membership = await self.member_repo.get(group.id, user.id)
-        if membership is None:
+        group, role = loaded
+        self._groups[group.id] = group
+        if role is None:
             raise ApplicationError(
                 code=ErrorCode.FORBIDDEN,
                 message="?????? ?????? ?? ???????? ????????.",
                 status_code=403,
             )
-        return group, GroupRole.MEMBER
+        return group, role
 
     async def _ensure_invitee(self, invite_id: uuid.UUID, user: User) -> GroupInvite:
         invite = await self.invite_repo.get(invite_id)
@@ -566,16 +552,11 @@ class GroupService:
                 code=ErrorCode.USER_NOT_FOUND,
                 message="??????????? ?? ???????.",
             )
-        username = None
-        telegram_id = None
-        if value.startswith("@"):
-            username = value[1:]
-        elif value.lower().startswith("https://t.me/") or value.lower().startswith("t.me/"):
-            username = value.split("/")[-1].lstrip("@")
-        elif value.isdigit():
-            telegram_id = int(value)
-        else:
-            username = value
+        match = _IDENTIFIER_RE.fullmatch(value)
+        kind = match.lastgroup if match and match.lastgroup else "username"
+        token = match[kind] if match else value
+        telegram_id = int(token) if kind == "telegram_id" else None
+        username = None if kind == "telegram_id" else token
 
         user: User | None = None
         if telegram_id is not None:
@@ -590,16 +571,13 @@ class GroupService:
         return user
 
     def _sanitize_text(self, value: str) -> str:
-        cleaned = re.sub(r"\s+", " ", value).strip()
-        return re.sub(r"[<>]", "", cleaned)
+        cleaned = _WHITESPACE_RE.sub(" ", value).strip()
+        return _ANGLE_BRACKETS_RE.sub("", cleaned)
 
     def _display_name(self, user: User | None) -> str | None:  # pragma: no cover
         if user is None:
             return None
-        for candidate in (user.username, user.first_name, user.last_name):
-            if candidate:
-                return candidate
-        return None
+        return user.username or user.first_name or user.last_name or None
 
     @staticmethod
     def _ensure_timezone(value: datetime) -> datetime:  # pragma: no cover
@@ -4,6 +4,8 @@ from __future__ import annotations
 
 import logging
 import uuid
+from collections.abc import Mapping
+from types import MappingProxyType
 from typing import Sequence
 
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -18,12 +20,8 @@ logger = logging.getLogger("app.services.language_profiles")
 
 CEFR_LEVELS = ("A1", "A2", "B1", "B2", "C1", "C2")
 LEVEL_ORDER = {level: index for index, level in enumerate(CEFR_LEVELS)}
-
-
-class LanguageProfileService:
-    """High-level orchestration for CRUD operations on LanguageProfile entities."""
-
-    SUPPORTED_LANGUAGES: dict[str, str] = {
+SUPPORTED_LANGUAGES: Mapping[str, str] = MappingProxyType(
+    {
         "en": "Английский",
         "es": "Испанский",
         "de": "Немецкий",
@@ -33,7 +31,9 @@ class LanguageProfileService:
         "tr": "Турецкий",
         "zh": "Китайский",
     }
-    ALLOWED_GOALS: set[str] = {
+)
+ALLOWED_GOALS: frozenset[str] = frozenset(
+    {
         "work",
         "travel",
         "study",
@@ -43,6 +43,11 @@ class LanguageProfileService:
         "relationships",
         "relocation",
     }
+)
+
+
+class LanguageProfileService:
+    """High-level orchestration for CRUD operations on LanguageProfile entities."""
 
     def __init__(
         self,
@@ -68,29 +73,29 @@ class LanguageProfileService:
         payload: LanguageProfileCreate,
     ) -> LanguageProfile:
         """Create a new language profile enforcing plan limits and validation rules."""
-        language_code = payload.language.lower()
+        # LanguageProfileCreate already lower-cases the code and strips the goals.
+        language_code = payload.language
         language_name = self._resolve_language_name(language_code)
         self._validate_levels(payload.current_level, payload.target_level)
         goals = self._validate_goals(payload.goals)
 
-        if not user.is_premium:
-            count = await self.repository.count_for_user(user.id)
-            if count >= self.max_free_profiles:
-                raise ApplicationError(
-                    code=ErrorCode.LIMIT_REACHED,
-                    message="На бесплатном тарифе доступен только один профиль.",
-                )
+        count, has_duplicate, has_active = await self.repository.precheck_for_create(
+            user.id,
+            language_code,
+        )
+        if not user.is_premium and count >= self.max_free_profiles:
+            raise ApplicationError(
+                code=ErrorCode.LIMIT_REACHED,
+                message="На бесплатном тарифе доступен только один профиль.",
+            )
 
-        duplicate = await self.repository.get_by_language(user.id, language_code)
-        if duplicate:
+        if has_duplicate:
             raise ApplicationError(
                 code=ErrorCode.DUPLICATE_LANGUAGE,
                 message="Профиль для этого языка уже существует.",
             )
 
-        active_profile = await self.repository.get_active_for_user(user.id)
-
-        profile = LanguageProfile(
+        profile = await self.repository.create(
             user_id=user.id,
             language=language_code,
             language_name=language_name,
@@ -98,10 +103,8 @@ class LanguageProfileService:
             target_level=payload.target_level,
             goals=goals,
             interface_language=payload.interface_language or user.language_code or "ru",
-            is_active=active_profile is None,
+            is_active=not has_active,
         )
-        await self.repository.add(profile)
-        await self.session.refresh(profile)
 
         logger.info(
             "Language profile created",
@@ -147,39 +150,43 @@ class LanguageProfileService:
 
     async def delete_profile(self, user: User, profile_id: uuid.UUID) -> None:
         """Soft delete a profile ensuring at least one profile remains."""
-        profile = await self.get_profile(user, profile_id)
-        remaining = await self.repository.count_for_user(user.id)
+        remaining, exists = await self.repository.precheck_for_delete(user.id, profile_id)
+        if not exists:
+            raise NotFoundError(
+                code=ErrorCode.PROFILE_NOT_FOUND,
+                message="Профиль не найден.",
+            )
         if remaining <= 1:
             raise ApplicationError(
                 code=ErrorCode.LAST_PROFILE,
                 message="Нельзя удалить единственный профиль.",
             )
 
-        was_active = profile.is_active
-        await self.repository.soft_delete(profile)
-
-        if was_active:
-            replacement = await self.repository.get_alternate_profile(
-                user.id,
-                exclude_id=profile.id,
+        deleted, replacement = await self.repository.soft_delete_and_promote(user.id, profile_id)
+        if deleted is None:
+            raise NotFoundError(
+                code=ErrorCode.PROFILE_NOT_FOUND,
+                message="Профиль не найден.",
+            )
+        if replacement is not None:
+            logger.info(
+                "Language profile promoted after delete",
+                extra={"user_id": str(user.id), "profile_id": str(replacement.id)},
             )
-            if replacement:
-                replacement.is_active = True
-
-        await self.session.flush()
 
     async def activate_profile(self, user: User, profile_id: uuid.UUID) -> LanguageProfile:
         """Mark a profile as active and deactivate the rest."""
-        profile = await self.get_profile(user, profile_id)
-        await self.repository.deactivate_user_profiles(user.id, exclude=profile.id)
-        profile.is_active = True
-        await self.session.flush()
-        await self.session.refresh(profile)
+        profile = await self.repository.swap_active(user.id, profile_id)
+        if profile is None:
+            raise NotFoundError(
+                code=ErrorCode.PROFILE_NOT_FOUND,
+                message="Профиль не найден.",
+            )
         return profile
 
     def _resolve_language_name(self, language: str) -> str:
         try:
-            return self.SUPPORTED_LANGUAGES[language]
+            return SUPPORTED_LANGUAGES[language]
         except KeyError as exc:
             raise ApplicationError(
                 code=ErrorCode.INVALID_FIELD_VALUE,
@@ -188,14 +195,14 @@ class LanguageProfileService:
             ) from exc
 
     def _validate_levels(self, current: str, target: str) -> None:
-        try:
-            current_rank = LEVEL_ORDER[current]
-            target_rank = LEVEL_ORDER[target]
-        except KeyError as exc:
+        # Request schemas already restrict levels to CEFRLevel, so the miss branch is cold.
+        current_rank = LEVEL_ORDER.get(current)
+        target_rank = LEVEL_ORDER.get(target)
+        if current_rank is None or target_rank is None:
             raise ApplicationError(
                 code=ErrorCode.INVALID_LEVEL,
                 message="Неверный уровень CEFR.",
-            ) from exc
+            )
 
         if target_rank < current_rank:
             raise ApplicationError(
@@ -211,19 +218,14 @@ class LanguageProfileService:
                 message="Нужно выбрать хотя бы одну цель обучения.",
             )
 
-        invalid = sorted({goal for goal in cleaned if goal not in self.ALLOWED_GOALS})
-        if invalid:
+        if not ALLOWED_GOALS.issuperset(cleaned):
             raise ApplicationError(
                 code=ErrorCode.INVALID_FIELD_VALUE,
                 message="Обнаружены неподдерживаемые цели.",
-                details={"invalid": invalid},
+                details={"invalid": sorted(set(cleaned) - ALLOWED_GOALS)},
             )
 
-        unique = []
-        for goal in cleaned:
-            if goal not in unique:
-                unique.append(goal)
-        return unique
+        return list(dict.fromkeys(cleaned))
 
 
 __all__ = ["LanguageProfileService", "CEFR_LEVELS"]
@@ -5,6 +5,7 @@ Provides a robust adapter over OpenAI API with:
 - Automatic retries with exponential backoff
 - Comprehensive error handling
 - Token usage tracking and logging
+- Streaming completions for incremental delivery
 - Timeout configuration
 - Feature flag for alternative LLM providers
 """
@@ -12,24 +13,72 @@ Provides a robust adapter over OpenAI API with:
 from __future__ import annotations
 
 import logging
-from dataclasses import dataclass
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any
+from functools import lru_cache
+from typing import Any, cast
 
+import httpx
 from openai import (
     APIConnectionError,
-    APIError,
     AsyncOpenAI,
+    AsyncStream,
     AuthenticationError,
     BadRequestError,
+    InternalServerError,
     OpenAIError,
     RateLimitError,
 )
-from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
+from openai.types import CompletionUsage
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+from tenacity import (
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+    wait_random,
+)
 
 logger = logging.getLogger("app.services.llm")
 
 
+# Only transient failures are retried (4xx such as bad request/auth fail fast), and
+# jitter spreads retries so concurrent callers do not hit the provider in lockstep.
+_retry_transient = retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(multiplier=1, min=2, max=10) + wait_random(0, 1),
+    retry=retry_if_exception_type((RateLimitError, APIConnectionError, InternalServerError)),
+    reraise=True,
+)
+
+
+@lru_cache(maxsize=1)
+def _openai_http_client() -> httpx.AsyncClient:
+    """Return the httpx pool shared by every OpenAI client in the process."""
+    return httpx.AsyncClient(
+        follow_redirects=True,
+        limits=httpx.Limits(
+            max_connections=1000,
+            max_keepalive_connections=100,
+            keepalive_expiry=30,
+        ),
+    )
+
+
+@lru_cache(maxsize=8)
+def get_openai_client(api_key: str, timeout: float) -> AsyncOpenAI:
+    """
+    Return the process-wide AsyncOpenAI client for the given credentials.
+
+    Services are built per request, so sharing one client keeps a warm connection pool
+    instead of paying TLS setup on every instantiation. Clients for different timeouts
+    (chat, vision, transcription, moderation) all sit on the same httpx pool; the SDK
+    applies ``timeout`` per request.
+    """
+    return AsyncOpenAI(api_key=api_key, timeout=timeout, http_client=_openai_http_client())
+
+
 class LLMProvider(str, Enum):
     """Supported LLM providers."""
 
@@ -37,24 +86,24 @@ class LLMProvider(str, Enum):
     ANTHROPIC = "anthropic"  # For future implementation
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class TokenUsage:
-    """Token usage information from LLM API response."""
+    """
+    Token usage information from LLM API response.
+
+    ``estimated_cost`` is derived once at construction using GPT-4o-mini pricing:
+    $0.15/1M input, $0.60/1M output tokens.
+    """
 
     prompt_tokens: int
     completion_tokens: int
     total_tokens: int
+    estimated_cost: float = field(init=False, repr=False, compare=False)
 
-    @property
-    def estimated_cost(self) -> float:
-        """
-        Calculate estimated cost based on token usage.
-
-        Using GPT-4o-mini pricing: $0.15/1M input, $0.60/1M output tokens.
-        """
+    def __post_init__(self) -> None:
         input_cost = (self.prompt_tokens / 1_000_000) * 0.15
         output_cost = (self.completion_tokens / 1_000_000) * 0.60
-        return input_cost + output_cost
+        object.__setattr__(self, "estimated_cost", input_cost + output_cost)
 
 
 class LLMService:
@@ -84,7 +133,7 @@ class LLMService:
         self.default_timeout = default_timeout
 
         if provider == LLMProvider.OPENAI:
-            self.client = AsyncOpenAI(api_key=api_key, timeout=default_timeout)
+            self.client = get_openai_client(api_key, default_timeout)
         elif provider == LLMProvider.ANTHROPIC:
             # Future implementation for Anthropic Claude
             raise NotImplementedError("Anthropic provider is not yet implemented")
@@ -100,12 +149,6 @@ class LLMService:
             },
         )
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10),
-        retry=retry_if_exception_type((RateLimitError, APIConnectionError, APIError)),
-        reraise=True,
-    )
     async def chat(
         self,
         messages: list[dict[str, str]],
@@ -138,48 +181,135 @@ class LLMService:
         if self.provider != LLMProvider.OPENAI:
             raise NotImplementedError(f"Provider {self.provider} not yet supported")
 
-        try:
-            response = await self.client.chat.completions.create(  # type: ignore[call-overload]
-                model=self.model,
-                messages=messages,
-                temperature=temperature if temperature is not None else self.default_temperature,
-                max_tokens=max_tokens,
-                timeout=timeout or self.default_timeout,
-                response_format=response_format,
-            )
+        request = self._build_request(
+            messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            timeout=timeout,
+        )
+        if response_format is not None:
+            request["response_format"] = response_format
+        response = await self._create_completion(request)
+
+        content = response.choices[0].message.content
+        if content is None:
+            logger.error("LLM returned null content")
+            return "", TokenUsage(0, 0, 0)
+
+        # Extract token usage
+        usage = TokenUsage(
+            prompt_tokens=response.usage.prompt_tokens if response.usage else 0,
+            completion_tokens=response.usage.completion_tokens if response.usage else 0,
+            total_tokens=response.usage.total_tokens if response.usage else 0,
+        )
 
-            content = response.choices[0].message.content
-            if content is None:
-                logger.error("LLM returned null content")
-                return "", TokenUsage(0, 0, 0)
+        logger.info(
+            "LLM request completed successfully",
+            extra={
+                "provider": self.provider.value,
+                "model": self.model,
+                "prompt_tokens": usage.prompt_tokens,
+                "completion_tokens": usage.completion_tokens,
+                "total_tokens": usage.total_tokens,
+                "estimated_cost_usd": round(usage.estimated_cost, 6),
+            },
+        )
 
-            # Extract token usage
-            usage = TokenUsage(
-                prompt_tokens=response.usage.prompt_tokens if response.usage else 0,
-                completion_tokens=response.usage.completion_tokens if response.usage else 0,
-                total_tokens=response.usage.total_tokens if response.usage else 0,
-            )
+        return content, usage
 
-            logger.info(
-                "LLM request completed successfully",
-                extra={
-                    "provider": self.provider.value,
-                    "model": self.model,
-                    "prompt_tokens": usage.prompt_tokens,
-                    "completion_tokens": usage.completion_tokens,
-                    "total_tokens": usage.total_tokens,
-                    "estimated_cost_usd": f"{usage.estimated_cost:.6f}",
-                },
-            )
+    async def chat_stream(
+        self,
+        messages: list[dict[str, str]],
+        *,
+        temperature: float | None = None,
+        max_tokens: int | None = None,
+        timeout: float | None = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream chat completion text deltas as the provider generates them.
+
+        Only opening the stream is retried; once tokens have been yielded a failure
+        propagates to the caller instead of replaying the reply from the start.
+
+        Args:
+            messages: List of messages in OpenAI format
+            temperature: Sampling temperature (0.0-1.0), uses default if None
+            max_tokens: Maximum tokens to generate
+            timeout: Request timeout in seconds, uses default if None
 
-            return content, usage
+        Yields:
+            Non-empty content deltas in generation order
+        """
+        if self.provider != LLMProvider.OPENAI:
+            raise NotImplementedError(f"Provider {self.provider} not yet supported")
 
+        request = self._build_request(
+            messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            timeout=timeout,
+        )
+        request["stream"] = True
+        # The pinned client predates the typed stream_options argument.
+        request["extra_body"] = {"stream_options": {"include_usage": True}}
+        stream = await self._open_stream(request)
+
+        usage = TokenUsage(0, 0, 0)
+        async for chunk in stream:
+            # The pinned chunk model has no usage field; it arrives as an untyped extra.
+            raw_usage = getattr(chunk, "usage", None)
+            if raw_usage:
+                chunk_usage = CompletionUsage.model_validate(raw_usage)
+                usage = TokenUsage(
+                    prompt_tokens=chunk_usage.prompt_tokens,
+                    completion_tokens=chunk_usage.completion_tokens,
+                    total_tokens=chunk_usage.total_tokens,
+                )
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+        logger.info(
+            "LLM stream completed successfully",
+            extra={
+                "provider": self.provider.value,
+                "model": self.model,
+                "prompt_tokens": usage.prompt_tokens,
+                "completion_tokens": usage.completion_tokens,
+                "total_tokens": usage.total_tokens,
+                "estimated_cost_usd": round(usage.estimated_cost, 6),
+            },
+        )
+
+    def _build_request(
+        self,
+        messages: list[dict[str, str]],
+        *,
+        temperature: float | None,
+        max_tokens: int | None,
+        timeout: float | None,
+    ) -> dict[str, Any]:
+        """Resolve defaults once so retries resend the same kwargs; unset options are omitted."""
+        request: dict[str, Any] = {
+            "model": self.model,
+            "messages": messages,
+            "temperature": temperature if temperature is not None else self.default_temperature,
+            "timeout": timeout or self.default_timeout,
+        }
+        if max_tokens is not None:
+            request["max_tokens"] = max_tokens
+        return request
+
+    @_retry_transient
+    async def _create_completion(self, request: dict[str, Any]) -> ChatCompletion:
+        try:
+            return cast(ChatCompletion, await self.client.chat.completions.create(**request))
         except AuthenticationError as e:
             logger.error("LLM authentication failed", extra={"error": str(e)})
             raise
         except BadRequestError as e:
             logger.error(
-                "LLM bad request", extra={"error": str(e), "messages_count": len(messages)}
+                "LLM bad request",
+                extra={"error": str(e), "messages_count": len(request["messages"])},
             )
             raise
         except RateLimitError as e:
@@ -192,22 +322,21 @@ class LLMService:
             logger.error("LLM API error", extra={"error": str(e), "error_type": type(e).__name__})
             raise
 
+    @_retry_transient
+    async def _open_stream(self, request: dict[str, Any]) -> AsyncStream[ChatCompletionChunk]:
+        try:
+            stream = await self.client.chat.completions.create(**request)
+            return cast(AsyncStream[ChatCompletionChunk], stream)
+        except (RateLimitError, APIConnectionError) as e:
+            logger.warning("LLM stream open failed, retrying", extra={"error": str(e)})
+            raise
+        except OpenAIError as e:
+            logger.error("LLM API error", extra={"error": str(e), "error_type": type(e).__name__})
+            raise
 
-def get_basic_system_prompt(language_code: str | None = None) -> str:
-    """
-    Get basic system prompt for language teacher.
-
-    Args:
-        language_code: User's language code from Telegram
-
-    Returns:
-        System prompt text
-    """
-    # Minimal prompt version for initial implementation
-    # In the future will be loaded from prompts/ and rendered via Jinja2
-    interface_lang = "Russian" if language_code in ("ru", None) else "English"
 
-    return f"""You are a professional language teacher helping students learn new languages.
+_BASIC_SYSTEM_PROMPT_TEMPLATE = """\
+You are a professional language teacher helping students learn new languages.
 
 Your role:
 - Answer questions about language learning
@@ -224,6 +353,32 @@ Communication:
 If the user asks something not related to language learning,
 politely redirect them to language topics.
 """
+# The prompt only varies by interface language, so both variants are rendered once at import.
+_BASIC_SYSTEM_PROMPT_RU = _BASIC_SYSTEM_PROMPT_TEMPLATE.format(interface_lang="Russian")
+_BASIC_SYSTEM_PROMPT_EN = _BASIC_SYSTEM_PROMPT_TEMPLATE.format(interface_lang="English")
 
 
-__all__ = ["LLMService", "LLMProvider", "TokenUsage", "get_basic_system_prompt"]
+def get_basic_system_prompt(language_code: str | None = None) -> str:
+    """
+    Get basic system prompt for language teacher.
+
+    Args:
+        language_code: User's language code from Telegram
+
+    Returns:
+        System prompt text
+    """
+    # Minimal prompt version for initial implementation
+    # In the future will be loaded from prompts/ and rendered via Jinja2
+    if language_code in ("ru", None):
+        return _BASIC_SYSTEM_PROMPT_RU
+    return _BASIC_SYSTEM_PROMPT_EN
+
+
+__all__ = [
+    "LLMService",
+    "LLMProvider",
+    "TokenUsage",
+    "get_basic_system_prompt",
+    "get_openai_client",
+]
@@ -10,23 +10,34 @@ Extends the basic LLM service with:
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
+from collections import OrderedDict
 from collections.abc import Awaitable
-from typing import Any, Sequence, Type, TypeVar, cast
+from functools import cache, lru_cache
+from typing import Any, Sequence, Type, TypeVar, cast, get_args, get_origin
 
+import orjson
 from pydantic import BaseModel, ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.cache import (
+    TTL_1_DAY,
     TTL_1_HOUR,
     TTL_30_DAYS,
+    TTL_NEGATIVE,
     TTL_PERMANENT,
     CacheClient,
+    answer_check_cache_key,
     card_cache_key,
+    chat_response_cache_key,
+    intent_cache_key,
     lemma_cache_key,
+    negative_cache_key,
     topics_cache_key,
 )
+from app.core.db import AsyncSessionFactory
 from app.core.errors import LLMParsingError
 from app.core.token_metrics import record_llm_usage_metrics
 from app.models import TokenUsage
@@ -39,11 +50,26 @@ from app.schemas.llm_responses import (
     WordSuggestions,
 )
 from app.services.llm import LLMService, TokenUsage as LLMTokenUsage
+from app.services.token_usage_worker import token_usage_writer
 
 logger = logging.getLogger("app.services.llm_enhanced")
 
 T = TypeVar("T", bound=BaseModel)
 
+# Only near-deterministic completions are worth reusing; sampled replies must stay varied.
+CHAT_CACHE_MAX_TEMPERATURE = 0.3
+CHAT_CACHE_TTL = TTL_1_HOUR
+# Upper bound on concurrent LLM calls issued by generate_cards_batch.
+LLM_BATCH_CONCURRENCY = 5
+
+# Strong references to fire-and-forget usage writes so they are not garbage collected.
+_background_tasks: set[asyncio.Task[None]] = set()
+
+# In-process tier in front of Redis for word -> lemma lookups. Lemmas are cached
+# permanently, so entries never go stale; the LRU bound only limits memory.
+LEMMA_MEMORY_CACHE_SIZE = 10_000
+_lemma_memory: OrderedDict[str, str] = OrderedDict()
+
 INTERFACE_LANGUAGE_NAMES: dict[str, str] = {
     "ru": "Russian",
     "en": "English",
@@ -62,6 +88,230 @@ INTERFACE_LANGUAGE_NAMES: dict[str, str] = {
 }
 
 
+# Prompt templates are built once at import. Hot paths fill them with str.format or, for
+# prompts whose only per-request value is user text, by joining pre-split fragments.
+_WORD_SLOT = "\x00word\x00"
+
+_CARD_PROMPT = """Generate a flashcard for the word: "{word}"
+
+Requirements:
+1. Provide the word in its base form (lemma)
+2. Translate to Russian
+3. Create an example sentence in {language_name} (appropriate for {level} level)
+4. Translate the example to Russian
+
+Consider:
+- User's level: {level}
+- User's goals: {goals}
+- The example should be practical and memorable
+
+Respond in JSON format:
+{{
+  "word": "{word}",
+  "lemma": "base form of the word",
+  "translation": "Russian translation",
+  "example": "Example sentence in {language_name}",
+  "example_translation": "Example translation in Russian",
+  "notes": "Optional notes or context"
+}}"""
+
+_LEMMA_PROMPT = """Determine the lemma (base form) of the word: "{word}" in {language}.
+
+The lemma is:
+- For nouns: singular form (with article if needed)
+- For verbs: infinitive
+- For adjectives: masculine singular (if applicable)
+
+Examples:
+- Spanish: "casas" → "casa", "comí" → "comer"
+- German: "Häuser" → "das Haus", "gehst" → "gehen"
+- English: "houses" → "house", "went" → "go"
+
+Respond with only the lemma, no explanation."""
+
+_EXERCISE_PROMPT = """Generate a {exercise_type} exercise for the topic: "{topic_name}"
+
+Topic description: {topic_description}
+Student level: {level}
+Exercise type: {exercise_type}
+
+Requirements:
+1. Create a clear question/instruction
+2. Provide a prompt (sentence to translate or complete)
+3. The difficulty should match {level} level
+4. Focus on {topic_type}
+
+{instructions}
+
+Respond in JSON format with all required fields."""
+
+_FREE_TEXT_INSTRUCTIONS = "\nThe student will write their answer freely."
+
+_MULTIPLE_CHOICE_INSTRUCTIONS = """
+Provide 4 options:
+- 1 correct answer
+- 3 plausible but incorrect options (common mistakes)"""
+
+_CHECK_ANSWER_PROMPT = """Check the student's answer to the exercise.
+
+Exercise:
+Question: {question}
+Prompt: {prompt}
+Correct answer: {correct_answer}
+
+Student's answer: {user_answer}
+
+Evaluation criteria:
+1. Grade as "correct", "partial", or "incorrect"
+2. Accept synonyms and alternative correct forms
+3. Ignore minor typos (1-2 characters)
+4. Consider grammatically correct alternatives
+5. Student level: {level} - be encouraging but honest
+
+Provide:
+- Result (correct/partial/incorrect)
+- Explanation of mistakes (if any)
+- Correct answer
+- Alternative correct answers (if applicable)
+- Encouragement and guidance
+
+Respond in JSON format."""
+
+_TOPICS_PROMPT = """Suggest 5-7 relevant topics for the student to study.
+
+Student profile:
+- Language: {language_name}
+- Current level: {level}
+- Target level: {target_level}
+- Goals: {goals}
+
+Consider:
+- Topics appropriate for {level} level
+- Progression towards {target_level}
+- Alignment with goals
+- Mix of grammar, vocabulary, and practical situations
+
+For each topic provide:
+- Name (concise, in Russian)
+- Description (1-2 sentences)
+- Type (grammar/vocabulary/situation)
+- Why it's relevant
+- 2-3 example exercises
+
+Respond in JSON format."""
+
+_INTENT_PROMPT = """Analyze the user's message and determine their intent.
+
+Message: "{message}"
+
+Possible intents:
+- translate: asking for translation
+- explain_grammar: asking about grammar rules
+- check_text: asking to check their text
+- add_card: explicitly asking to add words to flashcards
+- practice: asking for exercises or practice
+- general: general question about the language
+- off_topic: unrelated to language learning
+
+Respond in JSON format:
+{{
+  "intent": "detected_intent",
+  "confidence": 0.95,
+  "entities": {{
+    "word": "extracted word if applicable",
+    "context": "additional context"
+  }}
+}}"""
+# Pre-rendered around the message slot: user text is joined in, never str.format-ed.
+_INTENT_PROMPT_PARTS = tuple(_INTENT_PROMPT.format(message=_WORD_SLOT).split(_WORD_SLOT))
+
+
+@lru_cache(maxsize=256)
+def _card_prompt_parts(language_name: str, level: str, goals: tuple[str, ...]) -> tuple[str, ...]:
+    """Return the card prompt split around the word slots for a learner profile.
+
+    The same (language, level, goals) combination repeats across many words and users,
+    so only ``word.join(parts)`` is left per request.
+    """
+    rendered = _CARD_PROMPT.format(
+        word=_WORD_SLOT,
+        language_name=language_name,
+        level=level,
+        goals=", ".join(goals),
+    )
+    return tuple(rendered.split(_WORD_SLOT))
+
+
+# Structured cache entries written by this service carry a format tag, so the decoder
+# can tell self-produced payloads from legacy or foreign ones.
+_CACHE_FORMAT_MODEL = "m1:"
+
+
+def _encode_cached(model: BaseModel) -> str:
+    """Serialize a structured response for the cache (single pass in pydantic-core)."""
+    return _CACHE_FORMAT_MODEL + model.model_dump_json()
+
+
+@cache
+def _nested_fields(model: type[BaseModel]) -> dict[str, tuple[type[BaseModel], bool]]:
+    """Map field name -> (nested model, is_list) for fields holding BaseModel values."""
+    nested: dict[str, tuple[type[BaseModel], bool]] = {}
+    for name, field_info in model.model_fields.items():
+        annotation = field_info.annotation
+        is_list = get_origin(annotation) is list
+        candidates = get_args(annotation) if is_list or get_origin(annotation) else (annotation,)
+        for candidate in candidates:
+            if isinstance(candidate, type) and issubclass(candidate, BaseModel):
+                nested[name] = (candidate, is_list)
+                break
+    return nested
+
+
+@cache
+def _required_fields(model: type[BaseModel]) -> frozenset[str]:
+    return frozenset(name for name, info in model.model_fields.items() if info.is_required())
+
+
+def _construct(model: Type[T], data: dict[str, Any]) -> T:
+    """Build a model (and its nested models) from trusted data without validation."""
+    for name, (nested_model, is_list) in _nested_fields(model).items():
+        value = data.get(name)
+        if is_list and isinstance(value, list):
+            data[name] = [_construct(nested_model, item) for item in value]
+        elif isinstance(value, dict):
+            data[name] = _construct(nested_model, value)
+    return model.model_construct(**data)
+
+
+def _decode_cached(model: Type[T], raw: str) -> T | None:
+    """Decode a cache entry produced by ``_encode_cached``; None if it no longer fits."""
+    if raw.startswith(_CACHE_FORMAT_MODEL):
+        # Self-produced entries were validated before caching: skip re-validation and only
+        # check that the schema has not grown new required fields since they were written.
+        data = orjson.loads(raw[len(_CACHE_FORMAT_MODEL) :])
+        if isinstance(data, dict) and _required_fields(model) <= data.keys():
+            return _construct(model, data)
+        return None
+    try:
+        return model.model_validate_json(raw)
+    except ValidationError:
+        return None
+
+
+def _recall_lemma(key: str) -> str | None:
+    lemma = _lemma_memory.get(key)
+    if lemma is not None:
+        _lemma_memory.move_to_end(key)
+    return lemma
+
+
+def _remember_lemma(key: str, lemma: str) -> None:
+    _lemma_memory[key] = lemma
+    _lemma_memory.move_to_end(key)
+    if len(_lemma_memory) > LEMMA_MEMORY_CACHE_SIZE:
+        _lemma_memory.popitem(last=False)
+
+
 def _describe_interface_language(code: str) -> str:
     normalized = (code or "").lower()
     name = INTERFACE_LANGUAGE_NAMES.get(normalized)
@@ -102,6 +352,52 @@ class EnhancedLLMService(LLMService):
         super().__init__(api_key=api_key, model=model, temperature=temperature, **kwargs)
         self.cache = cache
 
+    async def chat(
+        self,
+        messages: list[dict[str, str]],
+        *,
+        temperature: float | None = None,
+        max_tokens: int | None = None,
+        timeout: float | None = None,
+        response_format: dict[str, Any] | None = None,
+    ) -> tuple[str, LLMTokenUsage]:
+        """
+        Send chat completion request, reusing identical low-temperature completions.
+
+        Structured requests (``response_format`` set) and requests with temperature above
+        ``CHAT_CACHE_MAX_TEMPERATURE`` always go to the provider; structured callers cache
+        their validated models themselves. Cache hits report zero token usage, like other
+        cached responses.
+        """
+        effective_temperature = temperature if temperature is not None else self.default_temperature
+        if response_format is not None or effective_temperature > CHAT_CACHE_MAX_TEMPERATURE:
+            return await super().chat(
+                messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                timeout=timeout,
+                response_format=response_format,
+            )
+
+        cache_key = chat_response_cache_key(
+            self.model, effective_temperature, max_tokens, response_format, messages
+        )
+        cached = await self.cache.get(cache_key)
+        if cached:
+            logger.info("Cache hit for chat completion", extra={"cache_key": cache_key})
+            return cached, LLMTokenUsage(0, 0, 0)
+
+        content, usage = await super().chat(
+            messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            timeout=timeout,
+            response_format=response_format,
+        )
+        if content:
+            await self.cache.set(cache_key, content, ttl=CHAT_CACHE_TTL)
+        return content, usage
+
     async def chat_structured(
         self,
         messages: list[dict[str, str]],
@@ -129,35 +425,57 @@ class EnhancedLLMService(LLMService):
         Raises:
             LLMParsingError: If response cannot be parsed into model
         """
-        # Check cache first
-        if cache_key:
-            cached = await self.cache.get(cache_key)
-            if cached:
-                try:
-                    model = response_model.model_validate_json(cached)
-                    logger.info(
-                        "Cache hit for structured response",
-                        extra={"cache_key": cache_key, "model": response_model.__name__},
-                    )
-                    # Return with zero token usage since it's cached
-                    return model, LLMTokenUsage(0, 0, 0)
-                except ValidationError as e:
-                    logger.warning(
-                        f"Cached data validation failed, regenerating: {e}",
-                        extra={"cache_key": cache_key},
-                    )
+        # Requests whose output recently failed to parse are rejected without an LLM call
+        # for TTL_NEGATIVE seconds, so retries of a pathological input don't re-pay for it.
+        # Like the chat cache, this only applies to near-deterministic requests: a sampled
+        # request that failed once will most likely parse when retried.
+        response_format = {"type": "json_object"}
+        effective_temperature = temperature if temperature is not None else self.default_temperature
+        failure_key: str | None = None
+        if effective_temperature <= CHAT_CACHE_MAX_TEMPERATURE:
+            failure_key = negative_cache_key(
+                chat_response_cache_key(
+                    self.model, effective_temperature, max_tokens, response_format, messages
+                )
+            )
+
+        # Check the cached result and the failure marker in one round-trip
+        lookup = [key for key in (cache_key, failure_key) if key]
+        found = dict(zip(lookup, await self.cache.mget(*lookup), strict=True)) if lookup else {}
+        cached = found.get(cache_key) if cache_key else None
+        if cached:
+            cached_model = _decode_cached(response_model, cached)
+            if cached_model is not None:
+                logger.info(
+                    "Cache hit for structured response",
+                    extra={"cache_key": cache_key, "model": response_model.__name__},
+                )
+                # Return with zero token usage since it's cached
+                return cached_model, LLMTokenUsage(0, 0, 0)
+            logger.warning(
+                "Cached data validation failed, regenerating",
+                extra={"cache_key": cache_key},
+            )
+
+        if failure_key and found.get(failure_key):
+            logger.warning(
+                "Skipping LLM call for recently unparseable request",
+                extra={"expected_model": response_model.__name__},
+            )
+            raise LLMParsingError("Invalid JSON response: request recently failed to parse")
 
         # Call LLM with JSON mode
         response_text, usage = await self.chat(
             messages=messages,
             temperature=temperature,
             max_tokens=max_tokens,
-            response_format={"type": "json_object"},
+            response_format=response_format,
         )
 
-        # Parse and validate response
+        # Parse and validate response. LLM output is untrusted, so it is always validated
+        # (validators also normalize values); orjson only replaces the JSON decoding step.
         try:
-            model = response_model.model_validate_json(response_text)
+            model = response_model.model_validate(orjson.loads(response_text))
         except (json.JSONDecodeError, ValidationError) as e:
             logger.error(
                 "Failed to parse LLM response",
@@ -167,11 +485,13 @@ class EnhancedLLMService(LLMService):
                     "expected_model": response_model.__name__,
                 },
             )
+            if failure_key:
+                await self.cache.set(failure_key, "1", ttl=TTL_NEGATIVE)
             raise LLMParsingError(f"Invalid JSON response: {e}") from e
 
-        # Cache result
+        # Cache the validated model in the tagged format so hits skip re-validation.
         if cache_key and cache_ttl:
-            await self.cache.set(cache_key, model.model_dump_json(), ttl=cache_ttl)
+            await self.cache.set(cache_key, _encode_cached(model), ttl=cache_ttl)
             logger.info(
                 "Cached structured response",
                 extra={"cache_key": cache_key, "ttl": cache_ttl},
@@ -200,28 +520,7 @@ class EnhancedLLMService(LLMService):
         Returns:
             Tuple of (card_content, token_usage)
         """
-        prompt = f"""Generate a flashcard for the word: "{word}"
-
-Requirements:
-1. Provide the word in its base form (lemma)
-2. Translate to Russian
-3. Create an example sentence in {language_name} (appropriate for {level} level)
-4. Translate the example to Russian
-
-Consider:
-- User's level: {level}
-- User's goals: {', '.join(goals)}
-- The example should be practical and memorable
-
-Respond in JSON format:
-{{
-  "word": "{word}",
-  "lemma": "base form of the word",
-  "translation": "Russian translation",
-  "example": "Example sentence in {language_name}",
-  "example_translation": "Example translation in Russian",
-  "notes": "Optional notes or context"
-}}"""
+        prompt = word.join(_card_prompt_parts(language_name, level, tuple(goals)))
 
         messages = [
             {"role": "system", "content": f"You are a professional {language_name} teacher."},
@@ -235,12 +534,68 @@ Respond in JSON format:
             temperature=0.7,
         )
 
-        # Cache with the generated lemma
-        cache_key = card_cache_key(language, card.lemma)
-        await self.cache.set(cache_key, card.model_dump_json(), ttl=TTL_30_DAYS)
+        # Cache the card under its lemma together with word -> lemma (one pipelined
+        # round-trip), so generate_cards_batch can later find the card from the word. The
+        # mapping comes from a sampled response, so it expires with the card instead of
+        # permanently overriding get_lemma's deterministic entry.
+        await self.cache.set_many(
+            {
+                card_cache_key(language, card.lemma): _encode_cached(card),
+                lemma_cache_key(language, word): card.lemma,
+            },
+            ttl=TTL_30_DAYS,
+        )
 
         return card, usage
 
+    async def generate_cards_batch(
+        self,
+        words: Sequence[str],
+        language: str,
+        language_name: str,
+        level: str,
+        goals: list[str],
+    ) -> list[tuple[CardContent, LLMTokenUsage] | BaseException]:
+        """
+        Generate flashcards for several words, serving known words from cache.
+
+        Cached word lemmas and cards (both written by generate_card) are fetched with
+        two MGETs; only the misses are sent to the LLM, concurrently. Failures are returned
+        in place so one bad word does not abort the batch.
+
+        Returns:
+            Outcomes aligned with ``words``: (card_content, token_usage) or the exception
+        """
+        lemmas = await self.cache.mget(*(lemma_cache_key(language, word) for word in words))
+        card_keys = list(
+            dict.fromkeys(card_cache_key(language, lemma) for lemma in lemmas if lemma)
+        )
+        cards = dict(zip(card_keys, await self.cache.mget(*card_keys), strict=True))
+
+        outcomes: list[tuple[CardContent, LLMTokenUsage] | BaseException | None] = []
+        misses: list[int] = []
+        for index, lemma in enumerate(lemmas):
+            raw = cards.get(card_cache_key(language, lemma)) if lemma else None
+            card = _decode_cached(CardContent, raw) if raw else None
+            if card is None:
+                misses.append(index)
+            outcomes.append((card, LLMTokenUsage(0, 0, 0)) if card is not None else None)
+
+        if misses:
+            semaphore = asyncio.Semaphore(LLM_BATCH_CONCURRENCY)
+
+            async def _bounded(word: str) -> tuple[CardContent, LLMTokenUsage]:
+                async with semaphore:
+                    return await self.generate_card(word, language, language_name, level, goals)
+
+            generated = await asyncio.gather(
+                *(_bounded(words[index]) for index in misses), return_exceptions=True
+            )
+            for index, outcome in zip(misses, generated, strict=True):
+                outcomes[index] = outcome
+
+        return cast(list[tuple[CardContent, LLMTokenUsage] | BaseException], outcomes)
+
     async def get_lemma(
         self,
         word: str,
@@ -258,25 +613,19 @@ Respond in JSON format:
         """
         cache_key = lemma_cache_key(language, word)
 
+        # Hot words are served from process memory without a Redis round-trip
+        remembered = _recall_lemma(cache_key)
+        if remembered is not None:
+            return remembered, LLMTokenUsage(0, 0, 0)
+
         # Check cache (permanent TTL)
         cached = await self.cache.get(cache_key)
         if cached:
             logger.info("Cache hit for lemma", extra={"word": word, "language": language})
+            _remember_lemma(cache_key, cached)
             return cached, LLMTokenUsage(0, 0, 0)
 
-        prompt = f"""Determine the lemma (base form) of the word: "{word}" in {language}.
-
-The lemma is:
-- For nouns: singular form (with article if needed)
-- For verbs: infinitive
-- For adjectives: masculine singular (if applicable)
-
-Examples:
-- Spanish: "casas" → "casa", "comí" → "comer"
-- German: "Häuser" → "das Haus", "gehst" → "gehen"
-- English: "houses" → "house", "went" → "go"
-
-Respond with only the lemma, no explanation."""
+        prompt = _LEMMA_PROMPT.format(word=word, language=language)
 
         messages = [{"role": "user", "content": prompt}]
 
@@ -290,6 +639,7 @@ Respond with only the lemma, no explanation."""
 
         # Cache permanently
         await self.cache.set(cache_key, lemma, ttl=TTL_PERMANENT)
+        _remember_lemma(cache_key, lemma)
 
         return lemma, usage
 
@@ -316,30 +666,18 @@ Respond with only the lemma, no explanation."""
         Returns:
             Tuple of (exercise, token_usage)
         """
-        prompt = f"""Generate a {exercise_type} exercise for the topic: "{topic_name}"
-
-Topic description: {topic_description}
-Student level: {level}
-Exercise type: {exercise_type}
-
-Requirements:
-1. Create a clear question/instruction
-2. Provide a prompt (sentence to translate or complete)
-3. The difficulty should match {level} level
-4. Focus on {topic_type}
-
-"""
-
-        # Add exercise-type specific instructions
-        if exercise_type == "free_text":
-            prompt += "\nThe student will write their answer freely."
-        else:
-            prompt += """
-Provide 4 options:
-- 1 correct answer
-- 3 plausible but incorrect options (common mistakes)"""
-
-        prompt += "\n\nRespond in JSON format with all required fields."
+        prompt = _EXERCISE_PROMPT.format(
+            exercise_type=exercise_type,
+            topic_name=topic_name,
+            topic_description=topic_description,
+            level=level,
+            topic_type=topic_type,
+            instructions=(
+                _FREE_TEXT_INSTRUCTIONS
+                if exercise_type == "free_text"
+                else _MULTIPLE_CHOICE_INSTRUCTIONS
+            ),
+        )
 
         messages = [
             {"role": "system", "content": "You are a professional language teacher."},
@@ -374,40 +712,27 @@ Provide 4 options:
         Returns:
             Tuple of (result, token_usage)
         """
-        check_prompt = f"""Check the student's answer to the exercise.
-
-Exercise:
-Question: {question}
-Prompt: {prompt}
-Correct answer: {correct_answer}
-
-Student's answer: {user_answer}
-
-Evaluation criteria:
-1. Grade as "correct", "partial", or "incorrect"
-2. Accept synonyms and alternative correct forms
-3. Ignore minor typos (1-2 characters)
-4. Consider grammatically correct alternatives
-5. Student level: {level} - be encouraging but honest
-
-Provide:
-- Result (correct/partial/incorrect)
-- Explanation of mistakes (if any)
-- Correct answer
-- Alternative correct answers (if applicable)
-- Encouragement and guidance
-
-Respond in JSON format."""
+        check_prompt = _CHECK_ANSWER_PROMPT.format(
+            question=question,
+            prompt=prompt,
+            correct_answer=correct_answer,
+            user_answer=user_answer,
+            level=level,
+        )
 
         messages = [
             {"role": "system", "content": "You are a helpful language teacher."},
             {"role": "user", "content": check_prompt},
         ]
 
+        # Keyed on the exercise plus the whitespace-normalized answer, so re-submissions
+        # that only differ in spacing reuse the grade.
         return await self.chat_structured(
             messages=messages,
             response_model=ExerciseResult,
             temperature=0.3,  # More deterministic for grading
+            cache_key=answer_check_cache_key(question, prompt, correct_answer, user_answer, level),
+            cache_ttl=TTL_1_DAY,
         )
 
     async def suggest_topics(
@@ -433,28 +758,12 @@ Respond in JSON format."""
         Returns:
             Tuple of (topics, token_usage)
         """
-        prompt = f"""Suggest 5-7 relevant topics for the student to study.
-
-Student profile:
-- Language: {language_name}
-- Current level: {level}
-- Target level: {target_level}
-- Goals: {', '.join(goals)}
-
-Consider:
-- Topics appropriate for {level} level
-- Progression towards {target_level}
-- Alignment with goals
-- Mix of grammar, vocabulary, and practical situations
-
-For each topic provide:
-- Name (concise, in Russian)
-- Description (1-2 sentences)
-- Type (grammar/vocabulary/situation)
-- Why it's relevant
-- 2-3 example exercises
-
-Respond in JSON format."""
+        prompt = _TOPICS_PROMPT.format(
+            language_name=language_name,
+            level=level,
+            target_level=target_level,
+            goals=", ".join(goals),
+        )
 
         messages = [
             {"role": "system", "content": "You are an expert language curriculum designer."},
@@ -558,39 +867,79 @@ Return JSON:
         Returns:
             Tuple of (intent, token_usage)
         """
-        prompt = f"""Analyze the user's message and determine their intent.
-
-Message: "{user_message}"
-
-Possible intents:
-- translate: asking for translation
-- explain_grammar: asking about grammar rules
-- check_text: asking to check their text
-- add_card: explicitly asking to add words to flashcards
-- practice: asking for exercises or practice
-- general: general question about the language
-- off_topic: unrelated to language learning
-
-Respond in JSON format:
-{{
-  "intent": "detected_intent",
-  "confidence": 0.95,
-  "entities": {{
-    "word": "extracted word if applicable",
-    "context": "additional context"
-  }}
-}}"""
+        prompt = user_message.join(_INTENT_PROMPT_PARTS)
 
         messages = [
             {"role": "system", "content": "You are a helpful intent classifier."},
             {"role": "user", "content": prompt},
         ]
 
+        # Near-duplicate messages (case, punctuation, spacing) share one cached intent
         return await self.chat_structured(
             messages=messages,
             response_model=IntentDetection,
             temperature=0.3,
+            cache_key=intent_cache_key(user_message),
+            cache_ttl=TTL_1_DAY,
+        )
+
+    def schedule_token_usage(
+        self,
+        *,
+        user_id: str,
+        profile_id: str | None,
+        usage: LLMTokenUsage,
+        operation: str | None = None,
+    ) -> None:
+        """
+        Track token usage in the background so the caller is not delayed.
+
+        When the background writer is running the row is queued directly. Otherwise the
+        write runs in a task with a dedicated session: the request-scoped one may be closed
+        (or in use by the caller) by the time the task runs.
+
+        Args:
+            user_id: User ID
+            profile_id: Profile ID (optional)
+            usage: Token usage from LLM call
+            operation: Operation name (e.g., 'generate_card', 'chat')
+        """
+        # The running writer persists the row itself: no task or session is needed
+        row = self._token_usage_row(user_id, profile_id, usage, operation)
+        if token_usage_writer.enqueue(row):
+            self._record_token_usage(user_id, usage, operation)
+            return
+
+        task = asyncio.create_task(
+            self._persist_token_usage(
+                user_id=user_id, profile_id=profile_id, usage=usage, operation=operation
+            )
         )
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
+    async def _persist_token_usage(
+        self,
+        *,
+        user_id: str,
+        profile_id: str | None,
+        usage: LLMTokenUsage,
+        operation: str | None,
+    ) -> None:
+        try:
+            async with AsyncSessionFactory() as usage_session:
+                await self.track_token_usage(
+                    db_session=usage_session,
+                    user_id=user_id,
+                    profile_id=profile_id,
+                    usage=usage,
+                    operation=operation,
+                )
+        except Exception:
+            logger.exception(
+                "Token usage tracking failed",
+                extra={"operation": operation, "user_id": user_id},
+            )
 
     async def track_token_usage(
         self,
@@ -603,6 +952,9 @@ Respond in JSON format:
         """
         Track token usage to database.
 
+        When the background token usage writer is running, the row is queued and written
+        in a later bulk insert; otherwise it is added to ``db_session`` and committed.
+
         Args:
             db_session: Database session
             user_id: User ID
@@ -611,43 +963,57 @@ Respond in JSON format:
             operation: Operation name (e.g., 'generate_card', 'chat')
         """
         try:
-            token_record = TokenUsage(
-                user_id=user_id,
-                profile_id=profile_id,
-                prompt_tokens=usage.prompt_tokens,
-                completion_tokens=usage.completion_tokens,
-                total_tokens=usage.total_tokens,
-                estimated_cost=usage.estimated_cost,
-                operation=operation,
-                model=self.model,
-            )
-
-            add_result = cast(object, db_session.add(token_record))
-            if isinstance(add_result, Awaitable):
-                await add_result
-            await db_session.commit()
-
-            record_llm_usage_metrics(
-                operation=operation,
-                model=self.model,
-                prompt_tokens=usage.prompt_tokens,
-                completion_tokens=usage.completion_tokens,
-                total_tokens=usage.total_tokens,
-                estimated_cost=usage.estimated_cost,
-            )
-
-            logger.info(
-                "Token usage tracked",
-                extra={
-                    "user_id": user_id,
-                    "operation": operation,
-                    "total_tokens": usage.total_tokens,
-                    "cost": f"${usage.estimated_cost:.6f}",
-                },
-            )
+            row = self._token_usage_row(user_id, profile_id, usage, operation)
+            if not token_usage_writer.enqueue(row):
+                add_result = cast(object, db_session.add(TokenUsage(**row)))
+                if isinstance(add_result, Awaitable):
+                    await add_result
+                await db_session.commit()
+
+            self._record_token_usage(user_id, usage, operation)
         except Exception as e:
             logger.error("Failed to track token usage: %s", e)
             await db_session.rollback()
 
+    def _token_usage_row(
+        self,
+        user_id: str,
+        profile_id: str | None,
+        usage: LLMTokenUsage,
+        operation: str | None,
+    ) -> dict[str, Any]:
+        return {
+            "user_id": user_id,
+            "profile_id": profile_id,
+            "prompt_tokens": usage.prompt_tokens,
+            "completion_tokens": usage.completion_tokens,
+            "total_tokens": usage.total_tokens,
+            "estimated_cost": usage.estimated_cost,
+            "operation": operation,
+            "model": self.model,
+        }
+
+    def _record_token_usage(
+        self, user_id: str, usage: LLMTokenUsage, operation: str | None
+    ) -> None:
+        record_llm_usage_metrics(
+            operation=operation,
+            model=self.model,
+            prompt_tokens=usage.prompt_tokens,
+            completion_tokens=usage.completion_tokens,
+            total_tokens=usage.total_tokens,
+            estimated_cost=usage.estimated_cost,
+        )
+
+        logger.info(
+            "Token usage tracked",
+            extra={
+                "user_id": user_id,
+                "operation": operation,
+                "total_tokens": usage.total_tokens,
+                "cost": round(usage.estimated_cost, 6),
+            },
+        )
+
 
 __all__ = ["EnhancedLLMService", "LLMParsingError"]
@@ -2,13 +2,19 @@
 
 from __future__ import annotations
 
+import asyncio
 import base64
 import importlib
 import io
 import logging
-from dataclasses import dataclass
-from typing import Literal, Sequence
-
+import re
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache, partial, reduce
+from typing import Callable, Iterator, Literal, Sequence, cast
+
+import orjson
 from openai import (
     APIConnectionError,
     APIError,
@@ -20,14 +26,16 @@ from openai import (
 )
 from openai.types.chat.chat_completion import ChatCompletion
 from PIL import Image, ImageOps, UnidentifiedImageError
-from pydantic import BaseModel, Field, field_validator
 from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 
+from app.core.cache import TTL_1_DAY, CacheClient, ocr_cache_key
 from app.core.errors import ApplicationError, ErrorCode
-from app.services.llm import TokenUsage as LLMTokenUsage
+from app.services.llm import TokenUsage as LLMTokenUsage, get_openai_client
 
 logger = logging.getLogger("app.services.media")
 
+_WHITESPACE_RE = re.compile(r"\s+")
+
 
 def _register_heif_opener() -> None:
     """Try to enable HEIF/HEIC decoding via pillow-heif dynamically."""
@@ -45,6 +53,90 @@ def _register_heif_opener() -> None:
 _register_heif_opener()
 
 
+def _load_b64encode() -> Callable[[bytes], bytes]:
+    """Prefer SIMD-accelerated pybase64 when installed, falling back to the stdlib."""
+    try:
+        module = importlib.import_module("pybase64")
+    except Exception as exc:  # pragma: no cover - optional dependency
+        logger.debug("pybase64 is unavailable", extra={"error": str(exc)})
+        return base64.b64encode
+
+    encode = getattr(module, "b64encode", None)
+    if not callable(encode):
+        return base64.b64encode
+    return cast(Callable[[bytes], bytes], encode)
+
+
+_b64encode = _load_b64encode()
+
+
+# Start-of-frame markers carry the image geometry (DHT, JPG and DAC share the 0xC* range).
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# Baseline, extended and progressive Huffman frames: the ones every decoder accepts.
+_JPEG_PASSTHROUGH_SOF_MARKERS = frozenset({0xC0, 0xC1, 0xC2})
+# APPn/COM segments safe to forward: JFIF (APP0), ICC profile (APP2) and Adobe (APP14).
+# Anything else (EXIF/XMP in APP1, IPTC in APP13, comments) may carry personal metadata.
+_JPEG_METADATA_MARKERS = frozenset({*range(0xE0, 0xF0), 0xFE}) - {0xE0, 0xE2, 0xEE}
+# Markers without a length field: TEM and the RSTn restart markers.
+_JPEG_STANDALONE_MARKERS = frozenset({0x01, *range(0xD0, 0xD8)})
+
+
+def _jpeg_segments(data: bytes) -> Iterator[tuple[int, int, int]]:
+    """Yield (marker, payload start, payload end) for each length-prefixed JPEG segment."""
+    offset, end = 2, len(data)
+    while offset + 4 <= end:
+        if data[offset] != 0xFF:
+            return
+        marker = data[offset + 1]
+        if marker == 0xFF:  # fill byte
+            offset += 1
+            continue
+        if marker in _JPEG_STANDALONE_MARKERS:
+            offset += 2
+            continue
+        (length,) = struct.unpack_from(">H", data, offset + 2)
+        yield marker, offset + 4, offset + 2 + length
+        offset += 2 + length
+
+
+def _jpeg_passthrough_size(data: bytes) -> tuple[int, int] | None:
+    """
+    Return (width, height) of a JPEG that can be sent without re-encoding.
+
+    Only the marker headers are parsed. None is returned when the data is not a JPEG,
+    carries metadata segments (EXIF, XMP, IPTC, comments) that re-encoding would strip,
+    is not an 8-bit baseline/progressive Huffman frame, is not grayscale/YCbCr (e.g.
+    CMYK), or its header cannot be read.
+    """
+    if not data.startswith(b"\xff\xd8"):
+        return None
+    size: tuple[int, int] | None = None
+    # Headers up to the first scan are checked: metadata may follow the frame header.
+    for marker, segment, _ in _jpeg_segments(data):
+        if marker in _JPEG_METADATA_MARKERS:
+            return None
+        if marker in _JPEG_SOF_MARKERS:
+            if marker not in _JPEG_PASSTHROUGH_SOF_MARKERS or segment + 6 > len(data):
+                return None
+            precision, height, width, components = struct.unpack_from(">BHHB", data, segment)
+            if precision != 8 or not (width and height) or components not in (1, 3):
+                return None
+            size = (width, height)
+        elif marker == 0xDA:
+            return size
+    return None
+
+
+@lru_cache(maxsize=None)
+def _image_executor(max_workers: int) -> ThreadPoolExecutor:
+    """Return the process-wide thread pool used for Pillow decode/resize/encode work.
+
+    OCRService is built per request, so the pool is shared across instances (one per
+    ``max_workers`` value) instead of being created and torn down with each service.
+    """
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ocr-image")
+
+
 @dataclass(slots=True)
 class ImageInput:
     """Raw image payload received from the transport layer."""
@@ -85,31 +177,71 @@ class OCRAnalysis:
     usage: LLMTokenUsage
 
 
-class _VisionPayload(BaseModel):
-    """JSON payload returned by GPT-4 Vision OCR prompt."""
+_TRUE_STRINGS = frozenset({"1", "on", "t", "true", "y", "yes"})
+_FALSE_STRINGS = frozenset({"0", "off", "f", "false", "n", "no"})
 
-    full_text: str = Field(default="", description="Full recognized text in any language.")
-    target_text: str = Field(
-        default="", description="Only fragments written in the requested target language."
-    )
-    detected_languages: list[str] = Field(
-        default_factory=list, description="Detected ISO-639-1 language codes ordered by relevance."
-    )
-    contains_target_language: bool = Field(
-        default=False, description="Whether target language text was found."
-    )
 
-    @field_validator("full_text", "target_text", mode="before")
+def _coerce_text(value: object) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (list, tuple)):
+        parts = [str(item).strip() for item in value if item]
+        return "\n".join(parts)
+    return str(value)
+
+
+def _coerce_bool(value: object) -> bool:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str):
+        lowered = value.strip().lower()
+        if lowered in _TRUE_STRINGS:
+            return True
+        if lowered in _FALSE_STRINGS:
+            return False
+    raise ValueError(f"Invalid boolean in vision payload: {value!r}")
+
+
+@dataclass(slots=True, frozen=True)
+class _VisionPayload:
+    """
+    JSON payload returned by GPT-4 Vision OCR prompt.
+
+    Decoded with orjson and a few explicit coercions instead of a Pydantic model: this
+    runs on every vision response and cached OCR hit, and the schema is four fields.
+    """
+
+    full_text: str = ""  # Full recognized text in any language
+    target_text: str = ""  # Only fragments written in the requested target language
+    detected_languages: list[str] = field(default_factory=list)  # ISO-639-1, by relevance
+    contains_target_language: bool = False
+
     @classmethod
-    def _coerce_text(cls, value: object) -> str:
-        if value is None:
-            return ""
-        if isinstance(value, str):
-            return value
-        if isinstance(value, (list, tuple)):
-            parts = [str(item).strip() for item in value if item]
-            return "\n".join(parts)
-        return str(value)
+    def from_json(cls, content: str | bytes) -> _VisionPayload:
+        """Decode a payload; raises ValueError for malformed JSON or field types."""
+        data = orjson.loads(content)
+        if not isinstance(data, dict):
+            raise ValueError("Vision payload must be a JSON object")
+
+        languages = data.get("detected_languages")
+        if languages is None:
+            languages = []
+        if not isinstance(languages, list) or not all(isinstance(code, str) for code in languages):
+            raise ValueError("detected_languages must be a list of strings")
+
+        return cls(
+            full_text=_coerce_text(data.get("full_text")),
+            target_text=_coerce_text(data.get("target_text")),
+            detected_languages=languages,
+            contains_target_language=_coerce_bool(data.get("contains_target_language", False)),
+        )
+
+    def to_json(self) -> str:
+        return orjson.dumps(self).decode()
 
 
 class OCRService:
@@ -130,13 +262,15 @@ class OCRService:
         max_output_tokens: int = 900,
         timeout: float = 60.0,
         client: AsyncOpenAI | None = None,
+        cache: CacheClient | None = None,
     ) -> None:
         self.model = model
         self.max_images = max_images
         self.max_image_bytes = max_image_bytes
         self.max_image_dimension = max_image_dimension
         self.max_output_tokens = max_output_tokens
-        self._client = client or AsyncOpenAI(api_key=api_key, timeout=timeout)
+        self._client = client or get_openai_client(api_key, timeout)
+        self._cache = cache
 
         logger.info(
             "OCR service initialized",
@@ -167,18 +301,32 @@ class OCRService:
                 message=f"Можно отправить максимум {self.max_images} изображений за раз.",
             )
 
-        processed = [self._prepare_image(image, index=i) for i, image in enumerate(images)]
-
-        segments: list[OCRSegment] = []
-        usage_total = LLMTokenUsage(0, 0, 0)
+        # Pillow releases the GIL while decoding, resizing and encoding, so the images are
+        # prepared in parallel off the event loop instead of blocking it for each one.
+        loop = asyncio.get_running_loop()
+        executor = _image_executor(self.max_images)
+        processed = await asyncio.gather(
+            *(
+                loop.run_in_executor(executor, partial(self._prepare_image, image, index=i))
+                for i, image in enumerate(images)
+            )
+        )
 
-        for item in processed:
-            payload, usage = await self._extract_text(
-                item,
-                target_language_code=target_language_code,
-                target_language_name=target_language_name,
+        # Vision calls are independent and I/O-bound, so they run concurrently; the semaphore
+        # caps in-flight calls per service instance to respect provider rate limits.
+        results = await asyncio.gather(
+            *(
+                self._analyze_image(
+                    item,
+                    target_language_code=target_language_code,
+                    target_language_name=target_language_name,
+                )
+                for item in processed
             )
-            segment = OCRSegment(
+        )
+
+        segments = [
+            OCRSegment(
                 index=item.index,
                 full_text=self._normalize_text(payload.full_text),
                 target_text=self._normalize_text(payload.target_text),
@@ -186,8 +334,11 @@ class OCRService:
                 contains_target_language=payload.contains_target_language,
                 confidence=self._confidence(payload.target_text or payload.full_text),
             )
-            segments.append(segment)
-            usage_total = self._accumulate_usage(usage_total, usage)
+            for item, (payload, _) in zip(processed, results, strict=True)
+        ]
+        usage_total = reduce(
+            self._accumulate_usage, (usage for _, usage in results), LLMTokenUsage(0, 0, 0)
+        )
 
         combined_text = self._combine_segments(segments)
         has_target = any(
@@ -216,6 +367,12 @@ class OCRService:
                 message="Поддерживаются только изображения (JPG, PNG, WEBP, HEIC).",
             )
 
+        # Already-compliant JPEGs (metadata-free, within bounds) are forwarded byte-for-byte:
+        # decoding and re-encoding them would only cost CPU and some quality.
+        size = _jpeg_passthrough_size(payload.data)
+        if size is not None and max(size) <= self.max_image_dimension:
+            return ProcessedImage(index=index, content=payload.data, content_type="image/jpeg")
+
         try:
             image = Image.open(io.BytesIO(payload.data))
         except UnidentifiedImageError as exc:
@@ -224,11 +381,17 @@ class OCRService:
                 message="Не удалось определить формат изображения.",
             ) from exc
 
+        bound = self.max_image_dimension
+        if max(image.size) > bound:
+            # Let libjpeg decode at 1/2, 1/4 or 1/8 scale during the DCT instead of building
+            # the full-resolution buffer; the box keeps the aspect ratio so the reduced image
+            # never drops below the final size. No-op for formats without draft support.
+            ratio = bound / max(image.size)
+            draft_size = (max(1, int(image.width * ratio)), max(1, int(image.height * ratio)))
+            image.draft("RGB", draft_size)
+
         image = ImageOps.exif_transpose(image)
-        if max(image.size) > self.max_image_dimension:
-            ratio = self.max_image_dimension / max(image.size)
-            new_size = (max(1, int(image.width * ratio)), max(1, int(image.height * ratio)))
-            image = image.resize(new_size, Image.LANCZOS)
+        image.thumbnail((bound, bound), Image.LANCZOS)
 
         if image.mode not in {"RGB", "L"}:
             image = image.convert("RGB")
@@ -247,7 +410,8 @@ class OCRService:
         return combined
 
     def _normalize_text(self, text: str, *, limit: int = 4000) -> str:
-        cleaned = " ".join(text.split())
+        # One C-level scan instead of materializing a list of every token via str.split()
+        cleaned = _WHITESPACE_RE.sub(" ", text).strip()
         if not cleaned:
             return ""
         if len(cleaned) > limit:
@@ -269,6 +433,37 @@ class OCRService:
             left.total_tokens + right.total_tokens,
         )
 
+    async def _analyze_image(
+        self,
+        image: ProcessedImage,
+        *,
+        target_language_code: str,
+        target_language_name: str,
+    ) -> tuple[_VisionPayload, LLMTokenUsage]:
+        # Re-uploads of the same photo produce the same processed bytes, so the vision
+        # result is cached by content hash and served with zero token usage.
+        cache_key = ocr_cache_key(image.content, target_language_code)
+        if self._cache is not None:
+            cached = await self._cache.get(cache_key)
+            if cached:
+                try:
+                    payload = _VisionPayload.from_json(cached)
+                except ValueError:
+                    logger.warning("Cached OCR payload is invalid", extra={"cache_key": cache_key})
+                else:
+                    logger.info("OCR cache hit", extra={"image_index": image.index})
+                    return payload, LLMTokenUsage(0, 0, 0)
+
+        payload, usage = await self._extract_text(
+            image,
+            target_language_code=target_language_code,
+            target_language_name=target_language_name,
+        )
+
+        if self._cache is not None:
+            await self._cache.set(cache_key, payload.to_json(), ttl=TTL_1_DAY)
+        return payload, usage
+
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
@@ -282,7 +477,7 @@ class OCRService:
         target_language_code: str,
         target_language_name: str,
     ) -> tuple[_VisionPayload, LLMTokenUsage]:
-        image_url = f"data:{image.content_type};base64,{base64.b64encode(image.content).decode()}"
+        image_url = f"data:{image.content_type};base64,{_b64encode(image.content).decode()}"
         prompt = (
             "You are an OCR engine. Extract all text from the image and respond in JSON with "
             "keys full_text, target_text, detected_languages (ISO-639-1 codes) and "
@@ -329,7 +524,7 @@ class OCRService:
             ) from exc
 
         content = response.choices[0].message.content or "{}"
-        payload = _VisionPayload.model_validate_json(content)
+        payload = _VisionPayload.from_json(content)
         usage = self._usage_from_response(response)
 
         logger.info(
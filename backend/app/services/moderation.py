@@ -2,14 +2,55 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import re
+import time
 from dataclasses import dataclass
-from typing import Any, Mapping, Sequence, cast
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Iterable, Mapping, Sequence, cast
 
-from openai import AsyncOpenAI, OpenAIError
+from openai import AsyncOpenAI, OpenAIError, RateLimitError
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
+
+from app.services.llm import get_openai_client
 
 logger = logging.getLogger("app.services.moderation")
 
+MODERATION_BATCH_SIZE = 32
+
+# Documented moderation categories in sorted order, so a single ordered pass yields the
+# same tuple sorted() would; categories the API adds later take the slower path.
+_KNOWN_CATEGORIES = (
+    "harassment",
+    "harassment/threatening",
+    "hate",
+    "hate/threatening",
+    "illicit",
+    "illicit/violent",
+    "self-harm",
+    "self-harm/instructions",
+    "self-harm/intent",
+    "sexual",
+    "sexual/minors",
+    "violence",
+    "violence/graphic",
+)
+_KNOWN_CATEGORY_SET = frozenset(_KNOWN_CATEGORIES)
+
+_EMOJI_FIRST = "\U0001f300"
+_EMOJI_RE = re.compile(f"[{_EMOJI_FIRST}-\U0001faff]")
+
+# 429s are retried with backoff after the throttle has already slowed down, so a few
+# quick attempts are enough before failing open.
+_retry_rate_limited = retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(multiplier=0.5, min=0.5, max=8),
+    retry=retry_if_exception_type(RateLimitError),
+    reraise=True,
+)
+
 
 @dataclass(slots=True)
 class ModerationDecision:
@@ -22,6 +63,94 @@ class ModerationDecision:
     error: str | None = None
 
 
+class RequestThrottle:
+    """
+    Proactive limiter over requests- and tokens-per-minute budgets.
+
+    Both budgets are token buckets holding one minute of capacity and refilling
+    continuously. A rate-limit response scales the refill rate down by 20% for
+    the next minute; a streak of successful calls restores it earlier.
+    """
+
+    PENALTY_FACTOR = 0.8
+    PENALTY_SECONDS = 60.0
+    MIN_SCALE = 0.2
+    RECOVERY_STREAK = 20
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.requests_per_minute = float(max(1, requests_per_minute))
+        self.tokens_per_minute = float(max(1, tokens_per_minute))
+        self._clock = clock
+        self._requests = self.requests_per_minute
+        self._tokens = self.tokens_per_minute
+        self._updated = clock()
+        self._scale = 1.0
+        self._penalty_until = 0.0
+        self._successes = 0
+
+    @property
+    def scale(self) -> float:
+        return self._scale
+
+    async def acquire(self, tokens: int) -> None:
+        """Wait until one request and ``tokens`` tokens fit in the budgets, then spend them."""
+        needed = float(min(max(tokens, 1), self.tokens_per_minute))
+        while True:
+            self._refill()
+            if self._requests >= 1 and self._tokens >= needed:
+                self._requests -= 1
+                self._tokens -= needed
+                return
+            request_rate = self.requests_per_minute * self._scale / 60
+            token_rate = self.tokens_per_minute * self._scale / 60
+            delay = max(
+                (1 - self._requests) / request_rate,
+                (needed - self._tokens) / token_rate,
+            )
+            await asyncio.sleep(max(delay, 0.0))
+
+    def penalize(self) -> None:
+        """Slow the refill rate down after the provider answered with HTTP 429."""
+        self._refill()
+        self._scale = max(self.MIN_SCALE, self._scale * self.PENALTY_FACTOR)
+        self._penalty_until = self._clock() + self.PENALTY_SECONDS
+        self._successes = 0
+
+    def record_success(self) -> None:
+        """Restore the full rate once enough calls in a row went through."""
+        if self._scale >= 1.0:
+            return
+        self._successes += 1
+        if self._successes >= self.RECOVERY_STREAK:
+            self._scale = 1.0
+            self._successes = 0
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = max(0.0, now - self._updated)
+        self._updated = now
+        if self._scale < 1.0 and now >= self._penalty_until:
+            self._scale = 1.0
+            self._successes = 0
+        minutes = elapsed * self._scale / 60
+        self._requests = min(
+            self.requests_per_minute, self._requests + minutes * self.requests_per_minute
+        )
+        self._tokens = min(self.tokens_per_minute, self._tokens + minutes * self.tokens_per_minute)
+
+
+@lru_cache(maxsize=None)
+def _shared_throttle(requests_per_minute: int, tokens_per_minute: int) -> RequestThrottle:
+    """Return the process-wide throttle; services are built per request, budgets are not."""
+    return RequestThrottle(requests_per_minute, tokens_per_minute)
+
+
 class ModerationService:
     """Thin wrapper over OpenAI Moderation API with local heuristics."""
 
@@ -32,9 +161,18 @@ class ModerationService:
         model: str = "omni-moderation-latest",
         timeout: float = 10.0,
         client: AsyncOpenAI | None = None,
+        requests_per_minute: int = 1000,
+        tokens_per_minute: int = 150_000,
+        throttle: RequestThrottle | None = None,
+        blocklist: Iterable[str] = (),
+        fast_path_max_chars: int = 20,
     ) -> None:
-        self._client = client or AsyncOpenAI(api_key=api_key, timeout=timeout)
+        self._client = client or get_openai_client(api_key, timeout)
         self._model = model
+        self._throttle = throttle or _shared_throttle(requests_per_minute, tokens_per_minute)
+        # Without a blocklist nothing screens short texts, so the fast path stays off.
+        self._blocklist_re = _blocklist_pattern(tuple(blocklist))
+        self._fast_path_max_chars = fast_path_max_chars if self._blocklist_re else 0
 
     async def evaluate(self, text: str) -> ModerationDecision:
         """
@@ -43,73 +181,168 @@ class ModerationService:
         Returns:
             ModerationDecision describing whether the content is acceptable.
         """
-        normalized = text.strip()
-        if not normalized:
-            return ModerationDecision(allowed=True, source="local")
-
-        local_reason = _local_rejection_reason(normalized)
-        if local_reason is not None:
-            return ModerationDecision(
-                allowed=False,
-                reason=local_reason,
-                categories=("spam",),
-                source="local",
-            )
+        decisions = await self.evaluate_many([text])
+        return decisions[0]
+
+    async def evaluate_many(self, texts: Sequence[str]) -> list[ModerationDecision]:
+        """
+        Moderate several snippets, sending the remote checks in batched API calls.
 
+        Local heuristics run per text first; the remaining snippets go to the
+        Moderation API as a list input of at most ``MODERATION_BATCH_SIZE`` items.
+
+        Returns:
+            Decisions aligned with ``texts``.
+        """
+        decisions: list[ModerationDecision | None] = [None] * len(texts)
+        pending: list[tuple[int, str]] = []
+        for index, text in enumerate(texts):
+            normalized = text.strip()
+            if not normalized:
+                decisions[index] = ModerationDecision(allowed=True, source="local")
+                continue
+            local_reason = _local_rejection_reason(normalized)
+            if local_reason is not None:
+                decisions[index] = ModerationDecision(
+                    allowed=False,
+                    reason=local_reason,
+                    categories=("spam",),
+                    source="local",
+                )
+                continue
+            if self._is_trivially_clean(normalized):
+                decisions[index] = ModerationDecision(allowed=True, source="local_fast")
+                continue
+            pending.append((index, normalized))
+
+        for offset in range(0, len(pending), MODERATION_BATCH_SIZE):
+            batch = pending[offset : offset + MODERATION_BATCH_SIZE]
+            verdicts = await self._moderate_batch([text for _, text in batch])
+            for (index, _), decision in zip(batch, verdicts, strict=True):
+                decisions[index] = decision
+
+        return [
+            decision if decision is not None else ModerationDecision(allowed=True, source="openai")
+            for decision in decisions
+        ]
+
+    def _is_trivially_clean(self, text: str) -> bool:
+        return (
+            self._blocklist_re is not None
+            and len(text) <= self._fast_path_max_chars
+            and text.isascii()
+            and self._blocklist_re.search(text) is None
+        )
+
+    async def _moderate_batch(self, inputs: list[str]) -> list[ModerationDecision]:
+        try:
+            response = await self._create_moderation(inputs)
+        except OpenAIError as exc:  # pragma: no cover - defensive logging branch
+            logger.error("Moderation API error: %s", exc)
+            return [
+                ModerationDecision(allowed=True, error=str(exc), source="openai") for _ in inputs
+            ]
+
+        results = _extract_results(response)
+        return [
+            _decision_from_result(results[position] if position < len(results) else None)
+            for position in range(len(inputs))
+        ]
+
+    @_retry_rate_limited
+    async def _create_moderation(self, inputs: list[str]) -> object:
+        await self._throttle.acquire(_estimate_tokens(inputs))
         try:
             response = await self._client.moderations.create(
                 model=self._model,
-                input=normalized,
+                input=inputs[0] if len(inputs) == 1 else inputs,
             )
-        except OpenAIError as exc:  # pragma: no cover - defensive logging branch
-            logger.error("Moderation API error: %s", exc)
-            return ModerationDecision(
-                allowed=True,
-                error=str(exc),
-                source="openai",
+        except RateLimitError:
+            self._throttle.penalize()
+            logger.warning(
+                "Moderation rate limit exceeded, backing off",
+                extra={"scale": self._throttle.scale},
             )
+            raise
+        self._throttle.record_success()
+        return response
 
-        result = _extract_first_result(response)
-        if result is None:
-            return ModerationDecision(allowed=True, source="openai")
-
-        flagged = bool(getattr(result, "flagged", False))
-        if not flagged:
-            return ModerationDecision(allowed=True, source="openai")
-
-        categories = _flagged_categories(getattr(result, "categories", None))
-        logger.warning(
-            "Moderation flagged content",
-            extra={
-                "categories": categories,
-                "scores": getattr(result, "category_scores", None),
-            },
-        )
-        return ModerationDecision(
-            allowed=False,
-            reason="openai.flagged",
-            categories=categories,
-            source="openai",
-        )
 
+def load_blocklist(path: str | None) -> tuple[str, ...]:
+    """Read a newline-separated blocklist, skipping blanks and ``#`` comments."""
+    if not path:
+        return ()
+    return _read_blocklist(path)
 
-def _extract_first_result(response: object) -> object | None:
-    results = getattr(response, "results", None)
-    if not results:
+
+@lru_cache(maxsize=4)
+def _read_blocklist(path: str) -> tuple[str, ...]:
+    lines = Path(path).read_text(encoding="utf-8").splitlines()
+    return tuple(
+        entry for line in lines if (entry := line.strip().lower()) and not entry.startswith("#")
+    )
+
+
+@lru_cache(maxsize=4)
+def _blocklist_pattern(terms: tuple[str, ...]) -> re.Pattern[str] | None:
+    # One alternation scans the text once for every term; longest terms go first so
+    # overlapping entries report the most specific match.
+    if not terms:
         return None
-    if isinstance(results, Sequence):
-        return cast(object, results[0])
-    return None
+    alternation = "|".join(re.escape(term) for term in sorted(set(terms), key=len, reverse=True))
+    return re.compile(alternation, re.IGNORECASE)
 
 
-def _flagged_categories(categories: Mapping[str, Any] | None) -> tuple[str, ...]:
-    if not categories:
+def _estimate_tokens(inputs: Sequence[str]) -> int:
+    return sum(len(text) // 4 for text in inputs) or 1
+
+
+def _decision_from_result(result: object | None) -> ModerationDecision:
+    if result is None or not bool(getattr(result, "flagged", False)):
+        return ModerationDecision(allowed=True, source="openai")
+
+    categories = _flagged_categories(getattr(result, "categories", None))
+    logger.warning(
+        "Moderation flagged content",
+        extra={
+            "categories": categories,
+            "scores": getattr(result, "category_scores", None),
+        },
+    )
+    return ModerationDecision(
+        allowed=False,
+        reason="openai.flagged",
+        categories=categories,
+        source="openai",
+    )
+
+
+def _extract_results(response: object) -> Sequence[object]:
+    results = getattr(response, "results", None)
+    if not results or not isinstance(results, Sequence):
         return ()
+    return cast(Sequence[object], results)
+
 
-    flagged: list[str] = [
-        name for name, value in categories.items() if isinstance(value, bool) and value
+def _flagged_categories(categories: Mapping[str, Any] | object | None) -> tuple[str, ...]:
+    if not categories:
+        return ()
+    if not isinstance(categories, Mapping):
+        # The SDK returns a pydantic model whose aliases are the API category names.
+        model_dump = getattr(categories, "model_dump", None)
+        if model_dump is None:
+            return ()
+        categories = cast(Mapping[str, Any], model_dump(by_alias=True))
+
+    flagged = tuple(name for name in _KNOWN_CATEGORIES if categories.get(name) is True)
+    if _KNOWN_CATEGORY_SET.issuperset(categories):
+        return flagged
+    extra = [
+        name
+        for name, value in categories.items()
+        if value is True and name not in _KNOWN_CATEGORY_SET
     ]
-    return tuple(sorted(flagged))
+    return tuple(sorted((*flagged, *extra))) if extra else flagged
 
 
 def _local_rejection_reason(text: str) -> str | None:
@@ -130,24 +363,26 @@ def _digits_only(text: str) -> bool:
 
 
 def _has_long_repetition(text: str, threshold: int = 8) -> bool:
-    count = 0
-    previous = ""
-    for char in text:
-        if char == previous:
-            count += 1
-        else:
-            count = 1
-            previous = char
-        if count >= threshold:
-            return True
-    return False
+    return _repetition_pattern(threshold).search(text) is not None
+
+
+@lru_cache(maxsize=8)
+def _repetition_pattern(threshold: int) -> re.Pattern[str]:
+    return re.compile(rf"(.)\1{{{max(threshold - 1, 0)},}}", re.DOTALL)
 
 
 def _emoji_ratio(text: str) -> float:
-    if not text:
+    # isascii() reads a flag and max() is a single C-level sweep, so the common
+    # text-only message never reaches the regex scan.
+    if not text or text.isascii() or max(text) < _EMOJI_FIRST:
         return 0.0
-    emoji_count = sum(1 for char in text if 0x1F300 <= ord(char) <= 0x1FAFF)
-    return emoji_count / len(text)
+    return len(_EMOJI_RE.findall(text)) / len(text)
 
 
-__all__ = ["ModerationDecision", "ModerationService"]
+__all__ = [
+    "MODERATION_BATCH_SIZE",
+    "ModerationDecision",
+    "ModerationService",
+    "RequestThrottle",
+    "load_blocklist",
+]
@@ -5,6 +5,8 @@ from __future__ import annotations
 import asyncio
 import logging
 
+from sqlalchemy.ext.asyncio import AsyncSession
+
 from app.core.config import settings
 from app.core.db import AsyncSessionFactory
 from app.repositories.language_profile import LanguageProfileRepository
@@ -22,6 +24,7 @@ class NotificationWorker:
         self.interval_seconds = interval_seconds
         self._task: asyncio.Task[None] | None = None
         self._stop_event = asyncio.Event()
+        self._service: NotificationService | None = None
 
     def start(self) -> None:
         if self._task is not None:
@@ -55,7 +58,17 @@ class NotificationWorker:
 
     async def _process_cycle(self) -> None:
         async with AsyncSessionFactory() as session:
-            service = NotificationService(
+            service = self._service_for(session)
+            created = await service.process_streak_reminders()
+            await session.commit()
+            if created:
+                logger.info("Generated streak reminders", extra={"count": created})
+
+    def _service_for(self, session: AsyncSession) -> NotificationService:
+        # The service is stateless apart from its repositories, so it is built once and
+        # rebound to each cycle's fresh session.
+        if self._service is None:
+            self._service = NotificationService(
                 NotificationRepository(session),
                 StreakReminderRepository(session),
                 LanguageProfileRepository(session),
@@ -64,10 +77,9 @@ class NotificationWorker:
                 window_end=settings.streak_reminder_window_end,
                 retention_days=settings.streak_reminder_retention_days,
             )
-            created = await service.process_streak_reminders()
-            await session.commit()
-            if created:
-                logger.info("Generated streak reminders", extra={"count": created})
+        else:
+            self._service.bind_session(session)
+        return self._service
 
 
 notification_worker = NotificationWorker(settings.notifications_worker_interval_seconds)
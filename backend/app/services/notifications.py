@@ -6,6 +6,8 @@ import logging
 import uuid
 from dataclasses import dataclass
 from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any
 from zoneinfo import ZoneInfo
 
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -14,12 +16,28 @@ from app.core.errors import ErrorCode, NotFoundError
 from app.models.language_profile import LanguageProfile
 from app.models.notification import Notification, NotificationType
 from app.models.user import User
+from app.repositories.base import BaseRepository
 from app.repositories.language_profile import LanguageProfileRepository
 from app.repositories.notification import NotificationRepository, StreakReminderRepository
 from app.repositories.stats import StatsRepository
 
 logger = logging.getLogger("app.services.notifications")
 
+_UTC = ZoneInfo("UTC")
+
+
+@lru_cache(maxsize=512)
+def _cached_zoneinfo(tz_name: str) -> ZoneInfo:
+    """Resolve a user timezone once per name, falling back to UTC for unknown keys."""
+    try:
+        return ZoneInfo(tz_name)
+    except Exception:  # noqa: BLE001
+        logger.warning(
+            "Unknown timezone for user, falling back to UTC",
+            extra={"tz": tz_name},
+        )
+        return _UTC
+
 
 @dataclass(slots=True)
 class NotificationListResult:
@@ -30,6 +48,28 @@ class NotificationListResult:
     unread_count: int
 
 
+_STREAK_REMINDER_TITLE = "Не потеряйте стрик!"
+
+
+@lru_cache(maxsize=4096)
+def _streak_message(streak: int) -> str:
+    """Render the reminder body once per streak length; many users share a length."""
+    return (
+        f"У вас {streak} дней подряд обучения. "
+        "Выполните хотя бы одно задание сегодня, чтобы не потерять прогресс!"
+    )
+
+
+@dataclass(slots=True)
+class _ReminderCandidate:
+    """Profile inside its reminder window, awaiting the bulk sent/activity checks."""
+
+    profile: LanguageProfile
+    user: User
+    timezone: ZoneInfo
+    local_date: date
+
+
 class NotificationService:
     """High-level notification operations plus scheduled reminder generation."""
 
@@ -57,6 +97,17 @@ class NotificationService:
         """Expose the shared AsyncSession instance."""
         return self.notification_repo.session
 
+    def bind_session(self, session: AsyncSession) -> None:
+        """Point every repository at ``session`` so one service can span many sessions."""
+        repositories: tuple[BaseRepository[Any], ...] = (
+            self.notification_repo,
+            self.reminder_repo,
+            self.profile_repo,
+            self.stats_repo,
+        )
+        for repository in repositories:
+            repository.session = session
+
     async def list_notifications(
         self,
         user: User,
@@ -100,75 +151,67 @@ class NotificationService:
     ) -> int:
         """Generate streak reminders for users that have not studied today."""
         now = current_time or datetime.now(tz=timezone.utc)
-        created = 0
 
         await self._cleanup_old_reminders(now.date())
 
-        profiles = await self.profile_repo.list_active_with_users()
-        for profile in profiles:
+        # Only owners whose local hour is inside the window are streamed from the DB.
+        timezones = [
+            name
+            for name in await self.profile_repo.list_reminder_timezones()
+            if self._within_window(now.astimezone(self._resolve_timezone(name)))
+        ]
+        if not timezones:
+            return 0
+
+        candidates: list[_ReminderCandidate] = []
+        async for profile in self.profile_repo.stream_reminder_candidates(timezones):
             user = profile.user
             if user is None:
                 continue
             tz = self._resolve_timezone(user.timezone)
-            local_time = now.astimezone(tz)
+            candidates.append(_ReminderCandidate(profile, user, tz, now.astimezone(tz).date()))
+        if not candidates:
+            return 0
 
-            if not self._within_window(local_time):
-                continue
-            if profile.streak <= 0:
-                continue
+        already_sent = await self.reminder_repo.was_sent_on_for_dates(
+            [(item.user.id, item.profile.id, item.local_date) for item in candidates]
+        )
+        last_activity = await self.stats_repo.last_activity_for(
+            [(item.user.id, item.profile.id) for item in candidates]
+        )
 
-            local_date = local_time.date()
-            already_sent = await self.reminder_repo.was_sent_on(user.id, profile.id, local_date)
-            if already_sent:
+        pending_notifications: list[dict[str, Any]] = []
+        pending_logs: list[tuple[uuid.UUID, uuid.UUID, date]] = []
+        for item in candidates:
+            user, profile, local_date = item.user, item.profile, item.local_date
+            if (user.id, profile.id, local_date) in already_sent:
                 continue
-
-            if await self._has_activity_today(user.id, profile.id, tz, local_date):
+            latest = last_activity.get((user.id, profile.id))
+            if latest is not None and latest.astimezone(item.timezone).date() >= local_date:
                 continue
 
-            notification = Notification(
-                user_id=user.id,
-                type=NotificationType.STREAK_REMINDER,
-                title="Не потеряйте стрик!",
-                message=self._build_streak_message(profile),
-                data={
-                    "profile_id": str(profile.id),
-                    "language": profile.language,
-                    "language_name": profile.language_name,
-                    "streak": profile.streak,
-                },
-            )
-            await self.notification_repo.add(notification)
-            await self.reminder_repo.log_sent(
-                user.id,
-                profile.id,
-                local_date,
-                sent_at=now,
+            pending_notifications.append(
+                {
+                    "user_id": user.id,
+                    "type": NotificationType.STREAK_REMINDER,
+                    "title": _STREAK_REMINDER_TITLE,
+                    "message": self._build_streak_message(profile),
+                    "data": {
+                        "profile_id": str(profile.id),
+                        "language": profile.language,
+                        "language_name": profile.language_name,
+                        "streak": profile.streak,
+                    },
+                }
             )
-            created += 1
-        return created
+            pending_logs.append((user.id, profile.id, local_date))
 
-    async def _has_activity_today(
-        self,
-        user_id: uuid.UUID,
-        profile_id: uuid.UUID,
-        timezone_obj: ZoneInfo,
-        day: date,
-    ) -> bool:
-        last_activity = await self.stats_repo.last_activity(user_id, profile_id)
-        if last_activity is None:
-            return False
-        return last_activity.astimezone(timezone_obj).date() >= day
+        await self.notification_repo.add_many(pending_notifications)
+        await self.reminder_repo.log_sent_many(pending_logs, sent_at=now)
+        return len(pending_notifications)
 
     def _resolve_timezone(self, tz_name: str | None) -> ZoneInfo:
-        if tz_name:
-            try:
-                return ZoneInfo(tz_name)
-            except Exception:  # noqa: BLE001
-                logger.warning(
-                    "Unknown timezone for user, falling back to UTC",
-                    extra={"tz": tz_name},
-                )
-        return ZoneInfo("UTC")
+        return _cached_zoneinfo(tz_name) if tz_name else _UTC
 
     def _within_window(self, local_time: datetime) -> bool:
         hour = local_time.hour
@@ -178,10 +221,7 @@ class NotificationService:
         return hour >= self.window_start or hour < self.window_end
 
     def _build_streak_message(self, profile: LanguageProfile) -> str:
-        return (
-            f"У вас {profile.streak} дней подряд обучения. "
-            "Выполните хотя бы одно задание сегодня, чтобы не потерять прогресс!"
-        )
+        return _streak_message(profile.streak)
 
     async def _cleanup_old_reminders(self, today: date) -> None:
         if self.retention_days <= 0:
@@ -14,6 +14,8 @@ from typing import TYPE_CHECKING, Any
 import tiktoken
 from jinja2 import Environment, FileSystemLoader
 
+from app.services.llm import get_basic_system_prompt
+
 if TYPE_CHECKING:
     from app.models.language_profile import LanguageProfile
 
@@ -155,39 +157,6 @@ def get_system_prompt_for_profile(renderer: PromptRenderer, profile: LanguagePro
         return get_basic_system_prompt(profile.interface_language)
 
 
-def get_basic_system_prompt(language_code: str | None = None) -> str:
-    """
-    Get basic system prompt for language teacher (fallback).
-
-    This is a fallback when prompt templates are not available.
-
-    Args:
-        language_code: User's language code from Telegram
-
-    Returns:
-        System prompt text
-    """
-    interface_lang = "Russian" if language_code in ("ru", None) else "English"
-
-    return f"""You are a professional language teacher helping students learn new languages.
-
-Your role:
-- Answer questions about language learning
-- Provide clear, helpful explanations
-- Be encouraging and supportive
-- Keep responses concise and focused
-
-Communication:
-- Respond in {interface_lang}
-- Use simple, clear language
-- Provide examples when helpful
-- Stay on topic (language learning)
-
-If the user asks something not related to language learning,
-politely redirect them to language topics.
-"""
-
-
 __all__ = [
     "PromptRenderer",
     "count_tokens",
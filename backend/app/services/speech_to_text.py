@@ -20,6 +20,8 @@ from openai import (
 from openai._types import NOT_GIVEN
 from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 
+from app.services.llm import get_openai_client
+
 logger = logging.getLogger("app.services.speech_to_text")
 
 _LANGUAGE_CODE_ALIASES = {
@@ -132,7 +134,7 @@ class SpeechToTextService:
     ) -> None:
         self.model = model
         self.default_timeout = default_timeout
-        self.client = client or AsyncOpenAI(api_key=api_key, timeout=default_timeout)
+        self.client = client or get_openai_client(api_key, default_timeout)
 
         logger.info(
             "Speech-to-text service initialized",
@@ -0,0 +1,97 @@
+"""Background writer that batches token usage rows into bulk inserts."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any
+
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.core.db import AsyncSessionFactory
+from app.models import TokenUsage
+
+logger = logging.getLogger("app.services.token_usage_worker")
+
+
+class TokenUsageWriter:
+    """Buffers token usage rows in memory and flushes them with one INSERT per batch."""
+
+    def __init__(self, batch_size: int, flush_interval_seconds: float) -> None:
+        self.batch_size = max(1, batch_size)
+        self.flush_interval_seconds = flush_interval_seconds
+        self._queue: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+        self._task: asyncio.Task[None] | None = None
+        self._stop_event = asyncio.Event()
+        # Wakes the loop before the interval elapses (a full batch is queued, or shutdown)
+        self._wake_event = asyncio.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._stop_event.clear()
+        self._wake_event.clear()
+        self._task = asyncio.create_task(self._run(), name="token-usage-writer")
+        logger.info(
+            "Token usage writer scheduled",
+            extra={
+                "batch_size": self.batch_size,
+                "flush_interval_seconds": self.flush_interval_seconds,
+            },
+        )
+
+    async def shutdown(self) -> None:
+        if self._task is None:
+            return
+        self._stop_event.set()
+        self._wake_event.set()
+        await self._task
+        self._task = None
+        logger.info("Token usage writer stopped")
+
+    def enqueue(self, row: dict[str, Any]) -> bool:
+        """Queue a token usage row; returns False when the writer is not running."""
+        if self._task is None:
+            return False
+        self._queue.put_nowait(row)
+        if self._queue.qsize() >= self.batch_size:
+            self._wake_event.set()
+        return True
+
+    async def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                await asyncio.wait_for(self._wake_event.wait(), timeout=self.flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake_event.clear()
+            await self._drain()
+
+    async def _drain(self) -> None:
+        while not self._queue.empty():
+            rows = [self._queue.get_nowait()]
+            while len(rows) < self.batch_size and not self._queue.empty():
+                rows.append(self._queue.get_nowait())
+            try:
+                await self._flush(rows)
+            except Exception:  # noqa: BLE001
+                logger.exception("Failed to flush token usage", extra={"rows": len(rows)})
+
+    async def _flush(self, rows: list[dict[str, Any]]) -> None:
+        async with AsyncSessionFactory() as session:
+            await session.execute(insert(TokenUsage), rows)
+            await session.commit()
+        logger.debug("Flushed token usage", extra={"rows": len(rows)})
+
+
+token_usage_writer = TokenUsageWriter(
+    batch_size=settings.token_usage_batch_size,
+    flush_interval_seconds=settings.token_usage_flush_interval_seconds,
+)
+
+__all__ = ["TokenUsageWriter", "token_usage_writer"]
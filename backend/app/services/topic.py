@@ -162,8 +162,7 @@ class TopicService:
             target_level=profile.target_level,
             goals=list(profile.goals),
         )
-        await self.llm_service.track_token_usage(
-            db_session=self.session,
+        self.llm_service.schedule_token_usage(
             user_id=str(user.id),
             profile_id=str(profile.id),
             usage=usage,
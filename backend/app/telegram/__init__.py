@@ -14,6 +14,8 @@ speech_to_text_service = SpeechToTextService(
     default_timeout=settings.voice_transcription_timeout,
 )
 
+cache_client = CacheClient(settings.redis_url)
+
 ocr_service = OCRService(
     api_key=settings.openai_api_key.get_secret_value(),
     model=settings.ocr_vision_model,
@@ -22,10 +24,9 @@ ocr_service = OCRService(
     max_image_dimension=settings.ocr_max_image_dimension,
     max_output_tokens=settings.ocr_max_output_tokens,
     timeout=settings.ocr_vision_timeout,
+    cache=cache_client,
 )
 
-cache_client = CacheClient(settings.redis_url)
-
 telegram_bot = TelegramBot(
     token=settings.telegram_bot_token.get_secret_value(),
     environment=settings.environment,
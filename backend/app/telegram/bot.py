@@ -215,7 +215,7 @@ class TelegramBot:
         from app.repositories.user import UserRepository
         from app.services.dialog import DialogService
         from app.services.llm import LLMService
-        from app.services.moderation import ModerationService
+        from app.services.moderation import ModerationService, load_blocklist
         from app.services.user import UserService
 
         async with AsyncSessionFactory() as session:
@@ -240,6 +240,10 @@ class TelegramBot:
             moderation_service = ModerationService(
                 api_key=settings.openai_api_key.get_secret_value(),
                 model=settings.openai_moderation_model,
+                requests_per_minute=settings.moderation_rpm,
+                tokens_per_minute=settings.moderation_tpm,
+                blocklist=load_blocklist(settings.moderation_blocklist_path),
+                fast_path_max_chars=settings.moderation_fast_path_max_chars,
             )
             dialog_service = DialogService(llm_service, conversation_repo, moderation_service)
 
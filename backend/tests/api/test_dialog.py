@@ -146,6 +146,32 @@ async def test_history_endpoint_orders_messages_chronologically(
     assert payload["pagination"]["next_offset"] == 1
 
 
+@pytest.mark.asyncio
+async def test_history_endpoint_returns_full_page_oldest_first(
+    dialog_stub: StubDialogService,
+) -> None:
+    newest_first = [
+        SimpleNamespace(
+            id=uuid.uuid4(),
+            profile_id=dialog_stub.profile.id,
+            role=MessageRole.USER if minutes % 2 else MessageRole.ASSISTANT,
+            content=f"msg-{minutes}",
+            timestamp=datetime.now(tz=timezone.utc) - timedelta(minutes=minutes),
+        )
+        for minutes in range(3)
+    ]
+    dialog_stub.set_history(newest_first)
+
+    async with AsyncClient(app=app, base_url="http://testserver") as client:
+        response = await client.get("/api/dialog/history", params={"limit": 3})
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert [message["content"] for message in payload["messages"]] == ["msg-2", "msg-1", "msg-0"]
+    assert payload["messages"][0]["role"] == "assistant"
+    assert payload["pagination"]["has_more"] is False
+
+
 @pytest.mark.asyncio
 async def test_chat_endpoint_rejects_unknown_profile(
     dialog_stub: StubDialogService,
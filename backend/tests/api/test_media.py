@@ -5,7 +5,7 @@ import uuid
 from collections.abc import Iterator
 from datetime import datetime, timezone
 from types import SimpleNamespace
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, Mock
 
 import pytest
 import pytest_asyncio
@@ -14,7 +14,7 @@ from PIL import Image
 from sqlalchemy.ext.asyncio import AsyncSession
 
 import app.api.routes.media as media_routes
-from app.api.dependencies import build_ocr_service, get_cache_client
+from app.api.dependencies import build_enhanced_llm_service, build_ocr_service, get_cache_client
 from app.core.auth import get_current_user
 from app.core.db import get_session
 from app.main import app
@@ -94,6 +94,13 @@ def override_dependencies(
     _CURRENT_USER["value"] = None
 
 
+@pytest.fixture()
+def clear_enhanced_llm_service_cache() -> Iterator[None]:
+    build_enhanced_llm_service.cache_clear()
+    yield
+    build_enhanced_llm_service.cache_clear()
+
+
 @pytest.mark.asyncio
 async def test_media_ocr_returns_payload(user_profile: tuple[User, LanguageProfile]) -> None:
     user, profile = user_profile
@@ -128,7 +135,7 @@ async def test_media_ocr_returns_payload(user_profile: tuple[User, LanguageProfi
                 TokenUsage(5, 3, 8),
             )
         ),
-        track_token_usage=AsyncMock(),
+        schedule_token_usage=Mock(),
     )
 
     async def _cache_override() -> SimpleNamespace:
@@ -185,7 +192,7 @@ async def test_media_ocr_uses_active_profile_when_not_specified(
         suggest_words_from_text=AsyncMock(
             return_value=(WordSuggestions(suggestions=[]), TokenUsage(0, 0, 0))
         ),
-        track_token_usage=AsyncMock(),
+        schedule_token_usage=Mock(),
     )
 
     async def _cache_override() -> SimpleNamespace:
@@ -204,3 +211,15 @@ async def test_media_ocr_uses_active_profile_when_not_specified(
     payload = response.json()
     assert payload["profile_id"] == str(profile.id)
     assert payload["has_target_language"] is False
+
+
+def test_enhanced_llm_service_is_built_once_per_cache_client(
+    clear_enhanced_llm_service_cache: None,
+) -> None:
+    cache = object()
+    other_cache = object()
+
+    first = build_enhanced_llm_service(cache)  # type: ignore[arg-type]
+
+    assert build_enhanced_llm_service(cache) is first  # type: ignore[arg-type]
+    assert build_enhanced_llm_service(other_cache) is not first  # type: ignore[arg-type]
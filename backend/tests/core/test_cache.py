@@ -2,18 +2,24 @@
 
 from __future__ import annotations
 
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
 from app.core.cache import (
+    TTL_1_DAY,
     TTL_1_HOUR,
     TTL_30_DAYS,
     TTL_PERMANENT,
     CacheClient,
+    answer_check_cache_key,
     card_cache_key,
+    chat_response_cache_key,
     generic_llm_cache_key,
+    intent_cache_key,
     lemma_cache_key,
+    negative_cache_key,
+    ocr_cache_key,
     topics_cache_key,
     translation_cache_key,
 )
@@ -124,6 +130,77 @@ class TestCacheClient:
 
         assert result is False
 
+    @pytest.mark.asyncio
+    async def test_pipeline_executes_queued_commands(
+        self, cache_client: CacheClient, mock_redis: AsyncMock
+    ) -> None:
+        """Test pipeline is non-transactional and reset after use."""
+        pipe = MagicMock()
+        pipe.execute = AsyncMock(return_value=[True, 1])
+        pipe.reset = AsyncMock()
+        mock_redis.pipeline = MagicMock(return_value=pipe)
+
+        async with cache_client.pipeline() as queued:
+            queued.set("key", "value", ex=60)
+            queued.delete("other")
+            result = await queued.execute()
+
+        assert result == [True, 1]
+        mock_redis.pipeline.assert_called_once_with(transaction=False)
+        pipe.set.assert_called_once_with("key", "value", ex=60)
+        pipe.delete.assert_called_once_with("other")
+        pipe.reset.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_mget_returns_values_aligned_with_keys(
+        self, cache_client: CacheClient, mock_redis: AsyncMock
+    ) -> None:
+        """Test mget issues one MGET and degrades to misses on error."""
+        mock_redis.mget = AsyncMock(return_value=["a", None])
+
+        assert await cache_client.mget("k1", "k2") == ["a", None]
+        mock_redis.mget.assert_awaited_once_with("k1", "k2")
+
+        mock_redis.mget.side_effect = ConnectionError("down")
+        assert await cache_client.mget("k1", "k2") == [None, None]
+        assert await cache_client.mget() == []
+
+    @pytest.mark.asyncio
+    async def test_set_many_pipelines_writes(
+        self, cache_client: CacheClient, mock_redis: AsyncMock
+    ) -> None:
+        """Test set_many queues every SET in one pipeline round-trip."""
+        pipe = MagicMock()
+        pipe.execute = AsyncMock(return_value=[True, True])
+        pipe.reset = AsyncMock()
+        mock_redis.pipeline = MagicMock(return_value=pipe)
+
+        assert await cache_client.set_many({"a": "1", "b": "2"}, ttl=60, ttls={"b": None}) is True
+
+        assert pipe.set.call_count == 2
+        pipe.set.assert_any_call("a", "1", ex=60)
+        pipe.set.assert_any_call("b", "2", ex=None)
+        pipe.execute.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_add_to_set_reports_membership_and_size(
+        self, cache_client: CacheClient, mock_redis: AsyncMock
+    ) -> None:
+        """Test add_to_set sends SADD, SCARD and EXPIRE NX in one round-trip."""
+        pipe = MagicMock()
+        pipe.execute = AsyncMock(return_value=[1, 3, True])
+        pipe.reset = AsyncMock()
+        mock_redis.pipeline = MagicMock(return_value=pipe)
+
+        assert await cache_client.add_to_set("served", "user", ttl=60) == (True, 3)
+
+        pipe.sadd.assert_called_once_with("served", "user")
+        pipe.scard.assert_called_once_with("served")
+        pipe.expire.assert_called_once_with("served", 60, nx=True)
+
+        pipe.execute.side_effect = ConnectionError("down")
+        assert await cache_client.add_to_set("served", "user") == (False, 0)
+
     @pytest.mark.asyncio
     async def test_get_without_connection(self) -> None:
         """Test that operations require connection.
@@ -196,6 +273,47 @@ class TestCacheKeyBuilders:
 
         assert key1 != key2
 
+    def test_chat_response_cache_key(self) -> None:
+        """Test chat key is stable and sensitive to every request parameter."""
+        messages = [{"role": "user", "content": "hola"}]
+        key1 = chat_response_cache_key("gpt-4o-mini", 0.0, 20, None, messages)
+        key2 = chat_response_cache_key("gpt-4o-mini", 0.0, 20, None, list(messages))
+        key3 = chat_response_cache_key("gpt-4o-mini", 0.0, 30, None, messages)
+
+        assert key1 == key2
+        assert key1 != key3
+        assert key1.startswith("llm_chat:gpt-4o-mini:")
+
+    def test_ocr_cache_key(self) -> None:
+        """Test OCR key depends on image bytes and target language."""
+        key = ocr_cache_key(b"jpeg-bytes", "es")
+
+        assert key == ocr_cache_key(b"jpeg-bytes", "es")
+        assert key.startswith("ocr:es:")
+        assert key != ocr_cache_key(b"other-bytes", "es")
+        assert key.split(":")[-1] == ocr_cache_key(b"jpeg-bytes", "de").split(":")[-1]
+
+    def test_intent_cache_key_ignores_case_punctuation_and_spacing(self) -> None:
+        """Test near-duplicate messages share an intent key."""
+        key = intent_cache_key("Translate 'casa'!")
+
+        assert key == intent_cache_key("  translate   casa ")
+        assert key.startswith("intent:")
+        assert key != intent_cache_key("translate perro")
+
+    def test_answer_check_cache_key_only_normalizes_whitespace(self) -> None:
+        """Test answer keys tolerate spacing but keep case and punctuation."""
+        exercise = ("Translate", "house", "la casa", "A1")
+        key = answer_check_cache_key(*exercise[:3], "la casa", exercise[3])
+
+        assert key == answer_check_cache_key(*exercise[:3], " la  casa ", exercise[3])
+        assert key != answer_check_cache_key(*exercise[:3], "La casa", exercise[3])
+        assert key != answer_check_cache_key(*exercise[:3], "la casa", "B2")
+
+    def test_negative_cache_key(self) -> None:
+        """Test negative marker key is derived from the request key."""
+        assert negative_cache_key("topics:123") == "topics:123:neg"
+
 
 class TestCacheTTLConstants:
     """Tests for TTL constants."""
@@ -205,6 +323,10 @@ class TestCacheTTLConstants:
         assert TTL_30_DAYS == 30 * 24 * 3600
         assert TTL_30_DAYS == 2_592_000
 
+    def test_ttl_1_day(self) -> None:
+        """Test 1-day TTL constant."""
+        assert TTL_1_DAY == 86_400
+
     def test_ttl_1_hour(self) -> None:
         """Test 1-hour TTL constant."""
         assert TTL_1_HOUR == 3600
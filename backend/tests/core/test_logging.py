@@ -104,3 +104,31 @@ def test_json_formatter_includes_arbitrary_extra_fields(
     assert payload["openai_code"] == "file_invalid"
     assert payload["response_body"] == {"error": {"message": "bad audio"}}
     assert isinstance(payload["non_serializable"], str)
+
+
+def test_json_formatter_serializes_nested_and_numeric_extras(
+    fresh_logging_module: ModuleType,
+) -> None:
+    logger = logging.getLogger("test-nested")
+    record = logger.makeRecord(
+        name="test-nested",
+        level=logging.INFO,
+        fn="test_logging.py",
+        lno=7,
+        msg="Токены учтены",
+        args=(),
+        exc_info=None,
+        func="test_json_formatter_serializes_nested_and_numeric_extras",
+        extra={
+            "estimated_cost_usd": 0.000123,
+            "details": {1: object()},
+        },
+    )
+
+    formatted = logging_module.JsonLogFormatter().format(record)
+    payload = json.loads(formatted)
+
+    assert "\n" not in formatted
+    assert payload["message"] == "Токены учтены"
+    assert payload["estimated_cost_usd"] == 0.000123
+    assert isinstance(payload["details"]["1"], str)
@@ -118,3 +118,20 @@ async def test_get_for_user_returns_none_for_foreign_deck(db_session: AsyncSessi
 
     assert await repo.get_for_user(deck.id, owner.id)
     assert await repo.get_for_user(deck.id, outsider.id) is None
+
+
+@pytest.mark.asyncio
+async def test_list_owned_by_ids_skips_foreign_decks(db_session: AsyncSession) -> None:
+    repo = DeckRepository(db_session)
+    user = await _create_user(db_session, telegram_id=31)
+    other_user = await _create_user(db_session, telegram_id=32)
+    profile = await _create_profile(db_session, user=user)
+    other_profile = await _create_profile(db_session, user=other_user)
+    own = _deck(profile=profile, owner=user, name="Own")
+    foreign = _deck(profile=other_profile, owner=other_user, name="Foreign")
+    db_session.add_all([own, foreign])
+    await db_session.flush()
+
+    decks = await repo.list_owned_by_ids([own.id, foreign.id, uuid.uuid4()], user.id)
+
+    assert [deck.id for deck in decks] == [own.id]
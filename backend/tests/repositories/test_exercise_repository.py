@@ -83,3 +83,6 @@ async def test_record_and_list_history(db_session: AsyncSession) -> None:
     recent = await repo.last_results_for_topic(topic.id, limit=1)
     assert len(recent) == 1
     assert recent[0].result == ExerciseResultType.CORRECT
+
+    correct, partial, counted = await repo.difficulty_counts_for_topic(topic.id)
+    assert (correct, partial, counted) == (1, 0, 1)
@@ -4,6 +4,7 @@ import uuid
 from datetime import datetime, timezone
 
 import pytest
+from sqlalchemy import inspect
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.group import (
@@ -13,6 +14,7 @@ from app.models.group import (
     GroupMaterial,
     GroupMaterialType,
     GroupMember,
+    GroupRole,
 )
 from app.models.user import User
 from app.repositories.group import GroupInviteRepository, GroupMaterialRepository, GroupRepository
@@ -49,6 +51,46 @@ async def test_group_repository_lists_owner_and_members(db_session: AsyncSession
     assert member_groups and member_groups[0].id == group.id
 
 
+@pytest.mark.asyncio
+async def test_group_repository_list_accessible_resolves_roles(db_session: AsyncSession) -> None:
+    user = _user(1051)
+    other = _user(1052)
+    owned = Group(owner_id=user.id, name="Owned")
+    joined = Group(owner_id=other.id, name="Joined")
+    foreign = Group(owner_id=other.id, name="Foreign")
+    db_session.add_all([user, other, owned, joined, foreign])
+    await db_session.flush()
+    db_session.add_all(
+        [
+            GroupMember(group_id=joined.id, user_id=user.id),
+            GroupMaterial(
+                group_id=joined.id,
+                material_id=uuid.uuid4(),
+                material_type=GroupMaterialType.TOPIC,
+            ),
+        ]
+    )
+    await db_session.flush()
+
+    repo = GroupRepository(db_session)
+
+    assert await repo.list_accessible(user.id) == [
+        (owned, GroupRole.OWNER, 0),
+        (joined, GroupRole.MEMBER, 1),
+    ]
+    assert await repo.list_accessible(user.id, role=GroupRole.OWNER) == [
+        (owned, GroupRole.OWNER, 0)
+    ]
+    assert await repo.list_accessible(user.id, role=GroupRole.MEMBER) == [
+        (joined, GroupRole.MEMBER, 1)
+    ]
+
+    assert await repo.get_with_role(owned.id, user.id) == (owned, GroupRole.OWNER)
+    assert await repo.get_with_role(joined.id, user.id) == (joined, GroupRole.MEMBER)
+    assert await repo.get_with_role(foreign.id, user.id) == (foreign, None)
+    assert await repo.get_with_role(uuid.uuid4(), user.id) is None
+
+
 @pytest.mark.asyncio
 async def test_group_material_repository_counts_and_exists(db_session: AsyncSession) -> None:
     owner = _user(1101)
@@ -97,3 +139,10 @@ async def test_group_invite_repository_returns_pending(db_session: AsyncSession)
 
     assert pending is not None
     assert pending.invitee_id == invitee.id
+    assert await repo.get_invite_state(group.id, invitee.id) == (False, invite.id)
+    assert await repo.get_invite_state(group.id, owner.id) == (False, None)
+
+    loaded = await repo.get(invite.id)
+    assert loaded is not None
+    assert "group" not in inspect(loaded).unloaded
+    assert loaded.group.name == "Invites"
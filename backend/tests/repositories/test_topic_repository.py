@@ -76,3 +76,21 @@ async def test_topic_repository_filters_by_profile(db_session: AsyncSession) ->
     # Deactivate other topics
     await repo.deactivate_profile_topics(profile_primary.id)
     assert topic_primary.is_active is False
+
+
+@pytest.mark.asyncio
+async def test_get_with_profile_for_user_enforces_ownership(db_session: AsyncSession) -> None:
+    user = _build_user()
+    profile = _build_profile(user)
+    topic = _build_topic(profile, "Subjuntivo")
+    db_session.add_all([user, profile, topic])
+    await db_session.commit()
+
+    repo = TopicRepository(db_session)
+
+    loaded = await repo.get_with_profile_for_user(topic.id, user.id)
+    assert loaded is not None
+    assert loaded[0].id == topic.id
+    assert loaded[1].id == profile.id
+
+    assert await repo.get_with_profile_for_user(topic.id, uuid.uuid4()) is None
@@ -136,7 +136,32 @@ class _LLMStub:
         )
         return content, usage
 
-    async def track_token_usage(self, **_: object) -> None:
+    async def generate_cards_batch(
+        self,
+        *,
+        words: list[str],
+        language: str,
+        language_name: str,
+        level: str,
+        goals: list[str],
+    ) -> list[tuple[CardContent, SimpleNamespace] | BaseException]:
+        outcomes: list[tuple[CardContent, SimpleNamespace] | BaseException] = []
+        for word in words:
+            try:
+                outcomes.append(
+                    await self.generate_card(
+                        word=word,
+                        language=language,
+                        language_name=language_name,
+                        level=level,
+                        goals=goals,
+                    )
+                )
+            except ValueError as exc:
+                outcomes.append(exc)
+        return outcomes
+
+    def schedule_token_usage(self, **_: object) -> None:
         return None
 
 
@@ -225,6 +225,24 @@ async def test_get_or_create_default_profile_creates_new() -> None:
     mock_session.flush.assert_awaited_once()
 
 
+@pytest.mark.asyncio
+async def test_get_or_create_default_profile_loads_a_single_row() -> None:
+    service = DialogService(AsyncMock(), AsyncMock())
+    existing_profile = MagicMock(spec=LanguageProfile)
+    mock_session = AsyncMock()
+    mock_result = MagicMock()
+    mock_result.scalar_one_or_none.return_value = existing_profile
+    mock_session.execute = AsyncMock(return_value=mock_result)
+
+    user = User(id=uuid.uuid4(), telegram_id=123456, first_name="Test")
+
+    assert await service.get_or_create_default_profile(user, mock_session) is existing_profile
+
+    stmt = mock_session.execute.await_args.args[0]
+    assert stmt._limit_clause is not None
+    assert "is_active DESC" in str(stmt)
+
+
 @pytest.mark.asyncio
 async def test_get_or_create_default_profile_returns_existing() -> None:
     """Test that get_or_create_default_profile returns existing profile."""
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+import asyncio
 import uuid
 from datetime import datetime, timedelta, timezone
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, Mock
 
 import pytest
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -14,7 +15,39 @@ from app.models.user import User
 from app.repositories.exercise import ExerciseHistoryRepository
 from app.repositories.language_profile import LanguageProfileRepository
 from app.repositories.topic import TopicRepository
+from app.schemas.exercise import ExerciseGenerateRequest, ExerciseSubmitRequest, PendingExercise
+from app.schemas.llm_responses import ExerciseContent, ExerciseResult, Mistake
+from app.services import exercise as exercise_module
 from app.services.exercise import ExerciseService
+from app.services.llm import TokenUsage
+
+
+class _MemoryCache:
+    """Dict-backed stand-in for CacheClient mirroring decode_responses=True."""
+
+    def __init__(self) -> None:
+        self.values: dict[str, str] = {}
+        self.sets: dict[str, set[str]] = {}
+
+    async def get(self, key: str) -> str | None:
+        return self.values.get(key)
+
+    async def set(self, key: str, value: str | bytes, ttl: int | None = None) -> bool:
+        self.values[key] = value.decode() if isinstance(value, bytes) else value
+        return True
+
+    async def add_to_set(self, key: str, member: str, ttl: int | None = None) -> tuple[bool, int]:
+        members = self.sets.setdefault(key, set())
+        added = member not in members
+        members.add(member)
+        return added, len(members)
+
+    async def delete(self, *keys: str) -> bool:
+        removed = [
+            self.values.pop(key, None) is not None or self.sets.pop(key, None) is not None
+            for key in keys
+        ]
+        return any(removed)
 
 
 def _build_user() -> User:
@@ -117,3 +150,328 @@ async def test_determine_difficulty_uses_recent_accuracy(db_session: AsyncSessio
 
     difficulty = await service._determine_difficulty(topic.id)
     assert difficulty == "hard"
+
+
+@pytest.mark.asyncio
+async def test_determine_difficulty_prefers_cached_bucket() -> None:
+    history_repo = AsyncMock()
+    cache_stub = AsyncMock()
+    cache_stub.get.return_value = "hard"
+    service = ExerciseService(history_repo, AsyncMock(), AsyncMock(), AsyncMock(), cache_stub)
+    topic_id = uuid.uuid4()
+
+    difficulty = await service._determine_difficulty(topic_id)
+
+    assert difficulty == "hard"
+    cache_stub.get.assert_awaited_once_with(f"exercise_difficulty:{topic_id}")
+    history_repo.difficulty_counts_for_topic.assert_not_awaited()
+    cache_stub.set.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_generate_exercise_schedules_token_usage(db_session: AsyncSession) -> None:
+    user = _build_user()
+    profile = _build_profile(user)
+    topic = _build_topic(profile)
+    db_session.add_all([user, profile, topic])
+    await db_session.commit()
+
+    llm_stub = AsyncMock()
+    llm_stub.schedule_token_usage = Mock()
+    llm_stub.generate_exercise.return_value = (
+        ExerciseContent(
+            question="Translate",
+            prompt="I have lived",
+            correct_answer="He vivido",
+            explanation="Perfecto",
+        ),
+        TokenUsage(10, 5, 15),
+    )
+    service = ExerciseService(
+        ExerciseHistoryRepository(db_session),
+        TopicRepository(db_session),
+        LanguageProfileRepository(db_session),
+        llm_stub,
+        _MemoryCache(),
+    )
+
+    response = await service.generate_exercise(
+        user, ExerciseGenerateRequest(topic_id=topic.id, type=ExerciseType.FREE_TEXT)
+    )
+    assert response.topic_id == topic.id
+
+    llm_stub.schedule_token_usage.assert_called_once_with(
+        user_id=str(user.id),
+        profile_id=str(profile.id),
+        usage=TokenUsage(10, 5, 15),
+        operation="generate_exercise",
+    )
+
+
+@pytest.mark.asyncio
+async def test_session_payload_round_trip(db_session: AsyncSession) -> None:
+    service = ExerciseService(
+        ExerciseHistoryRepository(db_session),
+        TopicRepository(db_session),
+        LanguageProfileRepository(db_session),
+        AsyncMock(),
+        _MemoryCache(),
+    )
+    pending = PendingExercise(
+        id=uuid.uuid4(),
+        user_id=uuid.uuid4(),
+        profile_id=uuid.uuid4(),
+        topic_id=uuid.uuid4(),
+        type=ExerciseType.MULTIPLE_CHOICE,
+        question="Pick one",
+        prompt="Yo ____",
+        correct_answer="soy",
+        options=["soy", "eres"],
+        correct_index=0,
+        metadata={"difficulty": "easy"},
+    )
+
+    await service._store_session(pending)
+    loaded = await service._load_session(pending.id)
+
+    assert loaded == pending
+
+
+@pytest.mark.asyncio
+async def test_submit_free_text_persists_attempt_with_mistakes(db_session: AsyncSession) -> None:
+    user = _build_user()
+    profile = _build_profile(user)
+    topic = _build_topic(profile)
+    db_session.add_all([user, profile, topic])
+    await db_session.commit()
+
+    pending = PendingExercise(
+        id=uuid.uuid4(),
+        user_id=user.id,
+        profile_id=profile.id,
+        topic_id=topic.id,
+        type=ExerciseType.FREE_TEXT,
+        question="Translate",
+        prompt="I have lived",
+        correct_answer="He vivido",
+        metadata={"difficulty": "medium"},
+    )
+    cache_stub = AsyncMock()
+    cache_stub.get.return_value = pending.model_dump_json()
+    llm_stub = AsyncMock()
+    llm_stub.schedule_token_usage = Mock()
+    llm_stub.check_answer.return_value = (
+        ExerciseResult(
+            result="partial",
+            explanation="Almost",
+            correct_answer="He vivido",
+            feedback="Close!",
+            mistakes=[Mistake(type="spelling", description="Typo", suggestion="vivido")],
+        ),
+        TokenUsage(10, 5, 15),
+    )
+    history_repo = ExerciseHistoryRepository(db_session)
+    service = ExerciseService(
+        history_repo,
+        TopicRepository(db_session),
+        LanguageProfileRepository(db_session),
+        llm_stub,
+        cache_stub,
+    )
+
+    submission = await service.submit_answer(
+        user, pending.id, ExerciseSubmitRequest(answer=" He vivdo ")
+    )
+
+    assert submission.result == ExerciseResultType.PARTIAL
+    llm_stub.schedule_token_usage.assert_called_once()
+    assert llm_stub.schedule_token_usage.call_args.kwargs["operation"] == "check_exercise"
+    cache_stub.delete.assert_awaited_once_with(
+        f"exercise_session:{pending.id}", f"exercise_difficulty:{topic.id}"
+    )
+    assert topic.partial_count == 1
+    entries, total = await history_repo.list_for_user(user.id)
+    assert total == 1
+    assert entries[0].user_answer == "He vivdo"
+    assert entries[0].details["difficulty"] == "medium"
+    assert entries[0].details["mistakes"] == [
+        {"type": "spelling", "description": "Typo", "suggestion": "vivido"}
+    ]
+    assert pending.metadata == {"difficulty": "medium"}
+
+
+@pytest.mark.asyncio
+async def test_grade_free_text_respects_llm_concurrency_cap() -> None:
+    active = 0
+    peak = 0
+
+    async def _check_answer(**_: object) -> tuple[ExerciseResult, TokenUsage]:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0)
+        active -= 1
+        return (
+            ExerciseResult(result="correct", explanation="", correct_answer="A", feedback="Bien"),
+            TokenUsage(1, 1, 2),
+        )
+
+    llm_stub = AsyncMock()
+    llm_stub.check_answer.side_effect = _check_answer
+    service = ExerciseService(AsyncMock(), AsyncMock(), AsyncMock(), llm_stub, AsyncMock())
+    service._llm_semaphore = asyncio.Semaphore(1)
+    pending = PendingExercise(
+        id=uuid.uuid4(),
+        user_id=uuid.uuid4(),
+        profile_id=uuid.uuid4(),
+        topic_id=uuid.uuid4(),
+        type=ExerciseType.FREE_TEXT,
+        question="Q",
+        prompt="P",
+        correct_answer="A",
+    )
+    user = _build_user()
+
+    await asyncio.gather(
+        *(
+            service._grade_free_text(pending, ExerciseSubmitRequest(answer="A"), "A2", user)
+            for _ in range(3)
+        )
+    )
+
+    assert peak == 1
+    assert llm_stub.check_answer.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_generated_exercise_is_shared_but_never_repeated_for_a_user() -> None:
+    llm_stub = AsyncMock()
+    llm_stub.generate_exercise.side_effect = [
+        (
+            ExerciseContent(question="Q1", prompt="P1", correct_answer="A1", explanation="E"),
+            TokenUsage(10, 5, 15),
+        ),
+        (
+            ExerciseContent(question="Q2", prompt="P2", correct_answer="A2", explanation="E"),
+            TokenUsage(10, 5, 15),
+        ),
+    ]
+    service = ExerciseService(AsyncMock(), AsyncMock(), AsyncMock(), llm_stub, _MemoryCache())
+    first_user, second_user = _build_user(), _build_user()
+    first_topic = _build_topic(_build_profile(first_user))
+    second_topic = _build_topic(_build_profile(second_user))
+
+    async def _generate(user: User, topic: Topic) -> tuple[ExerciseContent, TokenUsage | None]:
+        return await service._generate_exercise_content(
+            user=user,
+            topic=topic,
+            level="A2",
+            language="es",
+            exercise_type=ExerciseType.FREE_TEXT,
+            difficulty="medium",
+        )
+
+    generated, usage = await _generate(first_user, first_topic)
+    shared, shared_usage = await _generate(second_user, second_topic)
+    regenerated, _ = await _generate(first_user, first_topic)
+    # The replacement entry starts with a fresh audience, so earlier viewers of Q1 get Q2.
+    reshared, reshared_usage = await _generate(second_user, second_topic)
+
+    assert generated.question == shared.question == "Q1"
+    assert usage is not None
+    assert shared_usage is None
+    assert regenerated.question == reshared.question == "Q2"
+    assert reshared_usage is None
+    assert llm_stub.generate_exercise.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_generated_exercise_is_dropped_after_max_serves(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(ExerciseService, "GENERATED_EXERCISE_MAX_SERVES", 2)
+    llm_stub = AsyncMock()
+    llm_stub.generate_exercise.return_value = (
+        ExerciseContent(question="Q", prompt="P", correct_answer="A", explanation="E"),
+        TokenUsage(10, 5, 15),
+    )
+    cache = _MemoryCache()
+    service = ExerciseService(AsyncMock(), AsyncMock(), AsyncMock(), llm_stub, cache)
+
+    for user in (_build_user(), _build_user(), _build_user()):
+        await service._generate_exercise_content(
+            user=user,
+            topic=_build_topic(_build_profile(user)),
+            level="A2",
+            language="es",
+            exercise_type=ExerciseType.FREE_TEXT,
+            difficulty="medium",
+        )
+
+    # The second serve hit the cap and evicted the entry, so the third user regenerated.
+    assert llm_stub.generate_exercise.await_count == 2
+    assert [len(members) for members in cache.sets.values()] == [1]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_generations_share_a_single_llm_call() -> None:
+    release = asyncio.Event()
+
+    async def _generate_exercise(**_: object) -> tuple[ExerciseContent, TokenUsage]:
+        await release.wait()
+        return (
+            ExerciseContent(question="Q", prompt="P", correct_answer="A", explanation="E"),
+            TokenUsage(10, 5, 15),
+        )
+
+    llm_stub = AsyncMock()
+    llm_stub.generate_exercise.side_effect = _generate_exercise
+    service = ExerciseService(AsyncMock(), AsyncMock(), AsyncMock(), llm_stub, _MemoryCache())
+    users = [_build_user() for _ in range(3)]
+
+    tasks = [
+        asyncio.create_task(
+            service._generate_exercise_content(
+                user=user,
+                topic=_build_topic(_build_profile(user)),
+                level="A2",
+                language="es",
+                exercise_type=ExerciseType.FREE_TEXT,
+                difficulty="medium",
+            )
+        )
+        for user in users
+    ]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert llm_stub.generate_exercise.await_count == 1
+    assert [exercise.question for exercise, _ in results] == ["Q", "Q", "Q"]
+    assert sum(usage is not None for _, usage in results) == 1
+    assert exercise_module._inflight_generations == {}
+
+
+def test_grade_multiple_choice_builds_submission() -> None:
+    service = ExerciseService(AsyncMock(), AsyncMock(), AsyncMock(), AsyncMock(), AsyncMock())
+    pending = PendingExercise(
+        id=uuid.uuid4(),
+        user_id=uuid.uuid4(),
+        profile_id=uuid.uuid4(),
+        topic_id=uuid.uuid4(),
+        type=ExerciseType.MULTIPLE_CHOICE,
+        question="Pick one",
+        prompt="Yo ____",
+        correct_answer="soy",
+        options=["soy", "eres"],
+        correct_index=0,
+    )
+
+    submission, user_answer = service._grade_multiple_choice(
+        pending, ExerciseSubmitRequest(answer=1)
+    )
+
+    assert user_answer == "eres"
+    assert submission.result == ExerciseResultType.INCORRECT
+    assert submission.correct_answer == "soy"
+    assert submission.model_dump()["mistakes"] == []
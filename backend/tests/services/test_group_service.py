@@ -2,14 +2,17 @@ from __future__ import annotations
 
 import uuid
 from datetime import datetime, timedelta, timezone
+from typing import Any
 
 import pytest
+from sqlalchemy import event, inspect
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.errors import ApplicationError, ErrorCode
+from app.core.errors import ApplicationError, ErrorCode, NotFoundError
 from app.models.deck import Deck
-from app.models.group import GroupInviteStatus, GroupMaterialType, GroupRole
+from app.models.group import Group, GroupInviteStatus, GroupMaterialType, GroupRole
 from app.models.language_profile import LanguageProfile
+from app.models.topic import Topic, TopicType
 from app.models.user import User
 from app.repositories.deck import DeckRepository
 from app.repositories.group import (
@@ -20,7 +23,7 @@ from app.repositories.group import (
 )
 from app.repositories.topic import TopicRepository
 from app.repositories.user import UserRepository
-from app.services.group import GroupService
+from app.services.group import GroupService, SharedMaterial
 
 
 def _user(username: str, telegram_id: int) -> User:
@@ -90,6 +93,17 @@ async def test_group_service_invite_and_share_materials(db_session: AsyncSession
         material_ids=[deck.id],
     )
     assert batch.added[0].id == deck.id
+    assert deck.is_group is True
+
+    repeated = await service.add_materials(
+        owner,
+        group.id,
+        material_type=GroupMaterialType.DECK,
+        material_ids=[deck.id, uuid.uuid4()],
+    )
+    assert repeated.added == []
+    assert [entry.id for entry in repeated.already_shared] == [deck.id]
+    assert repeated.failed[0].reason == "not_found"
 
     shared_for_member = await service.list_materials(member, group.id)
     assert shared_for_member and shared_for_member[0].name == deck.name
@@ -118,10 +132,12 @@ async def test_group_service_invite_and_share_materials(db_session: AsyncSession
         material_type=GroupMaterialType.DECK,
     )
     assert await service.list_materials(member, group.id) == []
+    assert deck.is_group is False
     counts = await service.count_materials([group.id])
     assert counts.get(group.id, 0) == 0
 
     await service.leave_group(member, group.id)
+    assert group.members_count == 1
     remaining_members = await service.list_members(owner, group.id)
     assert len(remaining_members) == 1
 
@@ -216,3 +232,192 @@ async def test_accept_invite_marks_expired_requests(db_session: AsyncSession) ->
 
     assert excinfo.value.code == ErrorCode.INVITE_EXPIRED
     assert invite.status == GroupInviteStatus.EXPIRED
+
+
+@pytest.mark.asyncio
+async def test_list_materials_and_members_eager_load_owners(db_session: AsyncSession) -> None:
+    owner = _user("mentor", 121212121)
+    member = _user("pupil", 131313131)
+    profile = _profile(owner)
+    deck = Deck(
+        id=uuid.uuid4(),
+        profile_id=profile.id,
+        name="Verbs",
+        description=None,
+        owner_id=owner.id,
+    )
+    topic = Topic(
+        id=uuid.uuid4(),
+        profile_id=profile.id,
+        name="Subjuntivo",
+        description="Present subjunctive",
+        type=TopicType.GRAMMAR,
+        owner_id=owner.id,
+    )
+    db_session.add_all([owner, member, profile, deck, topic])
+    await db_session.flush()
+
+    service = _service(db_session)
+    group = await service.create_group(owner, "Readers")
+    invite = await service.invite_member(owner, group.id, f"@{member.username}")
+    await service.accept_invite(member, invite.id)
+    for material_type, material_id in (
+        (GroupMaterialType.DECK, deck.id),
+        (GroupMaterialType.TOPIC, topic.id),
+    ):
+        await service.add_materials(
+            owner,
+            group.id,
+            material_type=material_type,
+            material_ids=[material_id],
+        )
+
+    # Drop the identity map: any lazy owner load would now fail under the async session.
+    db_session.expunge_all()
+
+    shared = await service.list_materials(member, group.id)
+    members = await service.list_members(member, group.id)
+
+    assert {item.owner_name for item in shared} == {owner.username}
+    assert members[0].user.username == owner.username
+    assert members[1].user.username == member.username
+    rows = await service.material_repo.list_with_resources(group.id)
+    resources = [resource for _, *pair in rows for resource in pair if resource is not None]
+    assert {resource.id for resource in resources} == {deck.id, topic.id}
+    for loaded in resources:
+        assert "owner" not in inspect(loaded).unloaded
+
+
+@pytest.mark.asyncio
+async def test_add_materials_does_not_preselect_shared_rows(db_session: AsyncSession) -> None:
+    owner = _user("curator", 141414141)
+    profile = _profile(owner)
+    deck = Deck(
+        id=uuid.uuid4(),
+        profile_id=profile.id,
+        name="Idioms",
+        description=None,
+        owner_id=owner.id,
+    )
+    db_session.add_all([owner, profile, deck])
+    await db_session.flush()
+
+    service = _service(db_session)
+    group = await service.create_group(owner, "Library")
+
+    statements: list[str] = []
+
+    def _capture(*args: Any) -> None:  # noqa: ANN401
+        statements.append(args[2])
+
+    engine = db_session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        for _ in range(2):
+            await service.add_materials(
+                owner,
+                group.id,
+                material_type=GroupMaterialType.DECK,
+                material_ids=[deck.id],
+            )
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+
+    material_statements = [sql for sql in statements if "group_materials" in sql]
+    assert material_statements
+    assert all(sql.lstrip().upper().startswith("INSERT") for sql in material_statements)
+
+
+def test_shared_material_default_timestamp_is_per_instance() -> None:
+    first = SharedMaterial(
+        id=uuid.uuid4(),
+        type=GroupMaterialType.DECK,
+        name="First",
+        description=None,
+        owner_id=None,
+        owner_name=None,
+    )
+    second = SharedMaterial(
+        id=uuid.uuid4(),
+        type=GroupMaterialType.TOPIC,
+        name="Second",
+        description=None,
+        owner_id=None,
+        owner_name=None,
+    )
+
+    assert first.shared_at <= second.shared_at
+    assert datetime.now(tz=timezone.utc) - first.shared_at < timedelta(seconds=5)
+
+
+@pytest.mark.asyncio
+async def test_list_invites_expires_overdue_invites(db_session: AsyncSession) -> None:
+    owner = _user("host", 151515151)
+    invitee = _user("guest", 161616161)
+    db_session.add_all([owner, invitee])
+    await db_session.flush()
+
+    service = _service(db_session)
+    group = await service.create_group(owner, "Evening club")
+    invite = await service.invite_member(owner, group.id, f"@{invitee.username}")
+    invite.expires_at = datetime.now(tz=timezone.utc) - timedelta(hours=1)
+    await db_session.flush()
+
+    invites = await service.list_invites(owner, group.id)
+
+    assert [item.id for item in invites] == [invite.id]
+    assert invites[0].status == GroupInviteStatus.EXPIRED
+    assert invites[0].responded_at is not None
+
+
+@pytest.mark.asyncio
+async def test_group_lookups_are_memoized_per_service(
+    db_session: AsyncSession,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    owner = _user("memo", 171717171)
+    db_session.add(owner)
+    await db_session.flush()
+
+    group = await _service(db_session).create_group(owner, "Memo")
+    service = _service(db_session)
+    calls: list[uuid.UUID] = []
+    original_get = service.group_repo.get
+
+    async def _counting_get(group_id: uuid.UUID) -> Group | None:
+        calls.append(group_id)
+        return await original_get(group_id)
+
+    monkeypatch.setattr(service.group_repo, "get", _counting_get)
+
+    await service.update_group(owner, group.id, name="Memo 2")
+    fetched, role = await service.get_group(owner, group.id)
+    await service.list_invites(owner, group.id)
+
+    assert calls == [group.id]
+    assert fetched.name == "Memo 2"
+    assert role == GroupRole.OWNER
+
+    await service.delete_group(owner, group.id)
+    with pytest.raises(NotFoundError):
+        await service.get_group(owner, group.id)
+
+
+@pytest.mark.asyncio
+async def test_cancel_invite_requires_group_owner(db_session: AsyncSession) -> None:
+    owner = _user("keeper", 181818181)
+    invitee = _user("visitor", 191919191)
+    db_session.add_all([owner, invitee])
+    await db_session.flush()
+
+    service = _service(db_session)
+    group = await service.create_group(owner, "Gatekeepers")
+    invite = await service.invite_member(owner, group.id, f"@{invitee.username}")
+
+    with pytest.raises(ApplicationError) as excinfo:
+        await service.cancel_invite(invitee, invite.id)
+    assert excinfo.value.code == ErrorCode.FORBIDDEN
+
+    await service.cancel_invite(owner, invite.id)
+    with pytest.raises(NotFoundError):
+        await service.cancel_invite(owner, invite.id)
@@ -2,12 +2,14 @@ from __future__ import annotations
 
 import uuid
 from datetime import datetime, timezone
+from typing import Any
 
 import pytest
 import pytest_asyncio
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.errors import ApplicationError, ErrorCode
+from app.core.errors import ApplicationError, ErrorCode, NotFoundError
 from app.models.user import User
 from app.repositories.language_profile import LanguageProfileRepository
 from app.schemas.profile import LanguageProfileCreate
@@ -85,6 +87,32 @@ async def test_free_plan_allows_only_single_profile(
     assert exc.value.code == ErrorCode.LIMIT_REACHED
 
 
+@pytest.mark.asyncio
+async def test_create_profile_checks_limits_and_duplicates_in_one_query(
+    service: LanguageProfileService, user: User
+) -> None:
+    user.is_premium = True
+    await service.create_profile(user, _payload(language="es"))
+
+    statements: list[str] = []
+
+    def _capture(*args: Any) -> None:  # noqa: ANN401
+        statements.append(args[2])
+
+    engine = service.session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        await service.create_profile(user, _payload(language="de"))
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+
+    profile_statements = [sql for sql in statements if "language_profiles" in sql]
+    assert [sql.lstrip().split()[0].upper() for sql in profile_statements] == [
+        "SELECT",
+        "INSERT",
+    ]
+
+
 @pytest.mark.asyncio
 async def test_activate_profile_switches_active_flag(
     service: LanguageProfileService, user: User
@@ -96,11 +124,20 @@ async def test_activate_profile_switches_active_flag(
     assert second.is_active is False
 
     activated = await service.activate_profile(user, second.id)
-    await service.session.refresh(first)
 
+    # The single UPDATE ... RETURNING also syncs the already-loaded first profile.
+    assert activated is second
     assert activated.is_active is True
     assert first.is_active is False
 
+    with pytest.raises(NotFoundError):
+        await service.activate_profile(user, uuid.uuid4())
+
+    await service.session.refresh(first)
+    await service.session.refresh(second)
+    assert first.is_active is False
+    assert second.is_active is True
+
 
 @pytest.mark.asyncio
 async def test_delete_profile_requires_at_least_one_remaining(
@@ -111,11 +148,67 @@ async def test_delete_profile_requires_at_least_one_remaining(
     backup = await service.create_profile(user, _payload(language="de"))
 
     await service.delete_profile(user, primary.id)
-    await service.session.refresh(backup)
 
+    # The promote UPDATE ... RETURNING also syncs the already-loaded instances.
+    assert primary.deleted is True
+    assert primary.is_active is False
     assert backup.is_active is True
 
+    with pytest.raises(NotFoundError):
+        await service.delete_profile(user, primary.id)
+
     with pytest.raises(ApplicationError) as exc:
         await service.delete_profile(user, backup.id)
 
     assert exc.value.code == ErrorCode.LAST_PROFILE
+
+
+@pytest.mark.asyncio
+async def test_profile_lookups_reflect_writes(service: LanguageProfileService, user: User) -> None:
+    repository = service.repository
+    assert await repository.get_active_for_user(user.id) is None
+    assert await repository.count_for_user(user.id) == 0
+
+    profile = await service.create_profile(user, _payload())
+
+    assert await repository.get_active_for_user(user.id) is profile
+    assert await repository.count_for_user(user.id) == 1
+    assert await repository.get_by_id_for_user(profile.id, user.id) is profile
+
+
+def test_create_payload_normalizes_language_and_goals() -> None:
+    payload = LanguageProfileCreate(
+        language="ES",
+        current_level="A1",
+        target_level="B1",
+        goals=[" travel ", "   ", "work"],
+    )
+
+    assert payload.language == "es"
+    assert payload.goals == ["travel", "work"]
+
+
+def test_validate_goals_reports_unsupported_and_deduplicates(
+    service: LanguageProfileService,
+) -> None:
+    assert service._validate_goals(["travel", "", "work", "travel"]) == ["travel", "work"]
+
+    with pytest.raises(ApplicationError) as exc:
+        service._validate_goals(["travel", "gaming", "astrology", "gaming"])
+
+    assert exc.value.code == ErrorCode.INVALID_FIELD_VALUE
+    assert exc.value.details == {"invalid": ["astrology", "gaming"]}
+
+
+def test_validate_levels_rejects_unknown_and_descending_levels(
+    service: LanguageProfileService,
+) -> None:
+    service._validate_levels("A2", "A2")
+
+    with pytest.raises(ApplicationError) as exc:
+        service._validate_levels("A2", "Z9")
+    assert exc.value.code == ErrorCode.INVALID_LEVEL
+
+    with pytest.raises(ApplicationError) as exc:
+        service._validate_levels("B2", "A1")
+    assert exc.value.code == ErrorCode.TARGET_BELOW_CURRENT
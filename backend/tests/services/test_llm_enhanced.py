@@ -2,14 +2,41 @@
 
 from __future__ import annotations
 
-from unittest.mock import AsyncMock, Mock
+from collections.abc import Iterator
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
-from app.core.cache import CacheClient
-from app.schemas.llm_responses import CardContent, IntentDetection, WordSuggestion, WordSuggestions
-from app.services.llm import TokenUsage
-from app.services.llm_enhanced import EnhancedLLMService
+from app.core.cache import (
+    TTL_NEGATIVE,
+    CacheClient,
+    chat_response_cache_key,
+    negative_cache_key,
+)
+from app.core.errors import LLMParsingError
+from app.schemas.llm_responses import (
+    CardContent,
+    ExerciseResult,
+    IntentDetection,
+    Mistake,
+    WordSuggestion,
+    WordSuggestions,
+)
+from app.services.llm import LLMService, TokenUsage
+from app.services.llm_enhanced import (
+    EnhancedLLMService,
+    _decode_cached,
+    _encode_cached,
+    _lemma_memory,
+)
+
+
+@pytest.fixture(autouse=True)
+def _empty_lemma_memory() -> Iterator[None]:
+    """The in-process lemma tier is module-level, so isolate it between tests."""
+    _lemma_memory.clear()
+    yield
+    _lemma_memory.clear()
 
 
 @pytest.fixture
@@ -17,6 +44,7 @@ def mock_cache() -> AsyncMock:
     """Create mock cache client."""
     cache = AsyncMock(spec=CacheClient)
     cache.get = AsyncMock(return_value=None)
+    cache.mget = AsyncMock(side_effect=lambda *keys: [None] * len(keys))
     cache.set = AsyncMock(return_value=True)
     return cache
 
@@ -37,7 +65,7 @@ async def test_chat_structured_with_cache_hit(
     """Test chat_structured returns cached result when available."""
     # Setup cache hit with valid IntentDetection JSON
     cached_data = '{"intent": "translate", "confidence": 0.95, "entities": {}}'
-    mock_cache.get.return_value = cached_data
+    mock_cache.mget.side_effect = lambda *keys: [cached_data]
 
     messages = [{"role": "user", "content": "Translate this"}]
     result, usage = await llm_service.chat_structured(
@@ -47,8 +75,8 @@ async def test_chat_structured_with_cache_hit(
         cache_ttl=3600,
     )
 
-    # Verify cache was checked
-    mock_cache.get.assert_awaited_once_with("test_key")
+    # Verify cache was checked (sampled requests carry no failure marker)
+    mock_cache.mget.assert_awaited_once_with("test_key")
 
     # Verify LLM was not called
     llm_service.chat.assert_not_awaited()
@@ -64,9 +92,6 @@ async def test_chat_structured_with_cache_miss(
     llm_service: EnhancedLLMService, mock_cache: AsyncMock
 ) -> None:
     """Test chat_structured calls LLM on cache miss."""
-    # Setup cache miss
-    mock_cache.get.return_value = None
-
     # Setup LLM response
     llm_response = '{"intent": "practice", "confidence": 0.9, "entities": {}}'
     llm_service.chat.return_value = (llm_response, TokenUsage(100, 50, 150))
@@ -80,15 +105,15 @@ async def test_chat_structured_with_cache_miss(
     )
 
     # Verify cache was checked
-    mock_cache.get.assert_awaited_once_with("test_key")
+    mock_cache.mget.assert_awaited_once_with("test_key")
 
     # Verify LLM was called with JSON mode
     llm_service.chat.assert_awaited_once()
     call_kwargs = llm_service.chat.call_args.kwargs
     assert call_kwargs["response_format"] == {"type": "json_object"}
 
-    # Verify result was cached
-    mock_cache.set.assert_awaited_once()
+    # Verify the validated model was cached in the tagged format
+    mock_cache.set.assert_awaited_once_with("test_key", _encode_cached(result), ttl=3600)
 
     # Verify result
     assert isinstance(result, IntentDetection)
@@ -201,11 +226,10 @@ async def test_cache_key_generation(llm_service: EnhancedLLMService, mock_cache:
         goals=["conversation"],
     )
 
-    # Verify cache was set with proper key
-    mock_cache.set.assert_awaited()
-    call_args = mock_cache.set.call_args
-    cache_key = call_args[0][0]
-    assert cache_key.startswith("card:")
+    # Verify card and word -> lemma were cached together with proper keys
+    mock_cache.set_many.assert_awaited_once()
+    items = mock_cache.set_many.call_args.args[0]
+    assert set(items) == {"card:es:perro", "lemma:es:perro"}
 
 
 @pytest.mark.asyncio
@@ -263,10 +287,12 @@ async def test_generate_card_uses_30day_cache(
         goals=["reading"],
     )
 
-    # Verify cache was set with 30-day TTL
-    mock_cache.set.assert_awaited_once()
-    call_args = mock_cache.set.call_args
+    # Verify cache was set with 30-day TTL in a single pipelined write
+    mock_cache.set.assert_not_awaited()
+    mock_cache.set_many.assert_awaited_once()
+    call_args = mock_cache.set_many.call_args
     assert call_args.kwargs["ttl"] == 2_592_000  # 30 days in seconds
+    assert "lemma:es:gato" in call_args.args[0]  # word -> lemma expires with the card
 
 
 @pytest.mark.asyncio
@@ -342,6 +368,34 @@ async def test_track_token_usage(
     assert metric_kwargs["estimated_cost"] == pytest.approx(usage.estimated_cost)
 
 
+@pytest.mark.asyncio
+async def test_track_token_usage_queues_row_when_writer_running(
+    llm_service: EnhancedLLMService, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """With the background writer running, no commit happens on the request path."""
+    queued: list[dict[str, object]] = []
+    monkeypatch.setattr(
+        "app.services.llm_enhanced.token_usage_writer.enqueue",
+        lambda row: queued.append(row) or True,
+    )
+    mock_session = AsyncMock()
+
+    await llm_service.track_token_usage(
+        db_session=mock_session,
+        user_id="user-1",
+        profile_id=None,
+        usage=TokenUsage(prompt_tokens=10, completion_tokens=5, total_tokens=15),
+        operation="chat",
+    )
+
+    mock_session.add.assert_not_called()
+    mock_session.commit.assert_not_awaited()
+    assert len(queued) == 1
+    assert queued[0]["user_id"] == "user-1"
+    assert queued[0]["total_tokens"] == 15
+    assert queued[0]["model"] == "gpt-4o-mini"
+
+
 @pytest.mark.asyncio
 async def test_chat_structured_validates_response_format(
     llm_service: EnhancedLLMService, mock_cache: AsyncMock
@@ -392,3 +446,304 @@ async def test_chat_structured_with_max_tokens(
 
     call_kwargs = llm_service.chat.call_args.kwargs
     assert call_kwargs["max_tokens"] == 200
+
+
+@pytest.mark.asyncio
+async def test_chat_reuses_cached_low_temperature_completion(mock_cache: AsyncMock) -> None:
+    """Deterministic chat requests are served from the exact-match cache."""
+    service = EnhancedLLMService(api_key="test-key", cache=mock_cache, model="gpt-4o-mini")
+    mock_cache.get.return_value = "casa"
+
+    with patch.object(LLMService, "chat", new=AsyncMock()) as base_chat:
+        content, usage = await service.chat([{"role": "user", "content": "casas"}], temperature=0)
+
+    assert content == "casa"
+    assert usage.total_tokens == 0
+    base_chat.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_chat_caches_miss_and_skips_high_temperature(mock_cache: AsyncMock) -> None:
+    """Misses are stored for later reuse, sampled and structured requests bypass the cache."""
+    service = EnhancedLLMService(api_key="test-key", cache=mock_cache, model="gpt-4o-mini")
+    messages = [{"role": "user", "content": "casas"}]
+
+    with patch.object(
+        LLMService, "chat", new=AsyncMock(return_value=("casa", TokenUsage(10, 2, 12)))
+    ):
+        content, usage = await service.chat(messages, temperature=0.0)
+        assert content == "casa"
+        assert usage.total_tokens == 12
+        mock_cache.set.assert_awaited_once()
+        assert mock_cache.set.call_args.args[0].startswith("llm_chat:")
+
+        mock_cache.get.reset_mock()
+        mock_cache.set.reset_mock()
+        await service.chat(messages, temperature=0.9)
+        await service.chat(messages, temperature=0.0, response_format={"type": "json_object"})
+
+    mock_cache.get.assert_not_awaited()
+    mock_cache.set.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_generate_cards_batch_serves_cached_cards(
+    llm_service: EnhancedLLMService, mock_cache: AsyncMock
+) -> None:
+    """Known words are served from cache, unknown ones are generated concurrently."""
+    cached_card = CardContent(
+        word="casa",
+        lemma="casa",
+        translation="дом",
+        example="Mi casa",
+        example_translation="Мой дом",
+    )
+    mock_cache.mget.side_effect = [["casa", None], [cached_card.model_dump_json()]]
+    llm_service.chat.side_effect = [
+        (
+            '{"word": "perros", "lemma": "perro", "translation": "собака",'
+            ' "example": "El perro", "example_translation": "Собака"}',
+            TokenUsage(100, 50, 150),
+        ),
+    ]
+
+    outcomes = await llm_service.generate_cards_batch(
+        ["casa", "perros"], "es", "Spanish", "A1", ["travel"]
+    )
+
+    assert outcomes[0] == (cached_card, TokenUsage(0, 0, 0))
+    card, usage = outcomes[1]
+    assert card.lemma == "perro"
+    assert usage.total_tokens == 150
+    assert llm_service.chat.await_count == 1
+    items = mock_cache.set_many.call_args.args[0]
+    assert items["lemma:es:perros"] == "perro"
+
+
+def test_cache_codec_round_trips_tagged_and_legacy_entries() -> None:
+    """Tagged entries and legacy untagged JSON both decode; stale shapes are rejected."""
+    card = CardContent(
+        word="casa",
+        lemma="casa",
+        translation="дом",
+        example="Mi casa",
+        example_translation="Мой дом",
+    )
+
+    encoded = _encode_cached(card)
+
+    assert encoded.startswith("m1:")
+    assert _decode_cached(CardContent, encoded) == card
+    assert _decode_cached(CardContent, card.model_dump_json()) == card
+    assert _decode_cached(CardContent, '{"word": "casa"}') is None
+
+
+def test_decode_cached_constructs_nested_models_without_validation() -> None:
+    """Tagged entries are trusted: nested models are built via model_construct."""
+    result = ExerciseResult(
+        result="partial",
+        explanation="Almost",
+        correct_answer="fui",
+        feedback="Keep going",
+        mistakes=[Mistake(type="grammar", description="tense", suggestion="use preterite")],
+    )
+
+    decoded = _decode_cached(ExerciseResult, _encode_cached(result))
+
+    assert decoded == result
+    assert isinstance(decoded.mistakes[0], Mistake)
+    # A schema that grew a required field must not be served from stale entries
+    assert _decode_cached(CardContent, 'm1:{"word": "casa"}') is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "response_text",
+    ["not json at all", '{"intent": "dance", "confidence": 0.5}'],
+)
+async def test_chat_structured_rejects_malformed_llm_output(
+    llm_service: EnhancedLLMService, mock_cache: AsyncMock, response_text: str
+) -> None:
+    """Invalid JSON and schema violations both surface as LLMParsingError."""
+    llm_service.chat.return_value = (response_text, TokenUsage(10, 5, 15))
+    messages = [{"role": "user", "content": "?"}]
+
+    with pytest.raises(LLMParsingError):
+        await llm_service.chat_structured(
+            messages=messages, response_model=IntentDetection, temperature=0.0
+        )
+
+    # The failure is remembered briefly under the key chat() uses for the same request
+    failure_key = negative_cache_key(
+        chat_response_cache_key("gpt-4o-mini", 0.0, None, {"type": "json_object"}, messages)
+    )
+    mock_cache.mget.assert_awaited_once_with(failure_key)
+    mock_cache.set.assert_awaited_once_with(failure_key, "1", ttl=TTL_NEGATIVE)
+
+
+@pytest.mark.asyncio
+async def test_chat_structured_does_not_remember_sampled_failures(
+    llm_service: EnhancedLLMService, mock_cache: AsyncMock
+) -> None:
+    """Sampled requests skip the negative cache: a retry will likely parse."""
+    llm_service.chat.return_value = ("not json at all", TokenUsage(10, 5, 15))
+
+    with pytest.raises(LLMParsingError):
+        await llm_service.chat_structured(
+            messages=[{"role": "user", "content": "?"}],
+            response_model=IntentDetection,
+            temperature=0.7,
+        )
+
+    mock_cache.mget.assert_not_awaited()
+    mock_cache.set.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_chat_structured_short_circuits_recent_parse_failure(
+    llm_service: EnhancedLLMService, mock_cache: AsyncMock
+) -> None:
+    """A request with a live negative-cache marker raises without calling the LLM."""
+    mock_cache.mget.side_effect = lambda *keys: ["1"] * len(keys)
+
+    with pytest.raises(LLMParsingError):
+        await llm_service.chat_structured(
+            messages=[{"role": "user", "content": "?"}],
+            response_model=IntentDetection,
+            temperature=0.0,
+        )
+
+    llm_service.chat.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_precompiled_prompts_fill_every_slot(llm_service: EnhancedLLMService) -> None:
+    """Pre-split card and intent templates interpolate the per-request values."""
+    card_json = (
+        '{"word": "casas", "lemma": "casa", "translation": "дом", '
+        '"example": "Mi casa", "example_translation": "Мой дом"}'
+    )
+    llm_service.chat.return_value = (card_json, TokenUsage(1, 1, 2))
+
+    await llm_service.generate_card(
+        word="casas", language="es", language_name="Spanish", level="A2", goals=["travel"]
+    )
+
+    prompt = llm_service.chat.call_args.kwargs["messages"][1]["content"]
+    assert prompt.startswith('Generate a flashcard for the word: "casas"')
+    assert '"word": "casas"' in prompt
+    assert "- User's goals: travel" in prompt
+    assert "\x00" not in prompt
+
+    intent_json = '{"intent": "general", "confidence": 0.5}'
+    llm_service.chat.return_value = (intent_json, TokenUsage(1, 1, 2))
+    await llm_service.detect_intent(user_message="What does {x} mean?")
+
+    prompt = llm_service.chat.call_args.kwargs["messages"][1]["content"]
+    assert 'Message: "What does {x} mean?"' in prompt
+
+
+@pytest.mark.asyncio
+async def test_detect_intent_reuses_cached_near_duplicate(
+    llm_service: EnhancedLLMService, mock_cache: AsyncMock
+) -> None:
+    """Messages differing only in case/punctuation/spacing hit the same cache entry."""
+    stored: dict[str, str] = {}
+    mock_cache.mget.side_effect = lambda *keys: [stored.get(key) for key in keys]
+    mock_cache.set.side_effect = lambda key, value, ttl=None: stored.__setitem__(key, value)
+    intent_json = '{"intent": "translate", "confidence": 0.9, "entities": {}}'
+    llm_service.chat.return_value = (intent_json, TokenUsage(80, 30, 110))
+
+    first, first_usage = await llm_service.detect_intent(user_message="Translate 'casa'!")
+    second, second_usage = await llm_service.detect_intent(user_message="translate  casa")
+
+    llm_service.chat.assert_awaited_once()
+    assert second.intent == first.intent == "translate"
+    assert first_usage.total_tokens == 110
+    assert second_usage.total_tokens == 0
+
+
+@pytest.mark.asyncio
+async def test_schedule_token_usage_writes_in_background(
+    llm_service: EnhancedLLMService, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Usage is persisted by a background task with its own session."""
+    import asyncio
+
+    from app.services import llm_enhanced as llm_enhanced_module
+
+    usage_session = AsyncMock()
+    session_cm = AsyncMock()
+    session_cm.__aenter__.return_value = usage_session
+    monkeypatch.setattr(llm_enhanced_module, "AsyncSessionFactory", lambda: session_cm)
+    llm_service.track_token_usage = AsyncMock()  # type: ignore[method-assign]
+
+    llm_service.schedule_token_usage(
+        user_id="user-1", profile_id=None, usage=TokenUsage(1, 1, 2), operation="suggest_topics"
+    )
+    llm_service.track_token_usage.assert_not_awaited()
+
+    await asyncio.gather(*llm_enhanced_module._background_tasks)
+
+    llm_service.track_token_usage.assert_awaited_once()
+    kwargs = llm_service.track_token_usage.await_args.kwargs
+    assert kwargs["db_session"] is usage_session
+    assert kwargs["operation"] == "suggest_topics"
+
+
+@pytest.mark.asyncio
+async def test_schedule_token_usage_enqueues_directly_when_writer_running(
+    llm_service: EnhancedLLMService, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """With the background writer running, no task or session is created."""
+    from app.services import llm_enhanced as llm_enhanced_module
+
+    queued: list[dict[str, object]] = []
+    monkeypatch.setattr(
+        "app.services.llm_enhanced.token_usage_writer.enqueue",
+        lambda row: queued.append(row) or True,
+    )
+    session_factory = Mock()
+    monkeypatch.setattr(llm_enhanced_module, "AsyncSessionFactory", session_factory)
+    pending = set(llm_enhanced_module._background_tasks)
+
+    llm_service.schedule_token_usage(
+        user_id="user-1", profile_id=None, usage=TokenUsage(1, 1, 2), operation="suggest_topics"
+    )
+
+    session_factory.assert_not_called()
+    assert llm_enhanced_module._background_tasks == pending
+    assert len(queued) == 1
+    assert queued[0]["operation"] == "suggest_topics"
+
+
+@pytest.mark.asyncio
+async def test_get_lemma_serves_repeat_lookups_from_process_memory(
+    llm_service: EnhancedLLMService, mock_cache: AsyncMock
+) -> None:
+    """After the first resolution neither Redis nor the LLM is consulted again."""
+    llm_service.chat.return_value = ("casa", TokenUsage(50, 10, 60))
+
+    await llm_service.get_lemma(word="casas", language="es")
+    lemma, usage = await llm_service.get_lemma(word="casas", language="es")
+
+    assert lemma == "casa"
+    assert usage.total_tokens == 0
+    mock_cache.get.assert_awaited_once()
+    llm_service.chat.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_lemma_memory_evicts_least_recently_used(
+    llm_service: EnhancedLLMService, mock_cache: AsyncMock, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """The in-process tier is bounded and drops the coldest entry first."""
+    monkeypatch.setattr("app.services.llm_enhanced.LEMMA_MEMORY_CACHE_SIZE", 2)
+    mock_cache.get.side_effect = ["uno", "dos", "tres"]
+
+    await llm_service.get_lemma(word="a", language="es")
+    await llm_service.get_lemma(word="b", language="es")
+    await llm_service.get_lemma(word="a", language="es")  # refreshes "a"
+    await llm_service.get_lemma(word="c", language="es")
+
+    assert list(_lemma_memory) == ["lemma:es:a", "lemma:es:c"]
@@ -2,12 +2,29 @@
 
 from __future__ import annotations
 
+import dataclasses
+from collections.abc import AsyncIterator, Iterator
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from openai import APIConnectionError, AuthenticationError, BadRequestError, RateLimitError
+from openai.types.chat import ChatCompletionChunk
 
-from app.services.llm import LLMProvider, LLMService, TokenUsage, get_basic_system_prompt
+from app.services.llm import (
+    LLMProvider,
+    LLMService,
+    TokenUsage,
+    get_basic_system_prompt,
+    get_openai_client,
+)
+
+
+@pytest.fixture(autouse=True)
+def _fresh_openai_client() -> Iterator[None]:
+    """Tests patch the shared client, so each one starts from a new instance."""
+    get_openai_client.cache_clear()
+    yield
+    get_openai_client.cache_clear()
 
 
 def test_token_usage_calculation() -> None:
@@ -23,6 +40,22 @@ def test_token_usage_calculation() -> None:
     assert abs(usage.estimated_cost - expected_cost) < 0.0001
 
 
+def test_token_usage_is_slotted_and_immutable() -> None:
+    """TokenUsage carries no per-instance __dict__ and its cost cannot drift."""
+    usage = TokenUsage(prompt_tokens=10, completion_tokens=5, total_tokens=15)
+
+    assert not hasattr(usage, "__dict__")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        usage.prompt_tokens = 20  # type: ignore[misc]
+    assert usage == TokenUsage(10, 5, 15)
+
+
+def test_llm_service_export_is_retry_capable() -> None:
+    """Guard against a second, simpler LLMService shadowing the retrying one."""
+    assert hasattr(LLMService._create_completion, "retry")
+    assert hasattr(LLMService._open_stream, "retry")
+
+
 def test_llm_provider_enum() -> None:
     """Test LLMProvider enum values."""
     assert LLMProvider.OPENAI.value == "openai"
@@ -44,6 +77,26 @@ def test_llm_service_init_openai() -> None:
     assert service.client is not None
 
 
+def test_llm_services_share_openai_client() -> None:
+    """Services with the same credentials reuse one client and connection pool."""
+    first = LLMService(api_key="test-key")
+    second = LLMService(api_key="test-key", model="gpt-4o")
+    other = LLMService(api_key="other-key")
+
+    assert first.client is second.client
+    assert first.client is not other.client
+
+
+def test_openai_clients_share_connection_pool_across_timeouts() -> None:
+    """OCR/moderation clients use other timeouts but the same httpx pool as chat."""
+    chat_client = LLMService(api_key="test-key", default_timeout=30.0).client
+    vision_client = get_openai_client("test-key", 60.0)
+
+    assert vision_client is not chat_client
+    assert vision_client.timeout == 60.0
+    assert vision_client._client is chat_client._client
+
+
 def test_llm_service_init_anthropic_not_implemented() -> None:
     """Test LLMService initialization with Anthropic provider raises NotImplementedError."""
     with pytest.raises(NotImplementedError, match="Anthropic provider is not yet implemented"):
@@ -102,6 +155,9 @@ async def test_llm_chat_with_default_temperature() -> None:
     # Verify default temperature was used
     call_kwargs = service.client.chat.completions.create.call_args.kwargs
     assert call_kwargs["temperature"] == 0.9
+    # Unset options are omitted instead of being sent as explicit nulls
+    assert "max_tokens" not in call_kwargs
+    assert "response_format" not in call_kwargs
 
 
 @pytest.mark.asyncio
@@ -181,6 +237,9 @@ async def test_llm_chat_bad_request_error() -> None:
     with pytest.raises(BadRequestError):
         await service.chat(messages=[{"role": "user", "content": ""}])
 
+    # Client errors are not transient and must not be retried
+    assert service.client.chat.completions.create.call_count == 1
+
 
 @pytest.mark.asyncio
 async def test_llm_chat_rate_limit_retries() -> None:
@@ -277,6 +336,51 @@ async def test_llm_chat_connection_error_retries() -> None:
         assert service.client.chat.completions.create.call_count == 2
 
 
+def _stream_chunk(content: str | None, usage: dict[str, int] | None = None) -> ChatCompletionChunk:
+    choices = [{"index": 0, "delta": {"content": content}}] if content is not None else []
+    payload: dict[str, object] = {
+        "id": "chatcmpl-test",
+        "object": "chat.completion.chunk",
+        "created": 0,
+        "model": "gpt-4.1-mini",
+        "choices": choices,
+    }
+    if usage is not None:
+        payload["usage"] = usage
+    return ChatCompletionChunk.model_validate(payload)
+
+
+@pytest.mark.asyncio
+async def test_llm_chat_stream_yields_deltas(caplog: pytest.LogCaptureFixture) -> None:
+    """Test chat_stream yields content deltas and reads usage from the final chunk."""
+    service = LLMService(api_key="test-key")
+
+    chunks = [
+        _stream_chunk("Hola"),
+        _stream_chunk(""),
+        _stream_chunk(" mundo"),
+        _stream_chunk(None, {"prompt_tokens": 10, "completion_tokens": 2, "total_tokens": 12}),
+    ]
+
+    async def _stream() -> AsyncIterator[ChatCompletionChunk]:
+        for chunk in chunks:
+            yield chunk
+
+    service.client.chat.completions.create = AsyncMock(return_value=_stream())
+
+    with caplog.at_level("INFO", logger="app.services.llm"):
+        parts = [part async for part in service.chat_stream([{"role": "user", "content": "Hi"}])]
+
+    assert parts == ["Hola", " mundo"]
+    call_kwargs = service.client.chat.completions.create.call_args.kwargs
+    assert call_kwargs["stream"] is True
+    assert call_kwargs["extra_body"] == {"stream_options": {"include_usage": True}}
+    record = next(
+        r for r in caplog.records if r.getMessage() == "LLM stream completed successfully"
+    )
+    assert record.total_tokens == 12
+
+
 def test_get_basic_system_prompt_russian() -> None:
     """Test basic system prompt generation for Russian users."""
     prompt = get_basic_system_prompt(language_code="ru")
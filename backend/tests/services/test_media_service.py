@@ -1,15 +1,28 @@
 from __future__ import annotations
 
+import asyncio
+import base64
 import io
 import json
+import threading
 from types import SimpleNamespace
 from unittest.mock import AsyncMock
 
 import pytest
 from PIL import Image
 
+from app.core.cache import CacheClient
 from app.core.errors import ApplicationError
-from app.services.media import ImageInput, OCRService
+from app.services.llm import TokenUsage as LLMTokenUsage
+from app.services.media import (
+    ImageInput,
+    OCRAnalysis,
+    OCRSegment,
+    OCRService,
+    ProcessedImage,
+    _jpeg_passthrough_size,
+    _VisionPayload,
+)
 
 
 def _image_bytes(size: int = 64) -> bytes:
@@ -137,3 +150,255 @@ async def test_analyze_supports_list_payloads_from_vision() -> None:
     )
 
     assert analysis.segments[0].target_text == "Hola Mundo"
+
+
+@pytest.mark.asyncio
+async def test_analyze_prepares_images_off_the_event_loop() -> None:
+    response_payload = json.dumps({"full_text": "Hola", "target_text": "Hola"})
+    mock_client = SimpleNamespace(
+        chat=SimpleNamespace(
+            completions=SimpleNamespace(
+                create=AsyncMock(return_value=_vision_response(response_payload))
+            )
+        )
+    )
+    service = OCRService(api_key="test", client=mock_client, max_images=2)
+    prepare = service._prepare_image
+    threads: list[str] = []
+
+    def _recording_prepare(payload: ImageInput, *, index: int) -> ProcessedImage:
+        threads.append(threading.current_thread().name)
+        return prepare(payload, index=index)
+
+    service._prepare_image = _recording_prepare  # type: ignore[method-assign]
+
+    analysis = await service.analyze(
+        [
+            ImageInput(name="1.png", content_type="image/png", data=_image_bytes()),
+            ImageInput(name="2.png", content_type="image/png", data=_image_bytes()),
+        ],
+        target_language_code="es",
+        target_language_name="Spanish",
+    )
+
+    assert [segment.index for segment in analysis.segments] == [0, 1]
+    assert len(threads) == 2
+    assert all(name.startswith("ocr-image") for name in threads)
+
+
+def test_prepare_image_downscales_large_jpeg_preserving_aspect() -> None:
+    source = Image.new("RGB", (1200, 600), color="blue")
+    buffer = io.BytesIO()
+    source.save(buffer, format="JPEG")
+    service = OCRService(api_key="test", client=SimpleNamespace(), max_image_dimension=256)
+
+    processed = service._prepare_image(
+        ImageInput(name="big.jpg", content_type="image/jpeg", data=buffer.getvalue()), index=0
+    )
+
+    with Image.open(io.BytesIO(processed.content)) as result:
+        assert result.format == "JPEG"
+        assert result.size == (256, 128)
+
+
+def _jpeg_bytes(size: tuple[int, int], orientation: int | None = None) -> bytes:
+    image = Image.new("RGB", size, color="green")
+    buffer = io.BytesIO()
+    if orientation is None:
+        image.save(buffer, format="JPEG")
+    else:
+        exif = Image.Exif()
+        exif[0x0112] = orientation
+        image.save(buffer, format="JPEG", exif=exif.tobytes())
+    return buffer.getvalue()
+
+
+def test_prepare_image_passes_small_metadata_free_jpeg_through() -> None:
+    data = _jpeg_bytes((200, 100))
+    service = OCRService(api_key="test", client=SimpleNamespace(), max_image_dimension=256)
+
+    processed = service._prepare_image(
+        ImageInput(name="small.jpg", content_type="image/jpeg", data=data), index=3
+    )
+
+    assert processed.content is data
+    assert processed.content_type == "image/jpeg"
+    assert processed.index == 3
+
+
+def test_prepare_image_strips_exif_from_small_jpeg() -> None:
+    data = _jpeg_bytes((200, 100), orientation=1)
+    service = OCRService(api_key="test", client=SimpleNamespace(), max_image_dimension=256)
+
+    processed = service._prepare_image(
+        ImageInput(name="small.jpg", content_type="image/jpeg", data=data), index=0
+    )
+
+    assert processed.content is not data
+    with Image.open(io.BytesIO(processed.content)) as result:
+        assert not result.getexif()
+
+
+def _with_segment(data: bytes, marker: int, payload: bytes) -> bytes:
+    segment = bytes((0xFF, marker)) + (len(payload) + 2).to_bytes(2, "big") + payload
+    return data[:2] + segment + data[2:]
+
+
+def _with_frame(data: bytes, marker: int, precision: int = 8) -> bytes:
+    offset = data.index(b"\xff\xc0")
+    header = bytes((0xFF, marker, *data[offset + 2 : offset + 4], precision))
+    return data[:offset] + header + data[offset + 5 :]
+
+
+def test_jpeg_passthrough_rejects_metadata_and_exotic_frames() -> None:
+    data = _jpeg_bytes((200, 100))
+    progressive = io.BytesIO()
+    Image.new("RGB", (200, 100), color="green").save(progressive, format="JPEG", progressive=True)
+
+    assert _jpeg_passthrough_size(data) == (200, 100)
+    assert _jpeg_passthrough_size(progressive.getvalue()) == (200, 100)
+    assert _jpeg_passthrough_size(_with_segment(data, 0xED, b"Photoshop 3.0\x00")) is None
+    assert _jpeg_passthrough_size(_with_segment(data, 0xFE, b"serial 1234")) is None
+    assert _jpeg_passthrough_size(_with_frame(data, 0xC3)) is None  # lossless
+    assert _jpeg_passthrough_size(_with_frame(data, 0xC9)) is None  # arithmetic
+    assert _jpeg_passthrough_size(_with_frame(data, 0xC0, precision=12)) is None
+
+
+def test_prepare_image_reencodes_rotated_jpeg() -> None:
+    data = _jpeg_bytes((200, 100), orientation=6)
+    service = OCRService(api_key="test", client=SimpleNamespace(), max_image_dimension=256)
+
+    processed = service._prepare_image(
+        ImageInput(name="rotated.jpg", content_type="image/jpeg", data=data), index=0
+    )
+
+    with Image.open(io.BytesIO(processed.content)) as result:
+        assert result.size == (100, 200)
+
+
+@pytest.mark.asyncio
+async def test_analyze_runs_vision_calls_concurrently() -> None:
+    in_flight = 0
+    peak = 0
+
+    async def _create(**_: object) -> SimpleNamespace:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return _vision_response(json.dumps({"full_text": "Hola", "target_text": "Hola"}))
+
+    mock_client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=AsyncMock(side_effect=_create)))
+    )
+    service = OCRService(api_key="test", client=mock_client, max_images=3)
+
+    analysis = await service.analyze(
+        [
+            ImageInput(name=f"{i}.png", content_type="image/png", data=_image_bytes())
+            for i in range(3)
+        ],
+        target_language_code="es",
+        target_language_name="Spanish",
+    )
+
+    assert peak == 3
+    assert [segment.index for segment in analysis.segments] == [0, 1, 2]
+    assert analysis.usage.total_tokens == 24
+
+
+@pytest.mark.asyncio
+async def test_analyze_serves_repeated_upload_from_cache() -> None:
+    stored: dict[str, str] = {}
+    cache = AsyncMock(spec=CacheClient)
+    cache.get = AsyncMock(side_effect=stored.get)
+    cache.set = AsyncMock(side_effect=lambda key, value, ttl=None: stored.__setitem__(key, value))
+    response_payload = json.dumps(
+        {"full_text": "Hola", "target_text": "Hola", "contains_target_language": True}
+    )
+    mock_client = SimpleNamespace(
+        chat=SimpleNamespace(
+            completions=SimpleNamespace(
+                create=AsyncMock(return_value=_vision_response(response_payload))
+            )
+        )
+    )
+    service = OCRService(api_key="test", client=mock_client, cache=cache)
+    upload = [ImageInput(name="photo.png", content_type="image/png", data=_image_bytes())]
+
+    first = await service.analyze(upload, target_language_code="es", target_language_name="Spanish")
+    second = await service.analyze(
+        upload, target_language_code="es", target_language_name="Spanish"
+    )
+
+    mock_client.chat.completions.create.assert_awaited_once()
+    assert second.combined_text == first.combined_text == "Hola"
+    assert first.usage.total_tokens == 8
+    assert second.usage.total_tokens == 0
+    assert cache.set.call_args.kwargs["ttl"] == 86_400
+
+
+@pytest.mark.asyncio
+async def test_extract_text_sends_image_as_base64_data_url() -> None:
+    create = AsyncMock(return_value=_vision_response('{"full_text": "Hola"}'))
+    mock_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    service = OCRService(api_key="test", client=mock_client)
+    image = ProcessedImage(index=0, content=b"\xff\xd8jpeg-bytes", content_type="image/jpeg")
+
+    await service._extract_text(image, target_language_code="es", target_language_name="Spanish")
+
+    content = create.call_args.kwargs["messages"][1]["content"]
+    url = content[1]["image_url"]["url"]
+    assert isinstance(url, str)
+    prefix, encoded = url.split(",", 1)
+    assert prefix == "data:image/jpeg;base64"
+    assert base64.b64decode(encoded) == image.content
+
+
+def test_normalize_text_collapses_whitespace_and_truncates() -> None:
+    service = OCRService(api_key="test", client=SimpleNamespace())
+
+    assert service._normalize_text("  Hola\n\n\tmundo  ") == "Hola mundo"
+    assert service._normalize_text(" \n\t ") == ""
+    assert service._normalize_text("abc def", limit=5) == "abc…"
+
+
+def test_vision_payload_decodes_with_lax_coercion() -> None:
+    payload = _VisionPayload.from_json(
+        '{"full_text": ["a", "b"], "target_text": null, "contains_target_language": "yes"}'
+    )
+
+    assert payload.full_text == "a\nb"
+    assert payload.target_text == ""
+    assert payload.detected_languages == []
+    assert payload.contains_target_language is True
+    assert _VisionPayload.from_json(payload.to_json()) == payload
+
+
+@pytest.mark.parametrize(
+    "content",
+    ["not json", "[]", '{"detected_languages": [1]}', '{"contains_target_language": "maybe"}'],
+)
+def test_vision_payload_rejects_malformed_content(content: str) -> None:
+    with pytest.raises(ValueError):
+        _VisionPayload.from_json(content)
+
+
+def test_ocr_value_objects_are_slotted() -> None:
+    """Per-image and per-call objects carry no instance __dict__."""
+    usage = LLMTokenUsage(1, 1, 2)
+    segment = OCRSegment(0, "Hola", "Hola", ["es"], True, "low")
+    instances = [
+        ImageInput(name="a.png", content_type="image/png", data=b""),
+        ProcessedImage(index=0, content=b"", content_type="image/jpeg"),
+        segment,
+        OCRAnalysis(
+            segments=[segment], combined_text="Hola", has_target_language=True, usage=usage
+        ),
+        _VisionPayload(),
+        usage,
+    ]
+
+    for instance in instances:
+        assert not hasattr(instance, "__dict__"), type(instance).__name__
@@ -2,13 +2,22 @@
 
 from __future__ import annotations
 
+from pathlib import Path
 from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
-from openai import OpenAIError
+from openai import OpenAIError, RateLimitError
+from tenacity import wait_none
 
-from app.services.moderation import ModerationService
+from app.services.moderation import (
+    ModerationService,
+    RequestThrottle,
+    _emoji_ratio,
+    _flagged_categories,
+    _has_long_repetition,
+    load_blocklist,
+)
 
 
 @pytest.mark.asyncio
@@ -76,3 +85,194 @@ async def test_moderation_service_fail_open_on_api_error() -> None:
 
     assert decision.allowed is True
     assert decision.error is not None
+
+
+@pytest.mark.asyncio
+async def test_evaluate_many_sends_one_batched_request() -> None:
+    flagged = SimpleNamespace(flagged=True, categories={"violence": True}, category_scores={})
+    clean = SimpleNamespace(flagged=False)
+    client = MagicMock()
+    client.moderations = SimpleNamespace(
+        create=AsyncMock(return_value=SimpleNamespace(results=[clean, flagged]))
+    )
+
+    service = ModerationService(api_key="test", client=client)
+
+    decisions = await service.evaluate_many(
+        ["Tell me about verbs", "   ", "!!!!!!!!!!!!!!", "bad request"]
+    )
+
+    client.moderations.create.assert_awaited_once()
+    assert client.moderations.create.await_args.kwargs["input"] == [
+        "Tell me about verbs",
+        "bad request",
+    ]
+    assert [decision.allowed for decision in decisions] == [True, True, False, False]
+    assert decisions[2].source == "local"
+    assert decisions[3].categories == ("violence",)
+
+
+@pytest.mark.asyncio
+async def test_evaluate_many_chunks_large_inputs(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("app.services.moderation.MODERATION_BATCH_SIZE", 2)
+    client = MagicMock()
+    client.moderations = SimpleNamespace(
+        create=AsyncMock(
+            return_value=SimpleNamespace(
+                results=[SimpleNamespace(flagged=False), SimpleNamespace(flagged=False)]
+            )
+        )
+    )
+
+    service = ModerationService(api_key="test", client=client)
+
+    decisions = await service.evaluate_many(["first", "second", "third"])
+
+    assert client.moderations.create.await_count == 2
+    assert len(decisions) == 3
+    assert all(decision.allowed for decision in decisions)
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_request_throttle_waits_for_refill(monkeypatch: pytest.MonkeyPatch) -> None:
+    clock = _FakeClock()
+    sleeps: list[float] = []
+
+    async def fake_sleep(delay: float) -> None:
+        sleeps.append(delay)
+        clock.now += delay
+
+    monkeypatch.setattr("app.services.moderation.asyncio.sleep", fake_sleep)
+    throttle = RequestThrottle(requests_per_minute=2, tokens_per_minute=1000, clock=clock)
+
+    await throttle.acquire(10)
+    await throttle.acquire(10)
+    assert sleeps == []
+
+    await throttle.acquire(10)
+    assert sleeps == [pytest.approx(30.0)]
+
+
+def test_request_throttle_penalty_recovers_after_success_streak() -> None:
+    throttle = RequestThrottle(requests_per_minute=60, tokens_per_minute=1000, clock=_FakeClock())
+
+    throttle.penalize()
+    assert throttle.scale == pytest.approx(0.8)
+
+    for _ in range(RequestThrottle.RECOVERY_STREAK):
+        throttle.record_success()
+    assert throttle.scale == 1.0
+
+
+@pytest.mark.asyncio
+async def test_moderation_retries_rate_limit_and_penalizes_throttle(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(ModerationService._create_moderation.retry, "wait", wait_none())
+    client = MagicMock()
+    client.moderations = SimpleNamespace(
+        create=AsyncMock(
+            side_effect=[
+                RateLimitError(
+                    message="Rate limit exceeded",
+                    response=MagicMock(status_code=429),
+                    body=None,
+                ),
+                SimpleNamespace(results=[SimpleNamespace(flagged=False)]),
+            ]
+        )
+    )
+    throttle = RequestThrottle(requests_per_minute=100, tokens_per_minute=10_000)
+
+    service = ModerationService(api_key="test", client=client, throttle=throttle)
+
+    decision = await service.evaluate("normal request")
+
+    assert decision.allowed is True
+    assert decision.error is None
+    assert client.moderations.create.await_count == 2
+    assert throttle.scale == pytest.approx(0.8)
+
+
+def test_has_long_repetition_matches_runs_at_threshold() -> None:
+    assert _has_long_repetition("wow" + "!" * 8) is True
+    assert _has_long_repetition("wow" + "!" * 7) is False
+    assert _has_long_repetition("\n" * 8) is True
+    assert _has_long_repetition("aaab", threshold=3) is True
+
+
+def test_emoji_ratio_counts_pictographs() -> None:
+    assert _emoji_ratio("") == 0.0
+    assert _emoji_ratio("ok\U0001f600\U0001f680") == pytest.approx(0.5)
+
+
+def test_emoji_ratio_skips_scan_for_text_without_astral_characters() -> None:
+    assert _emoji_ratio("plain ascii message") == 0.0
+    assert _emoji_ratio("Привет, как дела? ✓") == 0.0
+
+
+@pytest.mark.asyncio
+async def test_short_ascii_text_skips_api_when_blocklist_does_not_match() -> None:
+    client = MagicMock()
+    client.moderations = SimpleNamespace(
+        create=AsyncMock(return_value=SimpleNamespace(results=[SimpleNamespace(flagged=False)]))
+    )
+
+    service = ModerationService(api_key="test", client=client, blocklist=("badword",))
+
+    clean = await service.evaluate("How are you?")
+    listed = await service.evaluate("you BADWORD")
+    longer = await service.evaluate("Tell me about the past perfect tense")
+
+    assert clean.source == "local_fast"
+    assert listed.source == "openai"
+    assert longer.source == "openai"
+    assert client.moderations.create.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_fast_path_is_disabled_without_blocklist() -> None:
+    client = MagicMock()
+    client.moderations = SimpleNamespace(
+        create=AsyncMock(return_value=SimpleNamespace(results=[SimpleNamespace(flagged=False)]))
+    )
+
+    service = ModerationService(api_key="test", client=client)
+
+    decision = await service.evaluate("How are you?")
+
+    assert decision.source == "openai"
+    client.moderations.create.assert_awaited_once()
+
+
+def test_load_blocklist_skips_comments_and_blanks(tmp_path: Path) -> None:
+    blocklist = tmp_path / "blocklist.txt"
+    blocklist.write_text("# terms\nFoo\n\n  bar  \n", encoding="utf-8")
+
+    assert load_blocklist(str(blocklist)) == ("foo", "bar")
+    assert load_blocklist(None) == ()
+
+
+def test_flagged_categories_keep_sorted_order_including_unknown_names() -> None:
+    categories = {"violence": True, "hate": True, "self-harm": False, "harassment": True}
+    assert _flagged_categories(categories) == ("harassment", "hate", "violence")
+
+    with_unknown = {"violence": True, "animal-cruelty": True, "hate": False}
+    assert _flagged_categories(with_unknown) == ("animal-cruelty", "violence")
+
+
+def test_flagged_categories_accept_sdk_models() -> None:
+    class _Categories:
+        def model_dump(self, *, by_alias: bool) -> dict[str, bool]:
+            assert by_alias is True
+            return {"self-harm": True, "sexual": False}
+
+    assert _flagged_categories(_Categories()) == ("self-harm",)
@@ -244,6 +244,25 @@ def test_resolve_timezone_uses_fallback(db_session: AsyncSession) -> None:
     assert tz.key == "UTC"
 
 
+def test_resolve_timezone_reuses_cached_instances(db_session: AsyncSession) -> None:
+    service = _service(db_session)
+    first = service._resolve_timezone("Europe/Moscow")  # type: ignore[attr-defined]
+    second = service._resolve_timezone("Europe/Moscow")  # type: ignore[attr-defined]
+    assert first is second
+    assert service._resolve_timezone(None).key == "UTC"  # type: ignore[attr-defined]
+
+
+def test_streak_message_is_shared_per_streak_length(db_session: AsyncSession) -> None:
+    service = _service(db_session)
+    build = service._build_streak_message  # type: ignore[attr-defined]
+    user = _build_user()
+    first = build(_build_profile(user, streak=7))
+    second = build(_build_profile(user, streak=7))
+
+    assert first is second
+    assert first.startswith("У вас 7 дней")
+
+
 def test_within_window_handles_wraparound(db_session: AsyncSession) -> None:
     service = _service(db_session, window_start=22, window_end=6)
     late = datetime(2025, 1, 8, 22, tzinfo=timezone.utc)
@@ -267,3 +286,173 @@ async def test_cleanup_old_reminders_removes_rows(db_session: AsyncSession) -> N
     await service._cleanup_old_reminders(datetime.now(tz=timezone.utc).date())
 
     assert await repo.was_sent_on(user.id, profile.id, old_date) is False
+
+
+@pytest.mark.asyncio
+async def test_process_streak_reminders_handles_many_profiles(
+    db_session: AsyncSession,
+) -> None:
+    users = [_build_user() for _ in range(3)]
+    for index, user in enumerate(users):
+        user.telegram_id = 1000 + index
+    profiles = [_build_profile(user, streak=2) for user in users]
+    db_session.add_all([*users, *profiles])
+    await db_session.commit()
+    await StreakReminderRepository(db_session).log_sent(
+        users[0].id, profiles[0].id, datetime(2025, 1, 8).date()
+    )
+    await db_session.commit()
+
+    created = await _service(db_session).process_streak_reminders(
+        current_time=datetime(2025, 1, 8, 18, tzinfo=timezone.utc)
+    )
+
+    assert created == 2
+    reminders = await db_session.execute(select(StreakReminder))
+    assert len(reminders.scalars().all()) == 3
+
+
+@pytest.mark.asyncio
+async def test_bulk_lookups_return_only_requested_keys(db_session: AsyncSession) -> None:
+    user = _build_user()
+    profile = _build_profile(user)
+    other_user = _build_user()
+    other_user.telegram_id = 654321
+    other_profile = _build_profile(other_user)
+    topic = _build_topic(profile, user)
+    db_session.add_all([user, profile, other_user, other_profile, topic])
+    await db_session.commit()
+
+    completed_at = datetime(2025, 1, 8, 10, tzinfo=timezone.utc)
+    db_session.add(
+        ExerciseHistory(
+            id=uuid.uuid4(),
+            user_id=user.id,
+            topic_id=topic.id,
+            profile_id=profile.id,
+            type=ExerciseType.FREE_TEXT,
+            question="Q",
+            prompt="P",
+            correct_answer="A",
+            user_answer="A",
+            result=ExerciseResultType.CORRECT,
+            explanation=None,
+            details={},
+            completed_at=completed_at,
+        )
+    )
+    day = completed_at.date()
+    reminders = StreakReminderRepository(db_session)
+    await reminders.log_sent(user.id, profile.id, day)
+    await db_session.commit()
+
+    activity = await StatsRepository(db_session).last_activity_for(
+        [(user.id, profile.id), (other_user.id, other_profile.id)]
+    )
+    sent = await reminders.was_sent_on_for_dates(
+        [(user.id, profile.id, day), (other_user.id, other_profile.id, day)]
+    )
+
+    assert set(activity) == {(user.id, profile.id)}
+    assert activity[(user.id, profile.id)].replace(tzinfo=timezone.utc) == completed_at
+    assert sent == {(user.id, profile.id, day)}
+
+
+@pytest.mark.asyncio
+async def test_bulk_lookups_split_keys_into_chunks(db_session: AsyncSession) -> None:
+    users = [_build_user() for _ in range(5)]
+    profiles = [_build_profile(user) for user in users]
+    for index, user in enumerate(users):
+        user.telegram_id = 700000 + index
+    topics = [_build_topic(profile, user) for profile, user in zip(profiles, users, strict=True)]
+    db_session.add_all([*users, *profiles, *topics])
+    await db_session.commit()
+
+    completed_at = datetime(2025, 1, 8, 10, tzinfo=timezone.utc)
+    day = completed_at.date()
+    reminders = StreakReminderRepository(db_session)
+    for user, profile, topic in zip(users, profiles, topics, strict=True):
+        db_session.add(
+            ExerciseHistory(
+                id=uuid.uuid4(),
+                user_id=user.id,
+                topic_id=topic.id,
+                profile_id=profile.id,
+                type=ExerciseType.FREE_TEXT,
+                question="Q",
+                prompt="P",
+                correct_answer="A",
+                user_answer="A",
+                result=ExerciseResultType.CORRECT,
+                explanation=None,
+                details={},
+                completed_at=completed_at,
+            )
+        )
+        await reminders.log_sent(user.id, profile.id, day)
+    await db_session.commit()
+
+    stats = StatsRepository(db_session)
+    stats.IN_CLAUSE_CHUNK_SIZE = 2
+    reminders.IN_CLAUSE_CHUNK_SIZE = 2
+    pairs = [(user.id, profile.id) for user, profile in zip(users, profiles, strict=True)]
+
+    activity = await stats.last_activity_for(pairs)
+    sent = await reminders.was_sent_on_for_dates([(*pair, day) for pair in pairs])
+
+    assert set(activity) == set(pairs)
+    assert sent == {(*pair, day) for pair in pairs}
+
+
+@pytest.mark.asyncio
+async def test_bulk_inserts_persist_notifications_and_reminders(
+    db_session: AsyncSession,
+) -> None:
+    user = _build_user()
+    profile = _build_profile(user)
+    db_session.add_all([user, profile])
+    await db_session.commit()
+
+    day = datetime(2025, 1, 8, tzinfo=timezone.utc).date()
+    await NotificationRepository(db_session).add_many(
+        [
+            {
+                "user_id": user.id,
+                "type": NotificationType.STREAK_REMINDER,
+                "title": "Reminder",
+                "message": "Msg",
+                "data": {"streak": 1},
+            }
+        ]
+    )
+    await StreakReminderRepository(db_session).log_sent_many([(user.id, profile.id, day)])
+    await db_session.commit()
+
+    notifications, total = await NotificationRepository(db_session).list_for_user(user.id)
+    assert total == 1
+    assert notifications[0].data == {"streak": 1}
+    assert await StreakReminderRepository(db_session).was_sent_on(user.id, profile.id, day)
+
+
+@pytest.mark.asyncio
+async def test_process_streak_reminders_streams_only_timezones_in_window(
+    db_session: AsyncSession,
+) -> None:
+    local_user = _build_user()
+    far_user = _build_user()
+    far_user.telegram_id = 777
+    far_user.timezone = "Asia/Tokyo"
+    db_session.add_all([local_user, far_user, _build_profile(local_user), _build_profile(far_user)])
+    await db_session.commit()
+
+    repo = LanguageProfileRepository(db_session)
+    assert sorted(await repo.list_reminder_timezones()) == ["Asia/Tokyo", "UTC"]
+
+    service = _service(db_session, window_start=17, window_end=19)
+    created = await service.process_streak_reminders(
+        current_time=datetime(2025, 1, 8, 18, tzinfo=timezone.utc)
+    )
+
+    assert created == 1
+    _, total = await NotificationRepository(db_session).list_for_user(far_user.id)
+    assert total == 0
@@ -25,6 +25,10 @@ class _DummySession:
 class _DummyService:
     def __init__(self, *args, **kwargs) -> None:  # noqa: ANN002, ANN003
         self.events = kwargs.get("events")
+        self.bound: list[object] = []
+
+    def bind_session(self, session: object) -> None:
+        self.bound.append(session)
 
     async def process_streak_reminders(self) -> int:
         if isinstance(self.events, list):
@@ -54,6 +58,33 @@ async def test_process_cycle_commits_and_logs(
     assert "commit" in events
 
 
+@pytest.mark.asyncio
+async def test_process_cycle_reuses_service_with_fresh_session(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    events: list[str] = []
+    sessions: list[_DummySession] = []
+    built: list[_DummyService] = []
+
+    def _session_factory() -> _DummySession:
+        sessions.append(_DummySession(events))
+        return sessions[-1]
+
+    def _service_factory(*args: object, **kwargs: object) -> _DummyService:
+        built.append(_DummyService(*args, events=events, **kwargs))
+        return built[-1]
+
+    monkeypatch.setattr("app.services.notification_worker.AsyncSessionFactory", _session_factory)
+    monkeypatch.setattr("app.services.notification_worker.NotificationService", _service_factory)
+
+    worker = NotificationWorker(interval_seconds=1)
+    await worker._process_cycle()
+    await worker._process_cycle()
+
+    assert len(built) == 1
+    assert built[0].bound == [sessions[1]]
+
+
 @pytest.mark.asyncio
 async def test_notification_worker_start_and_shutdown(
     monkeypatch: pytest.MonkeyPatch,
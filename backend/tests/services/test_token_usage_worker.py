@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import pytest
+
+from app.services.token_usage_worker import TokenUsageWriter
+
+
+def test_enqueue_is_rejected_until_started() -> None:
+    writer = TokenUsageWriter(batch_size=10, flush_interval_seconds=1)
+
+    assert writer.enqueue({"user_id": "u"}) is False
+    assert writer.running is False
+
+
+@pytest.mark.asyncio
+async def test_drain_flushes_rows_in_batches() -> None:
+    batches: list[list[dict[str, Any]]] = []
+
+    class RecordingWriter(TokenUsageWriter):
+        async def _flush(self, rows: list[dict[str, Any]]) -> None:
+            batches.append(rows)
+
+    writer = RecordingWriter(batch_size=2, flush_interval_seconds=1)
+    for index in range(5):
+        writer._queue.put_nowait({"total_tokens": index})
+
+    await writer._drain()
+
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert [row["total_tokens"] for batch in batches for row in batch] == [0, 1, 2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_shutdown_flushes_pending_rows() -> None:
+    flushed: list[dict[str, Any]] = []
+
+    class RecordingWriter(TokenUsageWriter):
+        async def _flush(self, rows: list[dict[str, Any]]) -> None:
+            flushed.extend(rows)
+
+    writer = RecordingWriter(batch_size=500, flush_interval_seconds=60)
+    writer.start()
+    assert writer.enqueue({"total_tokens": 150}) is True
+    await asyncio.sleep(0)
+    await writer.shutdown()
+
+    assert flushed == [{"total_tokens": 150}]
+    assert writer.running is False
+
+
+@pytest.mark.asyncio
+async def test_full_batch_flushes_before_interval() -> None:
+    flushed = asyncio.Event()
+
+    class RecordingWriter(TokenUsageWriter):
+        async def _flush(self, rows: list[dict[str, Any]]) -> None:
+            assert len(rows) == 2
+            flushed.set()
+
+    writer = RecordingWriter(batch_size=2, flush_interval_seconds=60)
+    writer.start()
+    writer.enqueue({"total_tokens": 1})
+    writer.enqueue({"total_tokens": 2})
+
+    await asyncio.wait_for(flushed.wait(), timeout=1)
+    await writer.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_does_not_stop_draining() -> None:
+    attempts: list[int] = []
+
+    class FlakyWriter(TokenUsageWriter):
+        async def _flush(self, rows: list[dict[str, Any]]) -> None:
+            attempts.append(len(rows))
+            if len(attempts) == 1:
+                raise RuntimeError("database unavailable")
+
+    writer = FlakyWriter(batch_size=1, flush_interval_seconds=1)
+    writer._queue.put_nowait({"total_tokens": 1})
+    writer._queue.put_nowait({"total_tokens": 2})
+
+    await writer._drain()
+
+    assert attempts == [1, 1]
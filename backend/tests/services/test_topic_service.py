@@ -87,10 +87,9 @@ class LLMStub:
         )
         return TopicSuggestions(topics=[suggestion]), TokenUsage(10, 5, 15)
 
-    async def track_token_usage(
+    def schedule_token_usage(
         self,
         *,
-        db_session: AsyncSession,
         user_id: str,
         profile_id: str | None,
         usage: TokenUsage,